@@ -1,6 +1,9 @@
+import re
 import sqlite3
+import threading
+from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 
 
 def project_root() -> Path:
@@ -11,12 +14,118 @@ def project_root() -> Path:
 DB_PATH = project_root() / "outputs" / "db" / "app.db"
 
 
+EVENT_COLUMNS = (
+    "timestamp", "bottle_id", "message", "snapshot_path", "camera_id", "clip_path", "ts_epoch",
+    "kind", "cls_id", "class_name", "severity", "notes",
+)
+
+# eski veri tabanlarına sonradan eklenen sütunlar
+ADDED_COLUMNS = (
+    ("snapshot_path", "TEXT"),
+    ("camera_id", "INTEGER"),
+    ("clip_path", "TEXT"),
+    ("ts_epoch", "REAL"),
+    ("kind", "TEXT"),
+    ("cls_id", "INTEGER"),
+    ("class_name", "TEXT"),
+    ("severity", "TEXT"),
+    ("notes", "TEXT"),
+)
+
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_events_ts ON events (ts_epoch)",
+    "CREATE INDEX IF NOT EXISTS idx_events_bottle_ts ON events (bottle_id, ts_epoch)",
+    "CREATE INDEX IF NOT EXISTS idx_events_camera_ts ON events (camera_id, ts_epoch)",
+    "CREATE INDEX IF NOT EXISTS idx_events_class_ts ON events (class_name, ts_epoch)",
+    "CREATE INDEX IF NOT EXISTS idx_events_severity_ts ON events (severity, ts_epoch)",
+)
+
+# message ve notes üzerinde tam metin indeksi (external content: metin yalnızca events'te durur).
+# remove_diacritics: "supheli" araması "ŞÜPHELİ"yi de bulur
+FTS_TABLE = "events_fts"
+FTS_SCHEMA = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "message, notes, content='events', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+)
+FTS_TRIGGERS = (
+    f"""CREATE TRIGGER IF NOT EXISTS events_fts_ai AFTER INSERT ON events BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, message, notes) VALUES (new.id, new.message, new.notes);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS events_fts_ad AFTER DELETE ON events BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, message, notes) VALUES ('delete', old.id, old.message, old.notes);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS events_fts_au AFTER UPDATE OF message, notes ON events BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, message, notes) VALUES ('delete', old.id, old.message, old.notes);
+        INSERT INTO {FTS_TABLE}(rowid, message, notes) VALUES (new.id, new.message, new.notes);
+    END""",
+)
+
+# bundan az eşleşen metin aramasında sorgu FTS sonucundan sürülür (eşleşen satırlar okunup sıralanır);
+# daha çok eşleşende sıralama indeksi taranır ve eşleşme kümesi yalnızca üyelik testi olur
+FTS_DRIVE_LIMIT = 20000
+
+# yapısal sütunlardan önceki kayıtlar: "ŞÜPHELİ OLAY: <sınıf> ID <track> kayboldu!"
+LEGACY_MESSAGE_PREFIX = "ŞÜPHELİ OLAY: "
+
+COUNT_GROUPS = {
+    "camera_id": "camera_id",
+    "bottle_id": "bottle_id",
+    "class_name": "class_name",
+    "severity": "severity",
+    "day": "strftime('%Y-%m-%d', ts_epoch, 'unixepoch', 'localtime')",
+    "hour": "strftime('%Y-%m-%d %H:00', ts_epoch, 'unixepoch', 'localtime')",
+}
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def fts_query(text: str) -> Optional[str]:
+    """
+    Kullanıcı metnini güvenli bir FTS5 sorgusuna çevirir: her kelime tırnaklanır ve önek olarak
+    aranır, kelimeler AND ile bağlanır ("bott 12" -> "bott"* "12"*). Kelime yoksa None.
+    """
+    words = re.findall(r"\w+", text or "")
+    return " ".join(f'"{w}"*' for w in words) or None
+
+
+def to_epoch(value) -> Optional[float]:
+    """datetime, epoch saniyesi veya TIMESTAMP_FORMAT metni -> epoch saniyesi."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.strptime(value, TIMESTAMP_FORMAT).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
 class Database:
     def __init__(self, db_path: Path = DB_PATH):
         db_path.parent.mkdir(parents=True, exist_ok=True)
-        self.conn = sqlite3.connect(str(db_path))
+        self.db_path = db_path
+        # pipeline event writer thread'i ve GUI aynı bağlantıyı kullanır
+        self.conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._lock = threading.Lock()
+        self._configure()
         self._create_tables()
         self._migrate()
+        self._cols = self._table_columns()
+        # FTS5 olmayan SQLite derlemelerinde metin araması LIKE ile yapılır
+        self.fts = self._create_fts()
+
+    def _configure(self):
+        # WAL: yazarken okuma bloklanmaz, commit başına fsync yerine checkpoint'te toplu yazılır
+        cur = self.conn.cursor()
+        cur.execute("PRAGMA journal_mode=WAL")
+        cur.execute("PRAGMA synchronous=NORMAL")
+
+    def _table_columns(self):
+        cur = self.conn.cursor()
+        cur.execute("PRAGMA table_info(events)")
+        return {row[1] for row in cur.fetchall()}
 
     def _create_tables(self):
         cur = self.conn.cursor()
@@ -31,68 +140,310 @@ class Database:
         self.conn.commit()
 
     def _migrate(self):
+        cols = self._table_columns()
         cur = self.conn.cursor()
-        cur.execute("PRAGMA table_info(events)")
-        cols = [row[1] for row in cur.fetchall()]
-        if "snapshot_path" not in cols:
-            try:
-                cur.execute("ALTER TABLE events ADD COLUMN snapshot_path TEXT")
-                self.conn.commit()
-            except Exception:
-                pass
+        for name, sql_type in ADDED_COLUMNS:
+            if name not in cols:
+                try:
+                    cur.execute(f"ALTER TABLE events ADD COLUMN {name} {sql_type}")
+                    self.conn.commit()
+                except Exception:
+                    pass
+
+        if "ts_epoch" in self._table_columns():
+            # eski metin zaman damgalarından (yerel saat) sıralanabilir epoch üret
+            cur.execute("""
+                UPDATE events
+                SET ts_epoch = CAST(strftime('%s', timestamp, 'utc') AS REAL)
+                WHERE ts_epoch IS NULL
+            """)
+            for sql in INDEXES:
+                cur.execute(sql)
+            self.conn.commit()
+
+        if "class_name" in self._table_columns():
+            # yapısal sütunlar eklenmeden önceki kayıtlarda sınıf adı mesajdan bir kez çıkarılır
+            start = len(LEGACY_MESSAGE_PREFIX) + 1
+            cur.execute(f"""
+                UPDATE events
+                SET class_name = substr(message, {start}, instr(message, ' ID ') - {start}),
+                    kind = 'disappeared'
+                WHERE class_name IS NULL AND message LIKE ? AND instr(message, ' ID ') > {start}
+            """, (LEGACY_MESSAGE_PREFIX + "%",))
+            self.conn.commit()
+
+        self.analyze()
+
+    def _create_fts(self) -> bool:
+        cur = self.conn.cursor()
+        try:
+            exists = cur.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (FTS_TABLE,)).fetchone()
+            cur.execute(FTS_SCHEMA)
+            for sql in FTS_TRIGGERS:
+                cur.execute(sql)
+            if not exists:
+                # indeks sonradan eklendiyse mevcut kayıtlar bir kez indekslenir
+                cur.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+            self.conn.commit()
+            return True
+        except sqlite3.OperationalError:
+            self.conn.rollback()
+            return False
+
+    def analyze(self):
+        # planlayıcı istatistikleri (ör. kamera bazlı sayımlarda skip-scan) için örneklemeli ANALYZE
+        with self._lock:
+            cur = self.conn.cursor()
+            cur.execute("PRAGMA analysis_limit=1000")
+            cur.execute("ANALYZE")
+            self.conn.commit()
 
     def insert_event(
         self,
         timestamp: str,
         bottle_id: Optional[int],
         message: str,
-        snapshot_path: Optional[str] = None
+        snapshot_path: Optional[str] = None,
+        camera_id: Optional[int] = None,
+        clip_path: Optional[str] = None,
+        ts_epoch: Optional[float] = None,
+        kind: Optional[str] = None,
+        cls_id: Optional[int] = None,
+        class_name: Optional[str] = None,
+        severity: Optional[str] = None,
     ):
-        cur = self.conn.cursor()
-        cur.execute("PRAGMA table_info(events)")
-        cols = [row[1] for row in cur.fetchall()]
+        self.insert_events([(
+            timestamp, bottle_id, message, snapshot_path, camera_id, clip_path, ts_epoch,
+            kind, cls_id, class_name, severity,
+        )])
 
-        if "snapshot_path" in cols:
-            cur.execute(
-                "INSERT INTO events (timestamp, bottle_id, message, snapshot_path) VALUES (?, ?, ?, ?)",
-                (timestamp, bottle_id, message, snapshot_path)
-            )
-        else:
-            cur.execute(
-                "INSERT INTO events (timestamp, bottle_id, message) VALUES (?, ?, ?)",
-                (timestamp, bottle_id, message)
-            )
-        self.conn.commit()
+    @staticmethod
+    def _normalize_row(row) -> tuple:
+        # kısa tuple'lar (eski çağıranlar) eksik sütunlarda None alır; ts_epoch yoksa metinden hesaplanır
+        row = tuple(row) + (None,) * (len(EVENT_COLUMNS) - len(row))
+        if row[6] is None:
+            row = row[:6] + (to_epoch(row[0]),) + row[7:]
+        return row
 
-    def fetch_events(self, limit: int = 1000) -> List[Dict[str, Any]]:
-        cur = self.conn.cursor()
-        cur.execute("PRAGMA table_info(events)")
-        cols = [row[1] for row in cur.fetchall()]
+    def insert_events(self, rows: List[tuple]) -> None:
+        """
+        rows: EVENT_COLUMNS sırasında tuple'lar (sondaki sütunlar verilmeyebilir); hepsi tek
+        transaction'da yazılır.
+        """
+        if not rows:
+            return
 
-        if "snapshot_path" in cols:
-            cur.execute("""
-                SELECT id, timestamp, bottle_id, message, snapshot_path
+        rows = [self._normalize_row(r) for r in rows]
+
+        # şema __init__'te bir kez okunur; eski tablolarda eksik sütunlar atlanır
+        idx = [i for i, c in enumerate(EVENT_COLUMNS) if c in self._cols]
+        names = ", ".join(EVENT_COLUMNS[i] for i in idx)
+        marks = ", ".join("?" for _ in idx)
+        sql = f"INSERT INTO events ({names}) VALUES ({marks})"
+
+        with self._lock:
+            with self.conn:
+                self.conn.executemany(sql, [tuple(r[i] for i in idx) for r in rows])
+
+    def _select_names(self) -> List[str]:
+        return ["id"] + [c for c in EVENT_COLUMNS if c in self._cols]
+
+    @staticmethod
+    def _rows_to_dicts(names, rows) -> List[Dict[str, Any]]:
+        events = [dict(zip(names, r)) for r in rows]
+        for e in events:
+            e.setdefault("snapshot_path", "")
+        return events
+
+    def fetch_events(self, limit: int = 1000) -> List[Dict[str, Any]]:
+        names = self._select_names()
+        with self._lock:
+            cur = self.conn.cursor()
+            cur.execute(f"""
+                SELECT {", ".join(names)}
                 FROM events
                 ORDER BY id DESC
                 LIMIT ?
             """, (limit,))
             rows = cur.fetchall()
-            return [
-                {"id": r[0], "timestamp": r[1], "bottle_id": r[2], "message": r[3], "snapshot_path": r[4]}
-                for r in rows
-            ]
 
-        cur.execute("""
-            SELECT id, timestamp, bottle_id, message
-            FROM events
-            ORDER BY id DESC
-            LIMIT ?
-        """, (limit,))
-        rows = cur.fetchall()
-        return [
-            {"id": r[0], "timestamp": r[1], "bottle_id": r[2], "message": r[3], "snapshot_path": ""}
-            for r in rows
-        ]
+        return self._rows_to_dicts(names, rows)
+
+    def set_notes(self, event_id: int, notes: str) -> None:
+        """Event'e operatör notu yazar; not tam metin aramaya dahildir."""
+        with self._lock:
+            with self.conn:
+                self.conn.execute("UPDATE events SET notes = ? WHERE id = ?", (notes or None, event_id))
+
+    def _filters(
+        self, since=None, until=None, camera_id=None, bottle_id=None, event_id=None,
+        class_name=None, severity=None, text=None,
+    ):
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("ts_epoch >= ?")
+            params.append(to_epoch(since))
+        if until is not None:
+            clauses.append("ts_epoch < ?")
+            params.append(to_epoch(until))
+        if camera_id is not None:
+            clauses.append("camera_id = ?")
+            params.append(camera_id)
+        if bottle_id is not None:
+            clauses.append("bottle_id = ?")
+            params.append(bottle_id)
+        if event_id is not None:
+            clauses.append("id = ?")
+            params.append(event_id)
+        if class_name is not None:
+            clauses.append("class_name = ?")
+            params.append(class_name)
+        if severity is not None:
+            clauses.append("severity = ?")
+            params.append(severity)
+        if text:
+            self._text_filter(text, clauses, params)
+        return clauses, params
+
+    def _fts_matches(self, query: str, limit: int) -> int:
+        with self._lock:
+            cur = self.conn.cursor()
+            cur.execute(
+                f"SELECT COUNT(*) FROM (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ? LIMIT ?)",
+                (query, limit),
+            )
+            return cur.fetchone()[0]
+
+    def _text_filter(self, text: str, clauses: list, params: list) -> None:
+        if self.fts:
+            query = fts_query(text)
+            if query is None:
+                return
+            # "+id": SQLite'ın IN listesini satır erişimi için kullanmasını engeller
+            column = "id" if self._fts_matches(query, FTS_DRIVE_LIMIT) < FTS_DRIVE_LIMIT else "+id"
+            clauses.append(f"{column} IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?)")
+            params.append(query)
+            return
+        for word in re.findall(r"\w+", text):
+            clauses.append("(message LIKE ? OR IFNULL(notes, '') LIKE ?)")
+            params.extend([f"%{word}%"] * 2)
+
+    def fetch_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[Tuple[float, int]] = None,
+        descending: bool = True,
+        since=None,
+        until=None,
+        camera_id: Optional[int] = None,
+        bottle_id: Optional[int] = None,
+        event_id: Optional[int] = None,
+        class_name: Optional[str] = None,
+        severity: Optional[str] = None,
+        text: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[float, int]]]:
+        """
+        Keyset (cursor) sayfalama: (ts_epoch, id) sırasına göre sayfa ve sonraki sayfanın cursor'ını döner.
+        OFFSET kullanılmaz; her sayfa indeksten doğrudan okunur. Son sayfada cursor None'dır.
+        since/until: datetime, epoch veya "YYYY-MM-DD HH:MM:SS" (until hariç).
+        text: message ve notes içinde aranan kelimeler (FTS5, önek eşleşmesi, hepsi geçmeli).
+        """
+        clauses, params = self._filters(
+            since, until, camera_id, bottle_id, event_id, class_name=class_name, severity=severity, text=text
+        )
+        if cursor is not None:
+            clauses.append("(ts_epoch, id) < (?, ?)" if descending else "(ts_epoch, id) > (?, ?)")
+            params.extend(cursor)
+
+        names = self._select_names()
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        order = "DESC" if descending else "ASC"
+        with self._lock:
+            cur = self.conn.cursor()
+            cur.execute(f"""
+                SELECT {", ".join(names)}
+                FROM events
+                {where}
+                ORDER BY ts_epoch {order}, id {order}
+                LIMIT ?
+            """, (*params, limit))
+            rows = cur.fetchall()
+
+        events = self._rows_to_dicts(names, rows)
+        next_cursor = None
+        if len(events) == limit:
+            next_cursor = (events[-1]["ts_epoch"], events[-1]["id"])
+        return events, next_cursor
+
+    def iter_events(
+        self,
+        chunk_size: int = 5000,
+        since=None,
+        until=None,
+        camera_id: Optional[int] = None,
+        bottle_id: Optional[int] = None,
+        class_name: Optional[str] = None,
+        severity: Optional[str] = None,
+        text: Optional[str] = None,
+    ) -> Iterator[Tuple[List[str], List[tuple]]]:
+        """
+        Filtreye uyan event'leri id sırasıyla chunk_size'lık parçalar halinde döner: (sütun adları, satırlar).
+        Ayrı, salt okunur bir bağlantı ve tek bir SQLite cursor'ı kullanılır; tablo belleğe alınmaz,
+        yazıcı thread'i bloklanmaz ve WAL sayesinde dışa aktarım başladığı andaki tutarlı görüntüyü okur.
+        """
+        clauses, params = self._filters(
+            since, until, camera_id, bottle_id, class_name=class_name, severity=severity, text=text
+        )
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        names = self._select_names()
+
+        conn = sqlite3.connect(f"{self.db_path.resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            cur = conn.cursor()
+            cur.arraysize = chunk_size
+            cur.execute(f"SELECT {', '.join(names)} FROM events {where} ORDER BY id", params)
+            while True:
+                rows = cur.fetchmany()
+                if not rows:
+                    break
+                yield names, rows
+        finally:
+            conn.close()
+
+    def count_events(
+        self, since=None, until=None, camera_id=None, bottle_id=None, class_name=None, severity=None, text=None
+    ) -> int:
+        clauses, params = self._filters(
+            since, until, camera_id, bottle_id, class_name=class_name, severity=severity, text=text
+        )
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            cur = self.conn.cursor()
+            cur.execute(f"SELECT COUNT(*) FROM events {where}", params)
+            return cur.fetchone()[0]
+
+    def count_by(
+        self, group: str, since=None, until=None, camera_id=None, bottle_id=None,
+        class_name=None, severity=None, text=None,
+    ) -> Dict[Any, int]:
+        """group: "camera_id", "bottle_id", "class_name", "severity", "day" veya "hour" -> {grup: adet}."""
+        if group not in COUNT_GROUPS:
+            raise ValueError(f"Bilinmeyen gruplama: {group}")
+
+        clauses, params = self._filters(
+            since, until, camera_id, bottle_id, class_name=class_name, severity=severity, text=text
+        )
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        key = COUNT_GROUPS[group]
+        with self._lock:
+            cur = self.conn.cursor()
+            cur.execute(f"SELECT {key} AS k, COUNT(*) FROM events {where} GROUP BY k ORDER BY k", params)
+            return dict(cur.fetchall())
 
     def close(self):
-        self.conn.close()
\ No newline at end of file
+        with self._lock:
+            try:
+                self.conn.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                pass
+            self.conn.close()
\ No newline at end of file
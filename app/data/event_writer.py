@@ -0,0 +1,141 @@
+import atexit
+import logging
+import threading
+import time
+from typing import Optional
+
+
+log = logging.getLogger(__name__)
+
+
+class EventWriter:
+    """
+    Event kayıtlarını ayrı bir thread'de, gruplar halinde veri tabanına yazar (write-behind).
+    - insert_event() Database.insert_event ile aynı imzaya sahiptir ve beklemeden döner
+    - batch_size kayıt birikince veya en eski kayıt flush_interval saniyeyi geçince tek commit yapılır
+    - süreç çökerse en fazla flush_interval saniyelik kayıt kaybolabilir
+    - close() (ve süreç normal kapanırken atexit) bekleyen tüm kayıtları yazar
+    - metrics (MetricsRegistry) verilirse commit süresi ve yazılan kayıt sayısı kaydedilir
+    """
+
+    def __init__(self, db, batch_size: int = 64, flush_interval: float = 0.5, max_pending: int = 10000,
+                 metrics=None):
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self.submitted = 0
+        self.written = 0
+        self.failed = 0
+
+        self._write_hist = None
+        if metrics is not None:
+            self._write_hist = metrics.histogram("db_write_seconds", "Event batch commit süresi")
+            metrics.gauge("db_pending_rows", "Yazılmayı bekleyen event kaydı", lambda: self.pending)
+            metrics.counter_fn("db_rows_written_total", "Yazılan event kaydı", lambda: self.written)
+            metrics.counter_fn("db_rows_failed_total", "Yazılamayan event kaydı", lambda: self.failed)
+
+        self._pending = []
+        self._oldest_ts = None
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, name="event-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def insert_event(
+        self,
+        timestamp: str,
+        bottle_id: Optional[int],
+        message: str,
+        snapshot_path: Optional[str] = None,
+        camera_id: Optional[int] = None,
+        clip_path: Optional[str] = None,
+        ts_epoch: Optional[float] = None,
+        kind: Optional[str] = None,
+        cls_id: Optional[int] = None,
+        class_name: Optional[str] = None,
+        severity: Optional[str] = None,
+    ):
+        row = (
+            timestamp, bottle_id, message, snapshot_path, camera_id, clip_path, ts_epoch,
+            kind, cls_id, class_name, severity,
+        )
+        with self._cond:
+            if self._closed:
+                # kapandıktan sonra gelen kayıt kaybolmasın
+                self.db.insert_events([row])
+                return
+
+            # aşırı birikmede üreticiyi yavaşlat; kayıt atılmaz
+            self._cond.wait_for(lambda: self._closed or len(self._pending) < self.max_pending)
+            first = not self._pending
+            if first:
+                self._oldest_ts = time.monotonic()
+            self._pending.append(row)
+            self.submitted += 1
+            # ilk kayıt writer'ın zamanlayıcısını başlatır; dolu batch hemen yazılır
+            if first or len(self._pending) >= self.batch_size:
+                self._cond.notify_all()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        with self._cond:
+            target = self.submitted
+            self._oldest_ts = float("-inf") if self._pending else self._oldest_ts
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self.written + self.failed >= target, timeout)
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        atexit.unregister(self.close)
+
+    def _due(self) -> bool:
+        if not self._pending:
+            return False
+        if self._closed or len(self._pending) >= self.batch_size:
+            return True
+        return time.monotonic() - self._oldest_ts >= self.flush_interval
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._due():
+                    if self._closed:
+                        return
+                    timeout = None
+                    if self._pending:
+                        timeout = max(0.0, self.flush_interval - (time.monotonic() - self._oldest_ts))
+                    self._cond.wait(timeout)
+
+                batch = self._pending
+                self._pending = []
+                self._oldest_ts = None
+                self._cond.notify_all()
+
+            try:
+                started = time.perf_counter()
+                self.db.insert_events(batch)
+                if self._write_hist is not None:
+                    self._write_hist.observe(time.perf_counter() - started)
+                ok = True
+            except Exception:
+                log.exception("Event kayıtları yazılamadı (%d kayıt)", len(batch))
+                ok = False
+
+            with self._cond:
+                if ok:
+                    self.written += len(batch)
+                else:
+                    self.failed += len(batch)
+                self._cond.notify_all()
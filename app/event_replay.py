@@ -0,0 +1,107 @@
+"""
+Kaydedilmiş tespitler üzerinde event motorunu YOLO'suz yeniden oynatır.
+
+    python -m app.event_replay outputs/detections/cam0_20260101_120000.mtd --near-time 2 --disappear-time 4
+
+Kayıtlar python -m app.headless / app.replay --record-detections ile üretilir. Event motoru
+kaydın kare zamanlarıyla (ManualClock) sürülür; aynı kayıt ve ayarlar her zaman aynı event'leri
+verir. Eşik ayarlamak için saniyede binlerce kare işlenebilir.
+"""
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+
+from app.headless import setup_logging, EXIT_OK, EXIT_ERROR
+from app.services.clock import ManualClock
+from app.services.detection_log import DetectionLog
+from app.services.event_rules import RuleConfig, load_rules
+from app.services.event_service import EventService
+
+
+log = logging.getLogger("app.event_replay")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="python -m app.event_replay", description=__doc__.strip().splitlines()[0])
+    p.add_argument("log", type=Path, help="Tespit kaydı (.mtd)")
+    p.add_argument("--near-time", type=float, default=3.0, help="ARMED için gereken yakınlık süresi (s)")
+    p.add_argument("--disappear-time", type=float, default=3.0, help="Event için kaybolma süresi (s)")
+    p.add_argument("--near-distance", type=float, default=0.0,
+                   help="Ürün merkezinin kişi kutusuna en fazla uzaklığı (piksel; 0 = kutunun içinde)")
+    p.add_argument("--track-ttl", type=float, default=10.0,
+                   help="ARMED olmayan ürün izinin görülmeden tutulacağı süre (s)")
+    p.add_argument("--rules", type=Path, default=None,
+                   help="Ürün sınıfı kuralları (JSON; verilmezse yalnızca bottle, yukarıdaki süre/uzaklıklarla)")
+    p.add_argument("--out", type=Path, default=None, help="Event'lerin yazılacağı JSON Lines dosyası")
+    p.add_argument("--log-level", default="info", choices=["debug", "info", "warning", "error"])
+    p.add_argument("--log-format", default="text", choices=["text", "json"])
+    return p
+
+
+def replay_events(detection_log: DetectionLog, service: EventService, clock: ManualClock):
+    """(kare sayısı, event listesi) döner; event'ler (kare index'i, ProductEvent) çiftleridir."""
+    frames = 0
+    events = []
+    for frame_index, ts, detections in detection_log:
+        clock.set(ts)
+        for ev in service.update(detections):
+            events.append((frame_index, ev))
+        frames += 1
+    return frames, events
+
+
+def run(args) -> int:
+    try:
+        rules = load_rules(args.rules) if args.rules else RuleConfig()
+        detection_log = DetectionLog(args.log)
+    except (OSError, ValueError, TypeError):
+        log.exception("girdi okunamadı")
+        return EXIT_ERROR
+
+    clock = ManualClock()
+    service = EventService(
+        args.near_time, args.disappear_time, near_distance=args.near_distance, rules=rules,
+        track_ttl=args.track_ttl, clock=clock,
+    )
+    started = time.perf_counter()
+    frames, events = replay_events(detection_log, service, clock)
+    elapsed = time.perf_counter() - started
+
+    out = open(args.out, "w", encoding="utf-8") if args.out else None
+    try:
+        for frame_index, ev in events:
+            fields = {
+                "frame": frame_index,
+                "ts": round(ev.ts, 3),
+                "kind": ev.kind,
+                "track_id": ev.track_id,
+                "class_name": ev.class_name,
+                "severity": ev.severity,
+                "message": ev.message,
+            }
+            log.info("event", extra={"fields": fields})
+            if out is not None:
+                out.write(json.dumps(fields, ensure_ascii=False) + "\n")
+    finally:
+        if out is not None:
+            out.close()
+
+    log.info("event replay finished", extra={"fields": {
+        "frames": frames,
+        "events": len(events),
+        "elapsed_s": round(elapsed, 3),
+        "fps": round(frames / elapsed) if elapsed > 0 else None,
+    }})
+    return EXIT_OK
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    setup_logging(args.log_level, args.log_format)
+    return run(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,89 @@
+"""
+Event geçmişini CSV, Parquet veya Arrow IPC dosyasına aktarır.
+
+    python -m app.export --format parquet --since "2026-01-01 00:00:00" --out events.parquet
+
+Satırlar veri tabanından parça parça okunur; bellek kullanımı kayıt sayısından bağımsızdır.
+Parquet/Arrow için pyarrow gerekir.
+"""
+import argparse
+import logging
+from datetime import datetime
+from pathlib import Path
+
+from app.data.db import Database, DB_PATH
+from app.headless import setup_logging, EXIT_OK, EXIT_ERROR
+from app.paths import EXPORT_DIR
+from app.services.export_service import ExportJob, FORMATS
+
+
+log = logging.getLogger("app.export")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="python -m app.export", description=__doc__.strip().splitlines()[0])
+    p.add_argument("--db", type=Path, default=DB_PATH, help="SQLite veri tabanı yolu")
+    p.add_argument("--format", default="csv", choices=list(FORMATS))
+    p.add_argument("--out", type=Path, default=None, help="Çıktı dosyası (varsayılan: outputs/exports/events_<zaman>)")
+    p.add_argument("--since", default=None, help="Bu zamandan itibaren (YYYY-MM-DD HH:MM:SS)")
+    p.add_argument("--until", default=None, help="Bu zamana kadar, hariç (YYYY-MM-DD HH:MM:SS)")
+    p.add_argument("--camera-id", type=int, default=None)
+    p.add_argument("--bottle-id", type=int, default=None)
+    p.add_argument("--class-name", default=None, help="Yalnızca bu ürün sınıfı (ör. bottle)")
+    p.add_argument("--severity", default=None, choices=["info", "warning", "critical"])
+    p.add_argument("--text", default=None, help="Mesaj veya notlarda geçen kelimeler (tam metin arama)")
+    p.add_argument("--chunk-size", type=int, default=5000, help="Tek seferde okunan satır sayısı")
+    p.add_argument("--log-level", default="info", choices=["debug", "info", "warning", "error"])
+    p.add_argument("--log-format", default="text", choices=["text", "json"])
+    return p
+
+
+def run(args) -> int:
+    out = args.out
+    if out is None:
+        out = EXPORT_DIR / f"events_{datetime.now().strftime('%Y%m%d_%H%M%S')}{FORMATS[args.format]}"
+
+    db = Database(args.db)
+    job = None
+    try:
+        job = ExportJob(
+            db, out, fmt=args.format, chunk_size=args.chunk_size,
+            since=args.since, until=args.until, camera_id=args.camera_id, bottle_id=args.bottle_id,
+            class_name=args.class_name, severity=args.severity, text=args.text,
+        )
+        job.start()
+        while not job.wait(5.0):
+            log.info("export progress", extra={"fields": {"done": job.done, "total": job.total}})
+    except KeyboardInterrupt:
+        if job is None:
+            # iş başlamadan kesildi: yazılmış dosya yok
+            log.info("export cancelled before start")
+            return EXIT_OK
+        job.cancel()
+        job.wait()
+    except Exception:
+        log.exception("export başlatılamadı")
+        return EXIT_ERROR
+    finally:
+        db.close()
+
+    if job.error:
+        log.error("export başarısız", extra={"fields": {"error": job.error}})
+        return EXIT_ERROR
+    log.info("export finished", extra={"fields": {
+        "path": str(job.out_path) if not job.cancelled else "",
+        "rows": job.done,
+        "seconds": round(job.elapsed, 2),
+        "cancelled": job.cancelled,
+    }})
+    return EXIT_OK
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    setup_logging(args.log_level, args.log_format)
+    return run(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,315 @@
+"""
+PyQt5 olmadan tespit pipeline'ını çalıştırır.
+
+    python -m app.headless --source 0 --source 1 --db outputs/db/app.db
+
+Çıkış kodları: 0 normal kapanış (SIGINT/SIGTERM, --duration veya tüm video kaynaklarının sonu), 1 çalışma hatası.
+"""
+import argparse
+import json
+import logging
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from app.data.db import Database, DB_PATH
+from app.paths import SNAP_DIR
+from app.services.adaptive_controller import AdaptiveController, build_ladder
+from app.services.camera_service import CameraService
+from app.services.detection_log import DetectionRecorder, SUFFIX as DETECTION_LOG_SUFFIX
+from app.services.event_rules import RuleConfig, load_rules
+from app.services.event_service import EventService
+from app.services.metrics import MetricsServer, StatsFileWriter
+from app.services.motion_gate import MotionGate, load_roi_config
+from app.services.pipeline_service import PipelineService, CameraStream
+
+
+log = logging.getLogger("app.headless")
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        payload.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            text += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return text
+
+
+def setup_logging(level: str, fmt: str) -> None:
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level.upper())
+
+
+def parse_source(value: str):
+    # "0", "1" -> cihaz index'i; diğer her şey dosya yolu / URL
+    return int(value) if value.isdigit() else value
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="python -m app.headless", description=__doc__.strip().splitlines()[0])
+    p.add_argument("--source", action="append", type=parse_source, default=None,
+                   help="Kamera index'i veya video/RTSP adresi; birden çok kez verilebilir (varsayılan: 0)")
+    p.add_argument("--db", type=Path, default=DB_PATH, help="SQLite veri tabanı yolu")
+    p.add_argument("--snap-dir", type=Path, default=SNAP_DIR, help="Snapshot klasörü")
+    p.add_argument("--model", default="yolov8n.pt", help="YOLO ağırlık dosyası")
+    p.add_argument("--conf", type=float, default=0.45)
+    p.add_argument("--backend", default=None, choices=["torch", "onnx", "openvino"],
+                   help="Çalışma zamanı; verilmezse --model uzantısından seçilir (.pt, .onnx, *_openvino_model)")
+    p.add_argument("--int8", action="store_true", help="--backend ile dışa aktarılmış INT8 modeli kullan")
+    p.add_argument("--imgsz", type=int, default=640, help="Model giriş boyutu")
+    p.add_argument("--near-time", type=float, default=3.0, help="ARMED için gereken yakınlık süresi (s)")
+    p.add_argument("--disappear-time", type=float, default=3.0, help="Event için kaybolma süresi (s)")
+    p.add_argument("--near-distance", type=float, default=0.0,
+                   help="Ürün merkezinin kişi kutusuna en fazla uzaklığı (piksel; 0 = kutunun içinde)")
+    p.add_argument("--track-ttl", type=float, default=10.0,
+                   help="ARMED olmayan ürün izinin görülmeden tutulacağı süre (s)")
+    p.add_argument("--max-tracks", type=int, default=4096, help="Kamera başına tutulacak en fazla ürün izi")
+    p.add_argument("--rules", type=Path, default=None,
+                   help="Ürün sınıfı kuralları (JSON; verilmezse yalnızca bottle, yukarıdaki süre/uzaklıklarla)")
+    p.add_argument("--max-batch-size", type=int, default=8)
+    p.add_argument("--max-frame-age", type=float, default=0.5, help="Bundan eski kareler atlanır (s)")
+    p.add_argument("--stall-timeout", type=float, default=2.0,
+                   help="Bu kadar süre kare vermeyen canlı kaynak yeniden bağlanır (s)")
+    p.add_argument("--reconnect-max-delay", type=float, default=30.0,
+                   help="Yeniden bağlanma denemeleri arasındaki en uzun bekleme (s)")
+    p.add_argument("--db-flush-interval", type=float, default=0.5,
+                   help="Event'lerin en geç kaç saniyede diske yazılacağı (çökmede kaybolabilecek pencere)")
+    p.add_argument("--snapshot-format", default="jpg", choices=["jpg", "webp"])
+    p.add_argument("--snapshot-quality", type=int, default=90)
+    p.add_argument("--snapshot-max-width", type=int, default=0, help="Snapshot'ları bu genişliğe küçült (0 = orijinal)")
+    p.add_argument("--clip-pre", type=float, default=3.0, help="Event öncesi klip süresi (s)")
+    p.add_argument("--clip-post", type=float, default=2.0, help="Event sonrası klip süresi (s); ikisi de 0 ise klip yok")
+    p.add_argument("--motion-gate", action="store_true",
+                   help="Hareket olmayan karelerde inference'ı atla, hareketli bölgeye kırp")
+    p.add_argument("--roi-config", type=Path, default=None,
+                   help='Kamera başına ROI poligonları (JSON: {"0": [[[x, y], ...]]}, 0..1 koordinat)')
+    p.add_argument("--motion-threshold", type=int, default=25, help="Piksel farkı eşiği (0-255)")
+    p.add_argument("--idle-interval", type=float, default=2.0,
+                   help="Hareket yokken en az bu aralıkla (s) yine de tam kare işlenir")
+    p.add_argument("--target-latency", type=float, default=0.0,
+                   help="Uçtan uca p95 gecikme hedefi (s); verilirse imgsz/stride/çözünürlük otomatik ayarlanır")
+    p.add_argument("--imgsz-levels", type=int, nargs="+", default=None,
+                   help="Uyarlamada kullanılacak imgsz değerleri, büyükten küçüğe (varsayılan: --imgsz 512 416 320)")
+    p.add_argument("--max-stride", type=int, default=3, help="Uyarlamada en fazla kaç karede bir işlenir")
+    p.add_argument("--capture-widths", type=int, nargs="+", default=[0, 1280, 960, 640],
+                   help="Uyarlamada denenecek yakalama genişlikleri (0 = kameranın verdiği)")
+    p.add_argument("--record-detections", type=Path, default=None,
+                   help="Kamera başına takip edilmiş tespitlerin yazılacağı klasör (python -m app.event_replay ile oynatılır)")
+    p.add_argument("--duration", type=float, default=0.0, help="Saniye cinsinden çalışma süresi (0 = sınırsız)")
+    p.add_argument("--metrics-port", type=int, default=0,
+                   help="Prometheus /metrics için yerel HTTP portu (0 = kapalı)")
+    p.add_argument("--metrics-host", default="127.0.0.1", help="/metrics sunucusunun dinleyeceği adres")
+    p.add_argument("--metrics-file", type=Path, default=None, help="Metrik özetlerinin yazılacağı JSON Lines dosyası")
+    p.add_argument("--metrics-interval", type=float, default=10.0, help="--metrics-file yazma aralığı (s)")
+    p.add_argument("--stats-interval", type=float, default=30.0, help="İstatistik log aralığı (s, 0 = kapalı)")
+    p.add_argument("--log-level", default="info", choices=["debug", "info", "warning", "error"])
+    p.add_argument("--log-format", default="text", choices=["text", "json"])
+    return p
+
+
+def build_pipeline(args) -> PipelineService:
+    from app.services.inference_service import InferenceService
+    from app.services.tracking_service import TrackingService
+
+    sources = args.source or [0]
+    rois = load_roi_config(args.roi_config) if args.roi_config else {}
+    rules = load_rules(args.rules) if args.rules else RuleConfig()
+    started = datetime.now().strftime("%Y%m%d_%H%M%S")
+    streams = [
+        CameraStream(
+            stream_id=i,
+            camera=CameraService(camera_index=src),
+            event_service=EventService(
+                args.near_time, args.disappear_time, near_distance=args.near_distance, rules=rules,
+                track_ttl=args.track_ttl, max_tracks=args.max_tracks,
+            ),
+            gate=MotionGate(
+                rois.get(i), threshold=args.motion_threshold, idle_interval=args.idle_interval
+            ) if args.motion_gate or i in rois else None,
+            recorder=DetectionRecorder(
+                args.record_detections / f"cam{i}_{started}{DETECTION_LOG_SUFFIX}",
+                {"source": src, "camera_id": i, "classes": rules.classes, "model": args.model},
+            ) if args.record_detections else None,
+        )
+        for i, src in enumerate(sources)
+    ]
+
+    adaptive = None
+    if args.target_latency > 0:
+        levels = args.imgsz_levels or [args.imgsz] + [s for s in (512, 416, 320) if s < args.imgsz]
+        adaptive = AdaptiveController(
+            args.target_latency, build_ladder(levels, args.max_stride, args.capture_widths)
+        )
+
+    return PipelineService(
+        streams,
+        InferenceService(
+            args.model, conf=args.conf, backend=args.backend, int8=args.int8, imgsz=args.imgsz,
+            classes=rules.classes,
+        ),
+        TrackingService(),
+        Database(args.db),
+        args.snap_dir,
+        max_batch_size=args.max_batch_size,
+        max_frame_age=args.max_frame_age,
+        preview=False,
+        db_flush_interval=args.db_flush_interval,
+        snapshot_options={
+            "fmt": args.snapshot_format,
+            "quality": args.snapshot_quality,
+            "max_width": args.snapshot_max_width,
+            "clip_pre_seconds": args.clip_pre,
+            "clip_post_seconds": args.clip_post,
+        },
+        adaptive=adaptive,
+        stall_timeout=args.stall_timeout,
+        reconnect_max_delay=args.reconnect_max_delay,
+    )
+
+
+def _log_stats(pipeline: PipelineService, started_at: float) -> None:
+    elapsed = max(1e-6, time.time() - started_at)
+    scheduler = pipeline.scheduler
+    log.info("stats", extra={"fields": {
+        "frames": pipeline.frames_processed,
+        "fps": round(pipeline.frames_processed / elapsed, 2),
+        "events": pipeline.events_emitted,
+        "dropped": sum(scheduler.dropped.values()) if scheduler else 0,
+        "stale": sum(scheduler.stale.values()) if scheduler else 0,
+        "reconnects": sum(getattr(s.camera, "reconnects", 0) for s in pipeline.streams.values()),
+    }})
+
+
+def _drain(pipeline: PipelineService) -> None:
+    for message in pipeline.poll_messages():
+        log.warning(message)
+
+    for record in pipeline.poll_events():
+        log.info("event", extra={"fields": {
+            "camera_id": record.camera_id,
+            "timestamp": record.timestamp,
+            "bottle_id": record.bottle_id,
+            "class_name": record.class_name,
+            "severity": record.severity,
+            "message": record.message,
+            "snapshot_path": record.snapshot_path,
+            "clip_path": record.clip_path,
+        }})
+
+
+def run(args) -> int:
+    stop = threading.Event()
+
+    def _on_signal(signum, _frame):
+        log.info("shutdown requested", extra={"fields": {"signal": signal.Signals(signum).name}})
+        stop.set()
+
+    signal.signal(signal.SIGINT, _on_signal)
+    signal.signal(signal.SIGTERM, _on_signal)
+
+    process_started = time.perf_counter()
+    try:
+        pipeline = build_pipeline(args)
+        # model kameralar açılmadan yüklenip ısıtılır; ilk kareler yükleme sırasında eskimesin
+        inferencer = pipeline.inferencer.load()
+        log.info("model loaded", extra={"fields": {
+            "load_s": round(inferencer.load_seconds, 3),
+            "warmup_s": round(inferencer.warmup_seconds or 0.0, 3),
+        }})
+        pipeline.start()
+    except Exception:
+        log.exception("pipeline başlatılamadı")
+        return EXIT_ERROR
+
+    exporters = []
+    try:
+        if args.metrics_port:
+            server = MetricsServer(pipeline.metrics, args.metrics_port, args.metrics_host).start()
+            exporters.append(server)
+            log.info("metrics endpoint", extra={"fields": {"url": f"http://{args.metrics_host}:{server.port}/metrics"}})
+        if args.metrics_file:
+            exporters.append(StatsFileWriter(pipeline.metrics, args.metrics_file, args.metrics_interval).start())
+    except OSError:
+        log.exception("metrik dışa aktarımı başlatılamadı")
+        pipeline.stop()
+        return EXIT_ERROR
+
+    started_at = time.time()
+    last_stats = started_at
+    log.info("pipeline started", extra={"fields": {"streams": list(pipeline.streams)}})
+
+    status = EXIT_OK
+    first_frame = True
+    try:
+        while not stop.wait(0.2):
+            _drain(pipeline)
+            if first_frame and pipeline.frames_processed:
+                first_frame = False
+                log.info("first frame processed", extra={"fields": {
+                    "since_start_s": round(time.perf_counter() - process_started, 3),
+                }})
+
+            now = time.time()
+            if args.duration and now - started_at >= args.duration:
+                break
+            if args.stats_interval and now - last_stats >= args.stats_interval:
+                _log_stats(pipeline, started_at)
+                last_stats = now
+            if pipeline.all_sources_ended:
+                log.info("all sources ended")
+                break
+            if not pipeline.running:
+                log.error("pipeline thread'leri beklenmedik şekilde durdu")
+                status = EXIT_ERROR
+                break
+    except Exception:
+        log.exception("beklenmeyen hata")
+        status = EXIT_ERROR
+    finally:
+        pipeline.stop()
+        _drain(pipeline)
+        _log_stats(pipeline, started_at)
+        for exporter in exporters:
+            exporter.stop()
+        pipeline.db.close()
+
+    log.info("pipeline stopped", extra={"fields": {"exit_status": status}})
+    return status
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    setup_logging(args.log_level, args.log_format)
+    return run(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,78 @@
+"""
+YOLO ağırlıklarını CPU çalışma zamanları için dışa aktarır (ONNX Runtime / OpenVINO), isteğe bağlı INT8.
+
+    python -m app.model_export --weights yolov8n.pt --backend onnx --int8 --calib-source kayit.mp4
+    python -m app.model_export --weights yolov8n.pt --backend openvino --int8
+
+Çıktılar ağırlığın yanına yazılır (yolov8n.onnx, yolov8n_int8.onnx, yolov8n_openvino_model/, ...)
+ve --backend/--int8 ile InferenceService'e verilebilir. ONNX INT8 için kalibrasyon kareleri
+--calib-source ile (görüntü klasörü veya video; mağaza kamerası kaydı önerilir) verilir.
+OpenVINO INT8, ultralytics/NNCF ile --data veri setinde kalibre edilir.
+Doğruluk karşılaştırması: python -m benchmarks.bench_backends
+"""
+import argparse
+import logging
+from pathlib import Path
+
+from app.headless import setup_logging, EXIT_OK, EXIT_ERROR
+from app.services.model_backends import exported_path, quantize_onnx, sample_frames
+
+
+log = logging.getLogger("app.model_export")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="python -m app.model_export", description=__doc__.strip().splitlines()[0])
+    p.add_argument("--weights", type=Path, default=Path("yolov8n.pt"), help="PyTorch ağırlık dosyası")
+    p.add_argument("--backend", default="onnx", choices=["onnx", "openvino"])
+    p.add_argument("--int8", action="store_true", help="INT8 kuantize model üret")
+    p.add_argument("--imgsz", type=int, default=640)
+    p.add_argument("--calib-source", type=Path, default=None,
+                   help="ONNX INT8 kalibrasyonu için görüntü klasörü veya video")
+    p.add_argument("--calib-frames", type=int, default=200, help="Kalibrasyonda kullanılacak kare sayısı")
+    p.add_argument("--data", default="coco8.yaml", help="OpenVINO INT8 kalibrasyon veri seti (ultralytics yaml)")
+    p.add_argument("--log-level", default="info", choices=["debug", "info", "warning", "error"])
+    p.add_argument("--log-format", default="text", choices=["text", "json"])
+    return p
+
+
+def export(args) -> Path:
+    from ultralytics import YOLO
+
+    model = YOLO(str(args.weights))
+    # dinamik batch ve boyut: track_batch birden çok akışın karesini tek çağrıda gönderir,
+    # uyarlamalı kalite (set_imgsz) giriş boyutunu çalışırken değiştirir
+    if args.backend == "openvino":
+        out = model.export(format="openvino", imgsz=args.imgsz, dynamic=True, int8=args.int8, data=args.data)
+        return Path(out)
+
+    fp32 = Path(model.export(format="onnx", imgsz=args.imgsz, dynamic=True, simplify=True))
+    if not args.int8:
+        return fp32
+
+    frames = sample_frames(args.calib_source, args.calib_frames)
+    if not frames:
+        raise RuntimeError(f"Kalibrasyon karesi okunamadı: {args.calib_source}")
+    log.info("kalibrasyon", extra={"fields": {"frames": len(frames), "source": str(args.calib_source)}})
+    return quantize_onnx(fp32, exported_path(args.weights, "onnx", int8=True), frames, args.imgsz)
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    setup_logging(args.log_level, args.log_format)
+    if args.backend == "onnx" and args.int8 and args.calib_source is None:
+        parser.error("ONNX INT8 için --calib-source gerekli")
+
+    try:
+        out = export(args)
+    except Exception:
+        log.exception("dışa aktarma başarısız")
+        return EXIT_ERROR
+
+    log.info("model exported", extra={"fields": {"path": str(out), "backend": args.backend, "int8": args.int8}})
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,12 @@
+from pathlib import Path
+
+
+def project_root() -> Path:
+    # app/paths.py -> app -> PROJECT_ROOT
+    return Path(__file__).resolve().parents[1]
+
+
+OUT_DIR = project_root() / "outputs"
+SNAP_DIR = OUT_DIR / "snapshots"
+EXPORT_DIR = OUT_DIR / "exports"
+LOG_DIR = OUT_DIR / "logs"
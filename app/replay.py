@@ -0,0 +1,252 @@
+"""
+Kayıtlı video / RTSP kaynağını PTS zamanlarıyla, gerçek zamandan hızlı tarar.
+
+    python -m app.replay --source kayit.mp4 --workers 4 --stride 2 --db outputs/db/app.db
+
+Dosya kaynakları --workers ile parçalara bölünüp ayrı süreçlerde işlenir. Her parça,
+event durumunu yeniden kurmak için başlangıcından önceki near+disappear süresi kadar
+kareyi event üretmeden işler (warmup). Track ID'leri parçalar arasında farklı olabilir.
+
+--record-detections kayit.mtd her karenin takip edilmiş tespitlerini ikili dosyaya yazar;
+event motoru daha sonra YOLO'suz yeniden oynatılabilir (bkz. python -m app.event_replay).
+"""
+import argparse
+import json
+import logging
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+from app.headless import setup_logging, EXIT_OK, EXIT_ERROR
+from app.paths import SNAP_DIR
+from app.services.camera_service import CameraService
+from app.services.detection_log import DetectionRecorder, merge_logs
+from app.services.event_persister import EventPersister, EventRecord
+from app.services.event_rules import RuleConfig, load_rules
+from app.services.event_service import EventService
+from app.services.replay_service import ReplayService, ReplayChunk
+from app.services.snapshot_service import SnapshotService
+
+
+log = logging.getLogger("app.replay")
+
+# track'lerin oturması için warmup'a eklenen pay (s)
+WARMUP_MARGIN = 2.0
+# birleştirilen tespit kayıtlarında parçaların track ID'leri bu kadar kaydırılır
+RECORD_ID_STRIDE = 10_000_000
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="python -m app.replay", description=__doc__.strip().splitlines()[0])
+    p.add_argument("--source", required=True, help="Video dosyası veya RTSP adresi")
+    p.add_argument("--camera-id", type=int, default=0, help="Kayıtlara yazılacak kamera kimliği")
+    p.add_argument("--db", type=Path, default=None, help="Event'lerin yazılacağı SQLite yolu (verilmezse yazılmaz)")
+    p.add_argument("--out", type=Path, default=None, help="Event'lerin yazılacağı JSON Lines dosyası")
+    p.add_argument("--snap-dir", type=Path, default=SNAP_DIR / "replay", help="Snapshot klasörü")
+    p.add_argument("--model", default="yolov8n.pt", help="YOLO ağırlık dosyası")
+    p.add_argument("--conf", type=float, default=0.45)
+    p.add_argument("--backend", default=None, choices=["torch", "onnx", "openvino"],
+                   help="Çalışma zamanı; verilmezse --model uzantısından seçilir (.pt, .onnx, *_openvino_model)")
+    p.add_argument("--int8", action="store_true", help="--backend ile dışa aktarılmış INT8 modeli kullan")
+    p.add_argument("--imgsz", type=int, default=640, help="Model giriş boyutu")
+    p.add_argument("--near-time", type=float, default=3.0, help="ARMED için gereken yakınlık süresi (s)")
+    p.add_argument("--disappear-time", type=float, default=3.0, help="Event için kaybolma süresi (s)")
+    p.add_argument("--near-distance", type=float, default=0.0,
+                   help="Ürün merkezinin kişi kutusuna en fazla uzaklığı (piksel; 0 = kutunun içinde)")
+    p.add_argument("--rules", type=Path, default=None,
+                   help="Ürün sınıfı kuralları (JSON; verilmezse yalnızca bottle, yukarıdaki süre/uzaklıklarla)")
+    p.add_argument("--stride", type=int, default=1, help="Her N karede bir işle")
+    p.add_argument("--workers", type=int, default=1, help="Dosyayı bölüp paralel işleyecek süreç sayısı")
+    p.add_argument("--record-detections", type=Path, default=None,
+                   help="Takip edilmiş tespitlerin yazılacağı ikili kayıt (.mtd)")
+    p.add_argument("--start-time", type=datetime.fromisoformat, default=None,
+                   help="Kaydın başlangıç zamanı (ISO). Verilmezse dosya için mtime - süre kullanılır")
+    p.add_argument("--log-level", default="info", choices=["debug", "info", "warning", "error"])
+    p.add_argument("--log-format", default="text", choices=["text", "json"])
+    return p
+
+
+def _probe(source: str):
+    camera = CameraService(source, timestamp_mode="pts")
+    camera.start()
+    try:
+        return camera.fps(), camera.frame_count(), camera.is_file
+    finally:
+        camera.stop()
+
+
+def _base_time(args, fps: float, frame_count: int) -> datetime:
+    if args.start_time is not None:
+        return args.start_time
+    path = Path(args.source)
+    if path.exists() and fps > 0:
+        # dosyanın yazılması kaydın sonunda biter
+        return datetime.fromtimestamp(path.stat().st_mtime) - timedelta(seconds=frame_count / fps)
+    return datetime.now()
+
+
+def _part_path(path: Optional[Path], index: int, count: int) -> Optional[Path]:
+    if path is None or count == 1:
+        return path
+    return path.with_name(f"{path.stem}.part{index}{path.suffix}")
+
+
+def plan_chunks(frame_count: int, fps: float, workers: int, warmup_seconds: float):
+    if workers <= 1 or frame_count <= 0:
+        return [ReplayChunk()]
+
+    size = -(-frame_count // workers)
+    warmup = int(warmup_seconds * fps)
+    return [
+        ReplayChunk(start_frame=start, end_frame=min(frame_count, start + size), warmup_frames=warmup if start else 0)
+        for start in range(0, frame_count, size)
+    ]
+
+
+def run_chunk(job: dict) -> dict:
+    """Worker süreçte bir parçayı işler; kayıtları DB'ye yazmadan döndürür."""
+    from app.services.inference_service import InferenceService
+    from app.services.tracking_service import TrackingService
+
+    inferencer = InferenceService(
+        job["model"], conf=job["conf"], backend=job["backend"], int8=job["int8"], imgsz=job["imgsz"],
+        classes=job["rules"].classes,
+    )
+    events = EventService(
+        job["near_time"], job["disappear_time"], near_distance=job["near_distance"], rules=job["rules"]
+    )
+    snapshots = SnapshotService(job["snap_dir"], report=log.warning, event_delay=events.event_delay)
+    recorder = DetectionRecorder(job["record_path"], job["record_meta"]) if job["record_path"] else None
+    service = ReplayService(
+        CameraService(job["source"], timestamp_mode="pts"),
+        inferencer,
+        TrackingService(),
+        events,
+        persister=EventPersister(None, snapshots),
+        camera_id=job["camera_id"],
+        stride=job["stride"],
+        base_time=job["base_time"],
+        recorder=recorder,
+    )
+    try:
+        records = service.run(job["chunk"])
+    finally:
+        snapshots.close()
+        if recorder is not None:
+            recorder.close()
+    return {
+        "records": [asdict(r) for r in records],
+        "frames": service.frames_processed,
+        "elapsed": service.elapsed,
+    }
+
+
+def run(args) -> int:
+    try:
+        rules = load_rules(args.rules) if args.rules else RuleConfig()
+    except (OSError, ValueError, TypeError):
+        log.exception("kural dosyası okunamadı")
+        return EXIT_ERROR
+
+    try:
+        fps, frame_count, is_file = _probe(args.source)
+    except Exception:
+        log.exception("kaynak açılamadı")
+        return EXIT_ERROR
+
+    # parça başındaki ısınma, en uzun ARMED + kaybolma süresini kapsamalı
+    compiled = EventService(args.near_time, args.disappear_time, args.near_distance, rules).rules
+    warmup = float(compiled.near_time.max() + compiled.disappear_time.max())
+    workers = args.workers if is_file else 1
+    chunks = plan_chunks(frame_count, fps, workers, warmup + WARMUP_MARGIN)
+    base_time = _base_time(args, fps, frame_count)
+    record_meta = {
+        "source": args.source, "camera_id": args.camera_id, "fps": fps / args.stride,
+        "base_time": base_time.timestamp(), "classes": rules.classes, "model": args.model,
+    }
+
+    jobs = [{
+        "source": args.source,
+        "model": args.model,
+        "conf": args.conf,
+        "backend": args.backend,
+        "int8": args.int8,
+        "imgsz": args.imgsz,
+        "near_time": args.near_time,
+        "near_distance": args.near_distance,
+        "rules": rules,
+        "disappear_time": args.disappear_time,
+        "snap_dir": args.snap_dir,
+        "camera_id": args.camera_id,
+        "stride": args.stride,
+        "base_time": base_time,
+        "chunk": chunk,
+        "record_path": _part_path(args.record_detections, k, len(chunks)),
+        "record_meta": record_meta,
+    } for k, chunk in enumerate(chunks)]
+
+    log.info("replay started", extra={"fields": {
+        "source": args.source, "fps": round(fps, 2), "frames": frame_count, "chunks": len(chunks),
+    }})
+
+    try:
+        if len(jobs) == 1:
+            outputs = [run_chunk(jobs[0])]
+        else:
+            # torch fork sonrası güvenli değil; spawn kullan
+            with ProcessPoolExecutor(max_workers=len(jobs), mp_context=mp.get_context("spawn")) as pool:
+                outputs = list(pool.map(run_chunk, jobs))
+    except KeyboardInterrupt:
+        log.warning("replay iptal edildi")
+        return EXIT_ERROR
+    except Exception:
+        log.exception("replay başarısız")
+        return EXIT_ERROR
+
+    records = [EventRecord(**r) for out in outputs for r in out["records"]]
+    if args.record_detections is not None and len(jobs) > 1:
+        parts = [job["record_path"] for job in jobs]
+        merge_logs(parts, args.record_detections, id_stride=RECORD_ID_STRIDE)
+        for part in parts:
+            part.unlink(missing_ok=True)
+    frames = sum(out["frames"] for out in outputs)
+    elapsed = max((out["elapsed"] for out in outputs), default=0.0)
+
+    if args.db is not None:
+        from app.data.db import Database
+
+        db = Database(args.db)
+        EventPersister(db, None).insert_many(records)
+        db.close()
+
+    out = open(args.out, "w", encoding="utf-8") if args.out else None
+    try:
+        for record in records:
+            log.info("event", extra={"fields": asdict(record)})
+            if out is not None:
+                out.write(json.dumps(asdict(record), ensure_ascii=False) + "\n")
+    finally:
+        if out is not None:
+            out.close()
+
+    media_seconds = frame_count / fps if fps > 0 else 0.0
+    log.info("replay finished", extra={"fields": {
+        "events": len(records),
+        "frames_processed": frames,
+        "elapsed_s": round(elapsed, 2),
+        "speedup": round(media_seconds / elapsed, 2) if elapsed > 0 and media_seconds else None,
+    }})
+    return EXIT_OK
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    setup_logging(args.log_level, args.log_format)
+    return run(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
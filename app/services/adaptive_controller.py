@@ -0,0 +1,132 @@
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class QualityLevel:
+    imgsz: int       # model giriş boyutu
+    stride: int      # her N yakalanan kareden biri işlenir
+    max_width: int   # yakalama genişliği üst sınırı (0 = kameranın verdiği)
+
+    def describe(self) -> str:
+        width = self.max_width or "orijinal"
+        return f"imgsz={self.imgsz}, stride={self.stride}, genişlik={width}"
+
+
+def build_ladder(
+    imgsz_levels: Sequence[int] = (640, 512, 416, 320),
+    max_stride: int = 3,
+    widths: Sequence[int] = (0, 1280, 960, 640),
+) -> List[QualityLevel]:
+    """
+    En iyi kaliteden en düşüğe sıralı seviyeler. Her adımda tek bir boyut düşürülür, sırayla:
+    stride (EventService süreye bağlı çalıştığından tespit kalitesine etkisi en az),
+    imgsz (küçük ürünlerin tespiti zayıflar), yakalama genişliği.
+    """
+    imgsz_levels, widths = list(imgsz_levels), list(widths)
+    i = w = 0
+    stride = 1
+    ladder = [QualityLevel(imgsz_levels[0], stride, widths[0])]
+    while True:
+        changed = False
+        if stride < max_stride:
+            stride += 1
+            changed = True
+            ladder.append(QualityLevel(imgsz_levels[i], stride, widths[w]))
+        if i + 1 < len(imgsz_levels):
+            i += 1
+            changed = True
+            ladder.append(QualityLevel(imgsz_levels[i], stride, widths[w]))
+        if w + 1 < len(widths):
+            w += 1
+            changed = True
+            ladder.append(QualityLevel(imgsz_levels[i], stride, widths[w]))
+        if not changed:
+            return ladder
+
+
+class AdaptiveController:
+    """
+    Ölçülen uçtan uca gecikme ve kuyruk derinliğine göre kalite seviyesini ayarlar (geri besleme).
+    - her interval saniyede son pencerenin p95 gecikmesi frame_latency histogramından hesaplanır
+    - p95 > target_latency veya kuyruk dolu -> bir seviye düşür (cooldown saniyede en fazla bir kez)
+    - p95 < target_latency * low_water ve kuyruk boş, upgrade_after pencere boyunca -> bir seviye yükselt
+    Karar mantığı burada, uygulama PipelineService'tedir; step() değişiklik yoksa None döner.
+    """
+
+    def __init__(
+        self,
+        target_latency: float = 0.3,
+        ladder: Optional[List[QualityLevel]] = None,
+        interval: float = 1.0,
+        cooldown: float = 3.0,
+        upgrade_after: int = 5,
+        low_water: float = 0.6,
+        max_queue: int = 2,
+        min_samples: int = 5,
+    ):
+        self.target_latency = target_latency
+        self.ladder = ladder or build_ladder()
+        self.interval = interval
+        self.cooldown = cooldown
+        self.upgrade_after = upgrade_after
+        self.low_water = low_water
+        self.max_queue = max_queue
+        self.min_samples = min_samples
+
+        self.index = 0
+        self._prev_counts = None
+        self._last_change = float("-inf")
+        self._calm = 0
+
+    @property
+    def level(self) -> QualityLevel:
+        return self.ladder[self.index]
+
+    def reset(self) -> None:
+        self.index = 0
+        self._prev_counts = None
+        self._last_change = float("-inf")
+        self._calm = 0
+
+    def _window_p95(self, latency_hist) -> Tuple[Optional[float], int]:
+        counts, _ = latency_hist.state()
+        prev = self._prev_counts or [0] * len(counts)
+        self._prev_counts = counts
+        window = [c - p for c, p in zip(counts, prev)]
+        n = sum(window)
+        if n < self.min_samples:
+            return None, n
+        return latency_hist.quantile(0.95, window), n
+
+    def step(self, now: float, latency_hist, queue_depth: int):
+        """Seviye değiştiyse (eski, yeni, neden) döner."""
+        p95, n = self._window_p95(latency_hist)
+        overloaded = queue_depth > self.max_queue or (p95 is not None and p95 > self.target_latency)
+        if n == 0 and queue_depth == 0:
+            # işlenen kare yok (ör. kamera bekleniyor); karar verilmez
+            return None
+
+        old = self.level
+        p95_text = f"{p95 * 1000:.0f} ms" if p95 is not None else "ölçülmedi"
+        if overloaded:
+            self._calm = 0
+            if self.index + 1 >= len(self.ladder) or now - self._last_change < self.cooldown:
+                return None
+            self.index += 1
+            reason = (f"p95 gecikme {p95_text} (hedef {self.target_latency * 1000:.0f} ms), "
+                      f"kuyruk {queue_depth}")
+        elif p95 is not None and p95 < self.target_latency * self.low_water and queue_depth == 0:
+            self._calm += 1
+            if self.index == 0 or self._calm < self.upgrade_after or now - self._last_change < self.cooldown:
+                return None
+            self.index -= 1
+            self._calm = 0
+            reason = (f"p95 gecikme {p95_text}, {self.upgrade_after} pencere boyunca "
+                      f"hedefin %{int(self.low_water * 100)}'ının altında")
+        else:
+            self._calm = 0
+            return None
+
+        self._last_change = now
+        return old, self.level, reason
@@ -0,0 +1,42 @@
+import threading
+import time
+from typing import Optional
+
+
+class BackgroundTask:
+    """
+    Tek seferlik bir işi daemon thread'de çalıştırır (kamera taraması, model yükleme).
+    GUI bitişi ExportJob'daki gibi bir QTimer ile finished üzerinden yoklar; sonuç result'ta,
+    hata mesajı error'da, süre elapsed'da (s) bulunur.
+    """
+
+    def __init__(self, fn, *args, name: str = "background-task", **kwargs):
+        self.result = None
+        self.error: Optional[str] = None
+        self.elapsed = 0.0
+
+        self._call = (fn, args, kwargs)
+        self._finished = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self) -> "BackgroundTask":
+        self._thread.start()
+        return self
+
+    @property
+    def finished(self) -> bool:
+        return self._finished.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._finished.wait(timeout)
+
+    def _run(self):
+        fn, args, kwargs = self._call
+        started = time.perf_counter()
+        try:
+            self.result = fn(*args, **kwargs)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.elapsed = time.perf_counter() - started
+            self._finished.set()
@@ -0,0 +1,97 @@
+import threading
+import time
+
+
+class BatchScheduler:
+    """
+    Birden fazla kamera akışından gelen kareleri tek model çağrısı için batch'ler.
+    - her akış için yalnızca en yeni kare tutulur (newest-wins)
+    - bir batch'te her akıştan en fazla bir kare bulunur; başlangıç akışı round-robin döner
+    - max_frame_age saniyeden eski kareler inference'a girmeden atılır. Yaş paketin received_ts'i
+      (okunduğu andaki time.monotonic()) ile ölçülür; capture_ts PTS veya enjekte saat olabilir
+    """
+
+    def __init__(self, max_batch_size: int = 8, fill_timeout: float = 0.005, max_frame_age: float = 0.5):
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size en az 1 olmalı (max_batch_size={max_batch_size})")
+
+        self.max_batch_size = max_batch_size
+        self.fill_timeout = fill_timeout
+        self.max_frame_age = max_frame_age
+
+        self.dropped = {}  # stream_id -> üzerine yazılan kare sayısı
+        self.stale = {}    # stream_id -> yaş sınırı yüzünden atılan kare sayısı
+
+        self._slots = {}   # stream_id -> bekleyen en yeni kare
+        self._order = []
+        self._rr = 0
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def add_stream(self, stream_id) -> None:
+        with self._cond:
+            if stream_id in self._slots:
+                return
+            self._slots[stream_id] = None
+            self._order.append(stream_id)
+            self.dropped[stream_id] = 0
+            self.stale[stream_id] = 0
+
+    def submit(self, stream_id, packet) -> bool:
+        with self._cond:
+            if self._closed or stream_id not in self._slots:
+                return False
+            if self._slots[stream_id] is not None:
+                self.dropped[stream_id] += 1
+            self._slots[stream_id] = packet
+            self._cond.notify_all()
+            return True
+
+    def __len__(self) -> int:
+        # bekleyen (henüz batch'e alınmamış) kare sayısı
+        return self._ready_count()
+
+    def _ready_count(self) -> int:
+        return sum(1 for p in self._slots.values() if p is not None)
+
+    def next_batch(self, timeout=None) -> list:
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._closed or self._ready_count() > 0, timeout):
+                return []
+            if self._closed:
+                return []
+
+            # batch'i doldurmak için kısa süre bekle; tüm akışlar hazırsa beklemeden çık
+            target = min(self.max_batch_size, len(self._order))
+            if self.fill_timeout > 0 and self._ready_count() < target:
+                self._cond.wait_for(lambda: self._closed or self._ready_count() >= target, self.fill_timeout)
+
+            now = time.monotonic()
+            batch = []
+            n = len(self._order)
+            next_rr = (self._rr + 1) % n
+
+            for k in range(n):
+                pos = (self._rr + k) % n
+                stream_id = self._order[pos]
+                packet = self._slots[stream_id]
+                if packet is None:
+                    continue
+
+                self._slots[stream_id] = None
+                if self.max_frame_age and now - packet.received_ts > self.max_frame_age:
+                    self.stale[stream_id] += 1
+                    continue
+
+                batch.append(packet)
+                if len(batch) >= self.max_batch_size:
+                    next_rr = (pos + 1) % n
+                    break
+
+            self._rr = next_rr
+            return batch
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
@@ -1,50 +1,227 @@
+import random
+import threading
+import time
+
 import cv2
 
+from app.services.clock import SYSTEM_CLOCK
+
+
+# list_available sonuçlarının geçerli kaldığı süre (s); refresh=True ile atlanır
+PROBE_CACHE_SECONDS = 60.0
+
+_probe_cache = {}  # max_index -> (zaman, index listesi)
+_probe_lock = threading.Lock()
+
+
+def _probe(idx: int, found: dict) -> None:
+    cap = None
+    try:
+        cap = cv2.VideoCapture(idx)
+        found[idx] = cap is not None and cap.isOpened()
+    except cv2.error:
+        found[idx] = False
+    finally:
+        if cap is not None:
+            cap.release()
+
+
+# ağ akışlarında açma/okuma zaman aşımı (ms); OpenCV 4.5.2 öncesinde yok sayılır
+NETWORK_TIMEOUT_MS = 5000
+
+
+class Backoff:
+    """
+    Yeniden bağlanma beklemesi: initial'dan başlar, her denemede factor katına çıkar,
+    maximum'da sabitlenir. Aynı anda kopan kameralar aynı anda denemesin diye ±jitter oranında saptırılır.
+    """
+
+    def __init__(self, initial: float = 0.5, maximum: float = 30.0, factor: float = 2.0, jitter: float = 0.1):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.jitter = jitter
+        self.attempts = 0
+
+    def next_delay(self) -> float:
+        delay = min(self.maximum, self.initial * self.factor ** self.attempts)
+        self.attempts += 1
+        return delay * (1.0 + random.uniform(-self.jitter, self.jitter))
+
+    def reset(self) -> None:
+        self.attempts = 0
+
 
 class CameraService:
-    def __init__(self, camera_index: int = 0):
+    """
+    camera_index: cihaz index'i (int) veya video dosyası / RTSP adresi (str).
+    timestamp_mode:
+    - "wall": kare zamanı okuma anındaki clock.now() (canlı kamera; varsayılan duvar saati)
+    - "pts": kare zamanı videodaki sunum zamanı (kayıttan işleme)
+    Canlı kaynaklarda (cihaz index'i, RTSP) OpenCV'nin iç tamponu 1 kareye indirilir; okuma
+    sürekli yapıldığında bekleyen eski kareler birikmez. Bağlantı koparsa reconnect() ile yeniden açılır.
+    """
+
+    def __init__(self, camera_index=0, timestamp_mode: str = "wall", clock=None):
+        if timestamp_mode not in ("wall", "pts"):
+            raise ValueError(f"Bilinmeyen timestamp_mode: {timestamp_mode}")
         self.camera_index = camera_index
+        self.timestamp_mode = timestamp_mode
+        self.clock = clock or SYSTEM_CLOCK
         self.cap = None
+        self._frame_pos = 0
+        self._native_size = None
+        self.reconnects = 0
 
     @staticmethod
-    def list_available(max_index: int = 5):
-        available = []
-        for idx in range(max_index):
-            cap = cv2.VideoCapture(idx)
-            if cap is not None and cap.isOpened():
-                available.append(idx)
-                cap.release()
-            else:
-                try:
-                    cap.release()
-                except Exception:
-                    pass
-        return available
-
-    def set_index(self, camera_index: int) -> None:
+    def list_available(max_index: int = 5, timeout: float = 3.0, refresh: bool = False):
+        """
+        İlk max_index cihaz index'ini paralel dener. Olmayan bir index'i açmak sürücüye göre
+        saniyeler sürebildiğinden toplam bekleme en fazla timeout saniyedir; süresi dolan deneme
+        arka planda biter ve cihaz bulunamamış sayılır. Sonuç PROBE_CACHE_SECONDS boyunca önbellekten döner.
+        """
+        with _probe_lock:
+            cached = _probe_cache.get(max_index)
+            if cached is not None and not refresh and time.monotonic() - cached[0] < PROBE_CACHE_SECONDS:
+                return list(cached[1])
+
+            found = {}
+            threads = [
+                threading.Thread(target=_probe, args=(idx, found), name=f"camera-probe-{idx}", daemon=True)
+                for idx in range(max_index)
+            ]
+            for t in threads:
+                t.start()
+            deadline = time.monotonic() + timeout
+            for t in threads:
+                t.join(max(0.0, deadline - time.monotonic()))
+
+            available = [idx for idx in range(max_index) if found.get(idx)]
+            _probe_cache[max_index] = (time.monotonic(), available)
+            return list(available)
+
+    @property
+    def is_file(self) -> bool:
+        return isinstance(self.camera_index, str) and "://" not in self.camera_index
+
+    @property
+    def is_live(self) -> bool:
+        return not self.is_file
+
+    @property
+    def connected(self) -> bool:
+        return self.cap is not None
+
+    def set_index(self, camera_index) -> None:
         self.camera_index = camera_index
 
     def start(self) -> None:
         if self.cap is not None:
             return
 
-        self.cap = cv2.VideoCapture(self.camera_index)
+        self.cap = self._open()
         if not self.cap.isOpened():
             self.cap = None
             raise RuntimeError(
                 f"Kamera açılamadı (camera_index={self.camera_index}). "
                 "Kamera listesinde görünen başka bir index deneyin."
             )
+        self._frame_pos = 0
+        self._native_size = (
+            int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        )
+        if self.is_live:
+            # sürücü desteklemezse etkisiz; okuma thread'i yine de her kareyi hemen tüketir
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    def _open(self):
+        open_timeout = getattr(cv2, "CAP_PROP_OPEN_TIMEOUT_MSEC", None)
+        read_timeout = getattr(cv2, "CAP_PROP_READ_TIMEOUT_MSEC", None)
+        if isinstance(self.camera_index, str) and "://" in self.camera_index and open_timeout is not None:
+            # koparılan RTSP bağlantısında read() ffmpeg'in varsayılan ~30 sn'sini beklemesin
+            return cv2.VideoCapture(
+                self.camera_index, cv2.CAP_ANY,
+                [open_timeout, NETWORK_TIMEOUT_MS, read_timeout, NETWORK_TIMEOUT_MS],
+            )
+        return cv2.VideoCapture(self.camera_index)
+
+    def reconnect(self) -> bool:
+        """Kaynağı kapatıp yeniden açar; açılamazsa False döner (kamera kapalı kalır)."""
+        self.stop()
+        try:
+            self.start()
+        except (RuntimeError, cv2.error):
+            return False
+        self.reconnects += 1
+        return True
+
+    def fps(self) -> float:
+        if self.cap is None:
+            return 0.0
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        return fps if fps and fps > 0 else 30.0
+
+    def frame_count(self) -> int:
+        if self.cap is None or not self.is_file:
+            return 0
+        return max(0, int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+
+    def seek(self, frame_index: int) -> None:
+        if self.cap is None or frame_index <= 0:
+            return
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+        self._frame_pos = frame_index
+
+    def set_frame_width(self, width: int) -> bool:
+        """
+        Cihazdan en boy oranını koruyarak daha düşük çözünürlük ister (0 = açılıştaki çözünürlük).
+        Yalnızca cihaz index'lerinde denenir; sürücü kabul ederse True döner.
+        Okuma ile aynı thread'den çağrılmalıdır.
+        """
+        if self.cap is None or not isinstance(self.camera_index, int) or not self._native_size:
+            return False
+        native_w, native_h = self._native_size
+        if not native_w or not native_h:
+            return False
+        target_w = min(width or native_w, native_w)
+        target_h = round(native_h * target_w / native_w)
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, target_w)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, target_h)
+        return int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)) == target_w
+
+    def grab(self) -> bool:
+        # kare atlamak için: decode edilir fakat BGR'a çevrilip kopyalanmaz
+        if self.cap is None:
+            return False
+        ok = self.cap.grab()
+        if ok:
+            self._frame_pos += 1
+        return ok
 
     def read(self):
+        frame, _ = self.read_with_ts()
+        return frame
+
+    def read_with_ts(self):
         if self.cap is None:
-            return None
+            return None, None
         ok, frame = self.cap.read()
         if not ok:
-            return None
-        return frame
+            return None, None
+
+        frame_index = self._frame_pos
+        self._frame_pos += 1
+
+        if self.timestamp_mode == "wall":
+            return frame, self.clock.now()
+
+        pts_ms = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+        if pts_ms <= 0 and frame_index > 0:
+            # bazı backend'ler PTS vermez; kare index'inden hesapla
+            return frame, frame_index / self.fps()
+        return frame, pts_ms / 1000.0
 
     def stop(self) -> None:
         if self.cap is not None:
             self.cap.release()
-            self.cap = None
\ No newline at end of file
+            self.cap = None
@@ -0,0 +1,31 @@
+import time
+
+
+class SystemClock:
+    """Duvar saati (epoch saniye). Canlı kameralarda kare zamanı bununla damgalanır."""
+
+    def now(self) -> float:
+        return time.time()
+
+
+class ManualClock:
+    """
+    Zamanı çağıranın ilerlettiği saat: kayıttan oynatma ve testler için.
+    EventService'e verilince update(now=None) çağrıları son set() edilen kare zamanını kullanır.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self._now = float(start)
+
+    def now(self) -> float:
+        return self._now
+
+    def set(self, ts: float) -> None:
+        self._now = float(ts)
+
+    def advance(self, seconds: float) -> float:
+        self._now += seconds
+        return self._now
+
+
+SYSTEM_CLOCK = SystemClock()
@@ -0,0 +1,136 @@
+import json
+import struct
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from app.services.detections import Detections
+
+
+MAGIC = b"MTDDET\x00\x01"
+SUFFIX = ".mtd"
+
+# kare başlığı: kare zamanı (s), kare index'i, tespit sayısı
+FRAME_HEADER = struct.Struct("<dII")
+# tespit başına 24 bayt
+RECORD_DTYPE = np.dtype([
+    ("track_id", "<i4"),
+    ("cls_id", "<i2"),
+    ("conf", "<f2"),
+    ("xyxy", "<f4", (4,)),
+])
+
+
+class DetectionRecorder:
+    """
+    Kare başına takip edilmiş tespitleri sıkı bir ikili dosyaya yazar (YOLO'suz yeniden oynatma için).
+    Biçim: MAGIC, 4 bayt uzunluk + JSON metadata, ardından her kare için FRAME_HEADER ve
+    RECORD_DTYPE biçiminde n kayıt. Yazma tamponludur; close() çağrılmadan kesilen dosyanın
+    yarım kalan son karesi okurken atlanır.
+    """
+
+    def __init__(self, path, meta: Optional[dict] = None, buffer_size: int = 1 << 20):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.frames = 0
+        self._f = self.path.open("wb", buffering=buffer_size)
+        header = json.dumps(meta or {}, ensure_ascii=False, default=str).encode("utf-8")
+        self._f.write(MAGIC + struct.pack("<I", len(header)) + header)
+
+    def write(self, frame_index: int, ts: float, detections: Detections) -> None:
+        n = len(detections)
+        records = np.empty(n, dtype=RECORD_DTYPE)
+        records["track_id"] = detections.track_ids
+        records["cls_id"] = detections.cls_ids
+        records["conf"] = detections.confs
+        records["xyxy"] = detections.xyxy
+        self._f.write(FRAME_HEADER.pack(ts, frame_index, n))
+        self._f.write(records.tobytes())
+        self.frames += 1
+
+    def flush(self) -> None:
+        self._f.flush()
+
+    def close(self) -> None:
+        if not self._f.closed:
+            self._f.close()
+
+    def __enter__(self) -> "DetectionRecorder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class DetectionLog:
+    """Kayıt dosyasını belleğe alıp kareleri sırayla verir; kare başına tek frombuffer dilimi."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._data = memoryview(self.path.read_bytes())
+        if bytes(self._data[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"Tespit kaydı değil: {path}")
+        pos = len(MAGIC)
+        (size,) = struct.unpack_from("<I", self._data, pos)
+        pos += 4
+        self.meta = json.loads(bytes(self._data[pos:pos + size]).decode("utf-8"))
+        self._start = pos + size
+
+    def scan(self) -> Tuple[int, int]:
+        """(tam kare sayısı, son tam karenin bittiği konum); yalnızca kare başlıkları okunur."""
+        data = self._data
+        pos, end = self._start, len(self._data)
+        header, itemsize = FRAME_HEADER.size, RECORD_DTYPE.itemsize
+        frames = 0
+        while pos + header <= end:
+            _, _, n = FRAME_HEADER.unpack_from(data, pos)
+            if pos + header + n * itemsize > end:
+                break
+            pos += header + n * itemsize
+            frames += 1
+        return frames, pos
+
+    def __iter__(self) -> Iterator[Tuple[int, float, Detections]]:
+        data = self._data
+        pos = self._start
+        end = len(data)
+        header = FRAME_HEADER.size
+        itemsize = RECORD_DTYPE.itemsize
+        while pos + header <= end:
+            ts, frame_index, n = FRAME_HEADER.unpack_from(data, pos)
+            pos += header
+            if pos + n * itemsize > end:
+                break  # yarım kalmış son kare
+            records = np.frombuffer(data, dtype=RECORD_DTYPE, count=n, offset=pos)
+            pos += n * itemsize
+            yield frame_index, ts, Detections(
+                track_ids=records["track_id"].astype(np.int64),
+                cls_ids=records["cls_id"].astype(np.int64),
+                confs=records["conf"].astype(np.float32),
+                xyxy=records["xyxy"].astype(np.float32),
+            )
+
+
+def merge_logs(parts, out_path, meta: Optional[dict] = None, id_stride: int = 0) -> int:
+    """
+    Sıralı parça kayıtlarını tek dosyada birleştirir (ör. paralel replay parçaları); kare sayısını döner.
+    Parçaların tracker'ları ayrı olduğundan ID'ler çakışabilir: id_stride verilirse k. parçanın
+    track ID'lerine k * id_stride eklenir. meta verilmezse ilk parçanın metadata'sı kullanılır.
+    """
+    logs = [DetectionLog(p) for p in parts]
+    if meta is None:
+        meta = logs[0].meta if logs else {}
+
+    out_path = Path(out_path)
+    tmp = out_path.with_name(out_path.name + ".part")
+    with DetectionRecorder(tmp, meta) as recorder:
+        for k, log in enumerate(logs):
+            offset = k * id_stride
+            for frame_index, ts, det in log:
+                if offset:
+                    det.track_ids[det.track_ids >= 0] += offset
+                recorder.write(frame_index, ts, det)
+        frames = recorder.frames
+    tmp.replace(out_path)
+    return frames
@@ -0,0 +1,83 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+
+NO_TRACK = -1
+
+
+@dataclass
+class Detections:
+    """
+    Bir karedeki tespitlerin sütunsal (array tabanlı) kaydı.
+    - track_ids: (N,) int64, track atanmamışsa NO_TRACK (-1)
+    - cls_ids:   (N,) int64
+    - confs:     (N,) float32
+    - xyxy:      (N, 4) float32
+    ultralytics Boxes'tan tek bir toplu kopyayla doldurulur; kutu başına Python nesnesi oluşmaz.
+    """
+
+    track_ids: np.ndarray
+    cls_ids: np.ndarray
+    confs: np.ndarray
+    xyxy: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.cls_ids)
+
+    @classmethod
+    def empty(cls) -> "Detections":
+        return cls(
+            track_ids=np.empty(0, dtype=np.int64),
+            cls_ids=np.empty(0, dtype=np.int64),
+            confs=np.empty(0, dtype=np.float32),
+            xyxy=np.empty((0, 4), dtype=np.float32),
+        )
+
+    @classmethod
+    def from_boxes(cls, boxes) -> "Detections":
+        if boxes is None or len(boxes) == 0:
+            return cls.empty()
+
+        # Boxes.data: [x1, y1, x2, y2, (track_id), conf, cls]
+        data = boxes.data.cpu().numpy()
+        tracked = data.shape[1] == 7
+
+        return cls(
+            track_ids=data[:, 4].astype(np.int64) if tracked else np.full(len(data), NO_TRACK, dtype=np.int64),
+            cls_ids=data[:, -1].astype(np.int64),
+            confs=data[:, -2],
+            xyxy=data[:, :4],
+        )
+
+    @classmethod
+    def from_dicts(cls, tracked) -> "Detections":
+        """Eski {"track_id", "cls_id", "conf", "bbox"} listesi biçiminden dönüştürür."""
+        n = len(tracked)
+        if n == 0:
+            return cls.empty()
+
+        return cls(
+            track_ids=np.fromiter(
+                (NO_TRACK if d.get("track_id") is None else d["track_id"] for d in tracked), dtype=np.int64, count=n
+            ),
+            cls_ids=np.fromiter((d.get("cls_id", -1) for d in tracked), dtype=np.int64, count=n),
+            confs=np.fromiter((d.get("conf", 0.0) for d in tracked), dtype=np.float32, count=n),
+            xyxy=np.array([d["bbox"] for d in tracked], dtype=np.float32).reshape(n, 4),
+        )
+
+    def select(self, mask) -> "Detections":
+        return Detections(
+            track_ids=self.track_ids[mask],
+            cls_ids=self.cls_ids[mask],
+            confs=self.confs[mask],
+            xyxy=self.xyxy[mask],
+        )
+
+    def to_dicts(self):
+        return [
+            {"track_id": None if tid == NO_TRACK else tid, "cls_id": cls_id, "conf": conf, "bbox": bbox}
+            for tid, cls_id, conf, bbox in zip(
+                self.track_ids.tolist(), self.cls_ids.tolist(), self.confs.tolist(), self.xyxy.tolist()
+            )
+        ]
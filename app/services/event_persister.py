@@ -0,0 +1,71 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from app.services.event_rules import ProductEvent
+
+
+@dataclass
+class EventRecord:
+    camera_id: int
+    timestamp: str
+    bottle_id: Optional[int]
+    message: str
+    snapshot_path: str = ""
+    clip_path: str = ""
+    ts_epoch: float = 0.0
+    kind: str = ""
+    cls_id: Optional[int] = None
+    class_name: str = ""
+    severity: str = ""
+
+
+class EventPersister:
+    """
+    Event'in snapshot/klibini SnapshotService'e devreder ve (db verilmişse) veri tabanına kaydeder.
+    db=None iken yalnızca dosyalar yazılır; kayıt çağırana bırakılır
+    (ör. replay worker süreçleri kayıtları ana sürece döndürür).
+    """
+
+    def __init__(self, db, snapshots):
+        self.db = db
+        self.snapshots = snapshots
+
+    def persist(
+        self, camera_id: int, ev: ProductEvent, annotated, ts: float, when: Optional[datetime] = None
+    ) -> EventRecord:
+        when = when or datetime.now()
+        snap_path, clip_path = self.snapshots.save_event(
+            camera_id, ts, annotated, when, ev.track_id, ev.class_name, last_seen=ev.last_seen
+        )
+
+        record = EventRecord(
+            camera_id=camera_id,
+            timestamp=when.strftime("%Y-%m-%d %H:%M:%S"),
+            bottle_id=ev.track_id,
+            message=ev.message,
+            snapshot_path=snap_path,
+            clip_path=clip_path,
+            ts_epoch=when.timestamp(),
+            kind=ev.kind,
+            cls_id=ev.cls_id,
+            class_name=ev.class_name,
+            severity=ev.severity,
+        )
+        if self.db is not None:
+            self.insert(record)
+        return record
+
+    def insert(self, record: EventRecord) -> None:
+        self.db.insert_event(
+            record.timestamp, record.bottle_id, record.message, record.snapshot_path, record.camera_id,
+            record.clip_path, record.ts_epoch, record.kind, record.cls_id, record.class_name, record.severity
+        )
+
+    def insert_many(self, records) -> None:
+        # Database.insert_events ile tek transaction
+        self.db.insert_events([
+            (r.timestamp, r.bottle_id, r.message, r.snapshot_path, r.camera_id, r.clip_path, r.ts_epoch,
+             r.kind, r.cls_id, r.class_name, r.severity)
+            for r in records
+        ])
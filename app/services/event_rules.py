@@ -0,0 +1,158 @@
+import json
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+ROLE_NONE, ROLE_PERSON, ROLE_PRODUCT = 0, 1, 2
+
+PROXIMITY_MODES = ("inside", "near", "none")
+SEVERITIES = ("info", "warning", "critical")
+
+# kutu rengi (BGR): kişi, ürün, ARMED ürün
+PERSON_COLOR = (0, 255, 0)
+PRODUCT_COLOR = (255, 255, 0)
+ARMED_COLOR = (0, 0, 255)
+
+
+@dataclass(frozen=True)
+class ProductRule:
+    """
+    Tek ürün sınıfının kuralı. None bırakılan süre/uzaklık değerleri EventService'in
+    genel ayarından gelir (GUI kaydırıcıları bunları değiştirir).
+    proximity:
+      - "inside": ürün merkezi bir kişi kutusunun içinde
+      - "near":   ürün merkezi bir kişi kutusuna en fazla near_distance piksel uzakta
+      - "none":   kişi şartı yok; ürün near_time boyunca görünürse ARMED olur (ör. raf kontrolü)
+    """
+    cls_id: int
+    name: str
+    near_time: Optional[float] = None
+    disappear_time: Optional[float] = None
+    proximity: str = "inside"
+    near_distance: Optional[float] = None
+    severity: str = "warning"
+
+    def __post_init__(self):
+        if self.proximity not in PROXIMITY_MODES:
+            raise ValueError(f"Geçersiz proximity: {self.proximity} (beklenen: {', '.join(PROXIMITY_MODES)})")
+        if self.severity not in SEVERITIES:
+            raise ValueError(f"Geçersiz severity: {self.severity} (beklenen: {', '.join(SEVERITIES)})")
+
+
+@dataclass
+class RuleConfig:
+    person_classes: Dict[int, str] = field(default_factory=lambda: {0: "person"})
+    products: List[ProductRule] = field(default_factory=lambda: [ProductRule(39, "bottle")])
+
+    @property
+    def classes(self) -> List[int]:
+        """Modelden istenecek sınıflar (InferenceService.classes)."""
+        return sorted(set(self.person_classes) | {r.cls_id for r in self.products})
+
+
+def load_rules(path) -> RuleConfig:
+    """
+    JSON kural dosyasını okur:
+        {"persons": {"0": "person"},
+         "products": [{"cls_id": 39, "name": "bottle", "near_time": 2.0, "disappear_time": 3.0,
+                       "proximity": "near", "near_distance": 40, "severity": "critical"}, ...]}
+    """
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    persons = {int(k): str(v) for k, v in data.get("persons", {"0": "person"}).items()}
+    products = [ProductRule(**{**p, "cls_id": int(p["cls_id"])}) for p in data.get("products", [])]
+    if not products:
+        raise ValueError(f"Kural dosyasında ürün sınıfı yok: {path}")
+
+    seen = set(persons)
+    for rule in products:
+        if rule.cls_id in seen:
+            raise ValueError(f"Sınıf birden fazla tanımlı: {rule.cls_id}")
+        seen.add(rule.cls_id)
+    return RuleConfig(persons, products)
+
+
+class CompiledRules:
+    """
+    RuleConfig'in kare başına değerlendirme için sınıf id'sine göre indekslenen tablolara derlenmiş hali.
+    Her tespit için kural araması tek bir dizi indekslemesidir (sınıf sayısından bağımsız).
+    Tablodaki tüm değerler çözümlenmiştir (None yerine genel ayar yazılır); genel ayar değişince
+    EventService tabloları yeniden derler.
+    """
+
+    def __init__(self, config: RuleConfig, near_time: float, disappear_time: float, near_distance: float):
+        self.config = config
+        size = max(config.classes) + 1
+        self.size = size
+
+        # son eleman tablo dışı sınıflar içindir (bkz. roles())
+        self.role = np.zeros(size + 1, dtype=np.int8)
+        self.is_person = np.zeros(size, dtype=bool)
+        self.is_product = np.zeros(size, dtype=bool)
+        self.rule_index = np.full(size, -1, dtype=np.int64)
+        self.near_time = np.zeros(size, dtype=np.float64)
+        self.disappear_time = np.zeros(size, dtype=np.float64)
+        self.radius = np.zeros(size, dtype=np.float64)
+        self.needs_person = np.zeros(size, dtype=bool)
+        self.names = [f"class {i}" for i in range(size)]
+
+        self.is_person[list(config.person_classes)] = True
+        self.role[list(config.person_classes)] = ROLE_PERSON
+        for cls_id, name in config.person_classes.items():
+            self.names[cls_id] = name
+
+        self.rules: List[ProductRule] = []
+        for i, rule in enumerate(config.products):
+            rule = replace(
+                rule,
+                near_time=near_time if rule.near_time is None else rule.near_time,
+                disappear_time=disappear_time if rule.disappear_time is None else rule.disappear_time,
+                near_distance=(near_distance if rule.near_distance is None else rule.near_distance)
+                if rule.proximity == "near" else 0.0,
+            )
+            self.rules.append(rule)
+            c = rule.cls_id
+            self.is_product[c] = True
+            self.role[c] = ROLE_PRODUCT
+            self.rule_index[c] = i
+            self.near_time[c] = rule.near_time
+            self.disappear_time[c] = rule.disappear_time
+            self.radius[c] = rule.near_distance
+            self.needs_person[c] = rule.proximity != "none"
+            self.names[c] = rule.name
+
+    def roles(self, cls_ids: np.ndarray) -> np.ndarray:
+        """Tespit başına ROLE_*; tablo dışındaki (ve -1) sınıflar son elemana düşer: ROLE_NONE."""
+        return self.role[np.clip(cls_ids, -1, self.size)]
+
+    def name(self, cls_id: int) -> Optional[str]:
+        return self.names[cls_id] if 0 <= cls_id < self.size else None
+
+    def color(self, cls_id: int, armed: bool):
+        if 0 <= cls_id < self.size:
+            if self.is_person[cls_id]:
+                return PERSON_COLOR
+            if self.is_product[cls_id]:
+                return ARMED_COLOR if armed else PRODUCT_COLOR
+        return None
+
+
+@dataclass(frozen=True)
+class ProductEvent:
+    """EventService'in ürettiği tipli olay; mesaj metni yalnızca gösterim/kayıt içindir."""
+    kind: str            # şimdilik yalnızca "disappeared"
+    track_id: int
+    cls_id: int
+    class_name: str
+    severity: str
+    ts: float            # olayın üretildiği karenin zamanı
+    last_seen: float     # ürünün son görüldüğü zaman
+
+    @property
+    def message(self) -> str:
+        return f"ŞÜPHELİ OLAY: {self.class_name} ID {self.track_id} kayboldu!"
+
+    def __str__(self) -> str:
+        return self.message
@@ -0,0 +1,181 @@
+import csv
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+
+# format -> dosya uzantısı
+FORMATS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+}
+
+EXPORT_COLUMNS = (
+    "id", "timestamp", "ts_epoch", "camera_id", "bottle_id", "message", "snapshot_path", "clip_path",
+    "kind", "cls_id", "class_name", "severity", "notes",
+)
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise RuntimeError("Parquet/Arrow export için pyarrow gerekli: pip install pyarrow") from None
+    return pyarrow
+
+
+def available_formats():
+    try:
+        _require_pyarrow()
+    except RuntimeError:
+        return ["csv"]
+    return list(FORMATS)
+
+
+class _CsvSink:
+    def __init__(self, path: Path):
+        self._f = path.open("w", newline="", encoding="utf-8-sig")
+        self._writer = csv.writer(self._f)
+        self._writer.writerow(EXPORT_COLUMNS)
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._f.close()
+
+
+class _ArrowSink:
+    """Her chunk bir record batch (Parquet'te row group) olarak yazılır; bellekte yalnızca bir chunk tutulur."""
+
+    def __init__(self, path: Path, fmt: str):
+        pa = _require_pyarrow()
+        self._pa = pa
+        self.schema = pa.schema([
+            ("id", pa.int64()),
+            ("timestamp", pa.string()),
+            ("ts_epoch", pa.float64()),
+            ("camera_id", pa.int64()),
+            ("bottle_id", pa.int64()),
+            ("message", pa.string()),
+            ("snapshot_path", pa.string()),
+            ("clip_path", pa.string()),
+            ("kind", pa.string()),
+            ("cls_id", pa.int64()),
+            ("class_name", pa.string()),
+            ("severity", pa.string()),
+            ("notes", pa.string()),
+        ])
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(str(path), self.schema, compression="zstd")
+        else:
+            import pyarrow.ipc as ipc
+            self._writer = ipc.new_file(str(path), self.schema)
+
+    def write(self, rows):
+        columns = list(zip(*rows))
+        batch = self._pa.record_batch(
+            [self._pa.array(col, type=field.type) for col, field in zip(columns, self.schema)],
+            schema=self.schema,
+        )
+        self._writer.write_batch(batch)
+
+    def close(self):
+        self._writer.close()
+
+
+class ExportJob:
+    """
+    Event tablosunu arka plan thread'inde, parça parça okuyarak dosyaya yazar.
+    - satırlar Database.iter_events ile chunk_size'lık parçalar halinde akar; bellek kullanımı
+      tablo boyutundan bağımsızdır
+    - ilerleme done/total ile okunur (GUI bir QTimer ile yoklar); cancel() işi bir sonraki chunk'ta durdurur
+    - dosya önce .part uzantısıyla yazılır, yalnızca başarıyla bitince asıl adına taşınır
+    """
+
+    def __init__(self, db, out_path: Path, fmt: str = "csv", chunk_size: int = 5000, **filters):
+        if fmt not in FORMATS:
+            raise ValueError(f"Bilinmeyen export formatı: {fmt}")
+        if fmt != "csv":
+            _require_pyarrow()
+
+        self.db = db
+        self.out_path = Path(out_path)
+        self.fmt = fmt
+        self.chunk_size = chunk_size
+        self.filters = filters
+
+        self.total = 0
+        self.done = 0
+        self.error: Optional[str] = None
+        self.elapsed = 0.0
+
+        self._cancel = threading.Event()
+        self._finished = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="event-export", daemon=True)
+
+    def start(self) -> "ExportJob":
+        self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    @property
+    def finished(self) -> bool:
+        return self._finished.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def progress(self) -> float:
+        return min(1.0, self.done / self.total) if self.total else (1.0 if self.finished else 0.0)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._finished.wait(timeout)
+
+    def _open_sink(self, path: Path):
+        if self.fmt == "csv":
+            return _CsvSink(path)
+        return _ArrowSink(path, self.fmt)
+
+    def _run(self):
+        started = time.perf_counter()
+        tmp_path = self.out_path.with_name(self.out_path.name + ".part")
+        sink = None
+        try:
+            self.out_path.parent.mkdir(parents=True, exist_ok=True)
+            self.total = self.db.count_events(**self.filters)
+            sink = self._open_sink(tmp_path)
+
+            for names, rows in self.db.iter_events(self.chunk_size, **self.filters):
+                if self._cancel.is_set():
+                    break
+                # eski şemalarda olmayan sütunlar boş kalır
+                idx = [names.index(c) if c in names else None for c in EXPORT_COLUMNS]
+                sink.write([tuple(r[i] if i is not None else None for i in idx) for r in rows])
+                self.done += len(rows)
+
+            sink.close()
+            sink = None
+            if self._cancel.is_set():
+                tmp_path.unlink(missing_ok=True)
+            else:
+                os.replace(tmp_path, self.out_path)
+        except Exception as e:
+            self.error = str(e)
+            if sink is not None:
+                try:
+                    sink.close()
+                except Exception:
+                    pass
+            tmp_path.unlink(missing_ok=True)
+        finally:
+            self.elapsed = time.perf_counter() - started
+            self._finished.set()
@@ -0,0 +1,88 @@
+import threading
+from collections import deque
+
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+BLOCK = "block"
+
+POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+
+class FrameQueue:
+    """
+    Pipeline aşamaları arasındaki sınırlı kuyruk.
+    - drop_oldest: kuyruk doluysa en eski öğe atılır (önizleme için "newest-wins").
+    - drop_newest: kuyruk doluysa gelen öğe atılır.
+    - block: yer açılana (veya kuyruk kapanana) kadar üretici bekler.
+    """
+
+    def __init__(self, maxsize: int = 1, policy: str = DROP_OLDEST):
+        if maxsize < 1:
+            raise ValueError(f"maxsize en az 1 olmalı (maxsize={maxsize})")
+        if policy not in POLICIES:
+            raise ValueError(f"Bilinmeyen drop policy: {policy}")
+
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._items)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def put(self, item, timeout=None) -> bool:
+        with self._cond:
+            if self._closed:
+                return False
+
+            if len(self._items) >= self.maxsize:
+                if self.policy == DROP_OLDEST:
+                    self._items.popleft()
+                    self.dropped += 1
+                elif self.policy == DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                else:
+                    has_room = self._cond.wait_for(
+                        lambda: self._closed or len(self._items) < self.maxsize, timeout
+                    )
+                    if not has_room or self._closed:
+                        return False
+
+            self._items.append(item)
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self._closed, timeout):
+                return None
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def get_nowait(self):
+        return self.get(timeout=0)
+
+    def drain(self) -> list:
+        with self._cond:
+            items = list(self._items)
+            self._items.clear()
+            self._cond.notify_all()
+            return items
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
@@ -1,21 +1,225 @@
-from ultralytics import YOLO
+import threading
+import time
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.services.event_rules import RuleConfig
+from app.services.model_backends import backend_for, resolve_model, static_input_size
 
 
 class InferenceService:
-    def __init__(self, model_path: str = "yolov8n.pt", conf: float = 0.45):
-        self.model = YOLO(model_path)
+    """
+    - track(): tek akış, ultralytics'in kendi tracker'ı (persist=True).
+    - track_batch(): çok akış; tüm kareler tek model çağrısında işlenir,
+      her akışın kendi ByteTrack durumu vardır.
+    Aynı örnekte iki yol karıştırılmamalıdır (track() model callback'lerine tracker ekler).
+    Backend ağırlık yolundan seçilir (.pt PyTorch, .onnx ONNX Runtime, *_openvino_model OpenVINO);
+    backend="onnx"/"openvino" verilirse .pt ağırlığının dışa aktarılmış karşılığı kullanılır
+    (bkz. python -m app.model_export). Tüm backend'lerde track()/track_batch() sonuçları aynı biçimdedir.
+    Statik girişle dışa aktarılmış modellerde (eski OpenVINO export'ları gibi) kareler dışa aktarılan
+    boyutta tek tek verilir; set_imgsz bu modellerde etkisizdir.
+    Model kurucuda değil load() ile yüklenir (ultralytics/torch importu dahil); load() arka plan
+    thread'inden çağrılabilir. Yüklenmeden track()/track_batch() çağrılırsa yükleme o anda yapılır.
+    """
+
+    def __init__(
+        self,
+        model_path: str = "yolov8n.pt",
+        conf: float = 0.45,
+        tracker_cfg: str = "bytetrack.yaml",
+        backend: str = None,
+        int8: bool = False,
+        imgsz: int = 640,
+        classes: Optional[Sequence[int]] = None,
+    ):
+        self.model_path = resolve_model(model_path, backend, int8)
+        self.backend = backend_for(self.model_path)
+        self.model = None
+        self.static_imgsz = None    # statik girişli modelde (yükseklik, genişlik); load()'da okunur
+        self.load_seconds = None    # ağırlık yükleme (import dahil)
+        self.warmup_seconds = None  # ilk (ısınma) çıkarımı
+        self._load_lock = threading.Lock()
         self.conf = conf
-        self.classes = [0, 39]  # person=0, bottle=39
+        self.imgsz = imgsz
+        # modelden yalnızca kurallarda geçen sınıflar istenir (bkz. event_rules.RuleConfig.classes)
+        self.classes = list(classes) if classes is not None else RuleConfig().classes
+
+        self.tracker_cfg = tracker_cfg
+        self.tracker_frame_rate = 30
+        self._stream_trackers = {}  # stream_id -> BYTETracker
+        self._last_tracks = {}      # stream_id -> son track kutuları (x1, y1, x2, y2, conf, cls)
+
+    @property
+    def ready(self) -> bool:
+        return self.model is not None
+
+    def load(self, warmup: bool = True) -> "InferenceService":
+        """
+        Modeli yükler; warmup=True ise boş bir kareyle bir kez çalıştırır (ilk çağrıdaki
+        backend başlatma ve bellek ayırma maliyeti ilk gerçek kareye binmesin). Birden fazla
+        thread'den çağrılabilir; yükleme bir kez yapılır, diğerleri bitmesini bekler.
+        """
+        with self._load_lock:
+            if self.model is not None:
+                return self
+
+            started = time.perf_counter()
+            from ultralytics import YOLO
+
+            # dışa aktarılmış modellerde görev metadata'dan tahmin edilmesin
+            model = YOLO(self.model_path, task="detect")
+            self.static_imgsz = static_input_size(self.model_path)
+            self.load_seconds = time.perf_counter() - started
+
+            if warmup:
+                started = time.perf_counter()
+                h, w = self.static_imgsz or (self.imgsz, self.imgsz)
+                model.predict(
+                    np.zeros((h, w, 3), dtype=np.uint8),
+                    conf=self.conf,
+                    classes=self.classes,
+                    imgsz=self._input_size(),
+                    verbose=False
+                )
+                self.warmup_seconds = time.perf_counter() - started
+            self.model = model
+        return self
 
     def set_conf(self, conf: float) -> None:
         self.conf = float(conf)
 
+    def set_imgsz(self, imgsz: int) -> None:
+        # sonraki çağrıdan itibaren geçerli; statik girişli modellerde dışa aktarılan boyut kullanılır
+        self.imgsz = int(imgsz)
+
+    def _input_size(self):
+        return list(self.static_imgsz) if self.static_imgsz is not None else self.imgsz
+
     def track(self, frame_bgr):
+        if self.model is None:
+            self.load()
         results = self.model.track(
             frame_bgr,
             conf=self.conf,
             classes=self.classes,
+            imgsz=self._input_size(),
             persist=True,
             verbose=False
         )
-        return results
\ No newline at end of file
+        return results
+
+    def reset_trackers(self, frame_rate: float = 30) -> None:
+        # frame_rate: tracker'a giden kare hızı (kare atlamada fps / stride)
+        self.tracker_frame_rate = frame_rate
+        self._stream_trackers = {}
+        self._last_tracks = {}
+
+    def _stream_tracker(self, stream_id):
+        tracker = self._stream_trackers.get(stream_id)
+        if tracker is None:
+            from ultralytics.trackers.byte_tracker import BYTETracker
+            from ultralytics.utils import IterableSimpleNamespace, yaml_load
+            from ultralytics.utils.checks import check_yaml
+
+            cfg = IterableSimpleNamespace(**yaml_load(check_yaml(self.tracker_cfg)))
+            tracker = BYTETracker(args=cfg, frame_rate=max(1, round(self.tracker_frame_rate)))
+            self._stream_trackers[stream_id] = tracker
+        return tracker
+
+    def track_batch(self, frames_bgr, stream_ids, crops=None):
+        """
+        Kare başına bir Results içeren liste döner; her eleman track()[0] ile aynı biçimdedir.
+        crops: kare başına (x1, y1, x2, y2) veya None. Kırpılan karede model yalnızca o bölgeyi görür;
+        kutular tam kare koordinatına taşınır ve son track'lerden bölgenin dışında kalanlar tracker'a
+        aynen verilir, böylece kırpma dışında kalan nesnelerin ID'leri korunur.
+        """
+        import torch
+
+        if self.model is None:
+            self.load()
+        frames_bgr = list(frames_bgr)
+        if crops is None:
+            crops = [None] * len(frames_bgr)
+        else:
+            crops = [self._expand_crop(c, sid, f.shape) for c, sid, f in zip(crops, stream_ids, frames_bgr)]
+        inputs = [f if c is None else f[c[1]:c[3], c[0]:c[2]] for f, c in zip(frames_bgr, crops)]
+
+        if self.static_imgsz is not None and len(inputs) > 1:
+            # statik girişli model batch=1 kabul eder: kareler tek tek verilir
+            results = [
+                r for x in inputs
+                for r in self.model.predict(x, conf=self.conf, classes=self.classes,
+                                            imgsz=self._input_size(), verbose=False)
+            ]
+        else:
+            results = self.model.predict(
+                inputs,
+                conf=self.conf,
+                classes=self.classes,
+                imgsz=self._input_size(),
+                verbose=False
+            )
+
+        # ultralytics.trackers.track.on_predict_postprocess_end ile aynı adımlar,
+        # fakat tracker akış kimliğine göre seçilir
+        for i, stream_id in enumerate(stream_ids):
+            tracker = self._stream_tracker(stream_id)
+            crop = crops[i]
+            if crop is None:
+                det = results[i].boxes.cpu().numpy()
+            else:
+                det = self._merge_crop(results[i], frames_bgr[i], crop, stream_id)
+            if len(det) == 0:
+                self._last_tracks[stream_id] = None
+                continue
+            tracks = tracker.update(det, frames_bgr[i])
+            if len(tracks) == 0:
+                self._last_tracks[stream_id] = None
+                continue
+            # x1, y1, x2, y2, conf, cls
+            self._last_tracks[stream_id] = tracks[:, [0, 1, 2, 3, 5, 6]]
+            if crop is None:
+                idx = tracks[:, -1].astype(int)
+                results[i] = results[i][idx]
+            results[i].update(boxes=torch.as_tensor(tracks[:, :-1]))
+
+        return results
+
+    def _expand_crop(self, crop, stream_id, shape):
+        # sınırdan taşan nesneler kesilmesin: bölgeyle kesişen son track kutuları bölgeye katılır
+        last = self._last_tracks.get(stream_id)
+        if crop is None or last is None or not len(last):
+            return crop
+        x1, y1, x2, y2 = crop
+        hit = (last[:, 2] > x1) & (last[:, 0] < x2) & (last[:, 3] > y1) & (last[:, 1] < y2)
+        if not hit.any():
+            return crop
+        boxes = last[hit]
+        return (
+            max(0, min(x1, int(boxes[:, 0].min()))),
+            max(0, min(y1, int(boxes[:, 1].min()))),
+            min(shape[1], max(x2, int(np.ceil(boxes[:, 2].max())))),
+            min(shape[0], max(y2, int(np.ceil(boxes[:, 3].max())))),
+        )
+
+    def _merge_crop(self, result, frame, crop, stream_id):
+        import torch
+        from ultralytics.engine.results import Boxes
+
+        x1, y1, x2, y2 = crop
+        data = result.boxes.data.cpu().numpy().copy()
+        data[:, [0, 2]] += x1
+        data[:, [1, 3]] += y1
+
+        # sonuç tam kareye aitmiş gibi görünsün (kutular artık tam kare koordinatında)
+        result.orig_img = frame
+        result.orig_shape = frame.shape[:2]
+        result.update(boxes=torch.as_tensor(data))
+
+        last = self._last_tracks.get(stream_id)
+        if last is not None and len(last):
+            # kırpma bölgesiyle hiç kesişmeyen kutular hareketsiz kabul edilip taşınır
+            outside = (last[:, 2] <= x1) | (last[:, 0] >= x2) | (last[:, 3] <= y1) | (last[:, 1] >= y2)
+            data = np.concatenate([data, last[outside].astype(data.dtype)])
+        return Boxes(data, result.orig_shape)
@@ -0,0 +1,101 @@
+import logging
+import logging.handlers
+import queue
+import time
+from collections import deque
+from pathlib import Path
+from typing import Optional
+
+
+class LogEntry:
+    __slots__ = ("ts", "message", "count")
+
+    def __init__(self, ts: float, message: str):
+        self.ts = ts
+        self.message = message
+        self.count = 1
+
+    def text(self) -> str:
+        stamp = time.strftime("%H:%M:%S", time.localtime(self.ts))
+        return f"{stamp}  {self.message}" if self.count == 1 else f"{stamp}  {self.message}  (x{self.count})"
+
+
+class LogBuffer:
+    """
+    Sabit kapasiteli log halkası: dolunca en eski satır atılır, bellek vardiya boyunca sabit kalır.
+    Art arda gelen aynı mesaj yeni satır açmaz, son satırın sayacını artırır.
+    Görünüm değişiklikleri take_changes() ile toplu alır: (baştan atılan, sona eklenen satır sayısı,
+    son satır güncellendi mi). Yalnızca tek thread'den (GUI) kullanılır.
+    """
+
+    def __init__(self, capacity: int = 5000):
+        if capacity < 1:
+            raise ValueError(f"capacity en az 1 olmalı (capacity={capacity})")
+        self.capacity = capacity
+        self.total = 0      # eklenen mesaj (tekrarlar dahil)
+        self.collapsed = 0  # son satıra katlanan tekrar
+        self.evicted = 0    # kapasite yüzünden atılan satır
+        self._entries = deque(maxlen=capacity)
+        self._removed = 0
+        self._added = 0
+        self._updated = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getitem__(self, row: int) -> LogEntry:
+        return self._entries[row]
+
+    def append(self, message: str, ts: Optional[float] = None) -> None:
+        ts = time.time() if ts is None else ts
+        self.total += 1
+        entries = self._entries
+        if entries and entries[-1].message == message:
+            last = entries[-1]
+            last.count += 1
+            last.ts = ts
+            self.collapsed += 1
+            self._updated = True
+            return
+
+        if len(entries) == self.capacity:
+            self.evicted += 1
+            self._removed += 1
+        entries.append(LogEntry(ts, message))
+        self._added += 1
+
+    def take_changes(self):
+        changes = (self._removed, self._added, self._updated)
+        self._removed = self._added = 0
+        self._updated = False
+        return changes
+
+    def clear(self) -> None:
+        self._removed += len(self._entries)
+        self._added = 0
+        self._updated = False
+        self._entries.clear()
+
+
+def start_rotating_log(path, max_bytes: int = 5 * 1024 * 1024, backups: int = 5,
+                       level: int = logging.INFO) -> logging.handlers.QueueListener:
+    """
+    Kök logger'ı dönen (rotating) bir log dosyasına bağlar. Çağıran thread yalnızca kuyruğa ekler;
+    dosyaya yazma ve dosya döndürme QueueListener thread'inde yapılır. Kapanışta stop() çağrılmalıdır.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    file_handler = logging.handlers.RotatingFileHandler(
+        path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+    )
+    file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    records = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(records))
+    if root.level == logging.NOTSET or root.level > level:
+        root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(records, file_handler, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -0,0 +1,312 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+
+# saniye cinsinden aşama süreleri için (0.5 ms .. 5 s)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# uçtan uca gecikme için daha sık kovalar (uyarlamalı kontrol p95'i bunlardan hesaplar)
+FRAME_LATENCY_BUCKETS = (
+    0.01, 0.02, 0.03, 0.05, 0.075, 0.1, 0.125, 0.15, 0.2, 0.25, 0.3, 0.4, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0
+)
+PREFIX = "mtd_"
+
+
+class _Shards:
+    """
+    Her thread kendi önceden ayrılmış sayaç listesine yazar; okuma (scrape) tüm parçaları toplar.
+    Sıcak yolda kilit yoktur; kilit yalnızca bir thread ilk kez yazdığında alınır.
+    Biten thread'lerin parçaları tutulur, böylece sayaçlar geri gitmez.
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._all = []
+        self._lock = threading.Lock()
+
+    def get(self) -> list:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = [0] * self._size
+            with self._lock:
+                self._all.append(values)
+            self._local.values = values
+            return values
+
+    def total(self) -> list:
+        with self._lock:
+            shards = list(self._all)
+        out = [0] * self._size
+        for values in shards:
+            for i, v in enumerate(values):
+                out[i] += v
+        return out
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self):
+        self._shards = _Shards(1)
+
+    def inc(self, n=1) -> None:
+        self._shards.get()[0] += n
+
+    def value(self):
+        return self._shards.total()[0]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        # [kova sayıları..., +Inf, toplam]
+        self._shards = _Shards(len(self.buckets) + 2)
+
+    def observe(self, value: float) -> None:
+        values = self._shards.get()
+        values[bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    def state(self) -> Tuple[list, float]:
+        values = self._shards.total()
+        return values[:-1], values[-1]
+
+    def quantile(self, q: float, counts=None) -> Optional[float]:
+        """Kova sınırları arasında doğrusal yaklaşık değer; gözlem yoksa None."""
+        counts = counts if counts is not None else self.state()[0]
+        total = sum(counts)
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            if count and seen + count >= rank:
+                if bound == float("inf"):
+                    return lower
+                return lower + (bound - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        return lower
+
+
+class Callback:
+    """Değeri okunduğu anda fn() ile hesaplanan metrik (kuyruk derinliği, mevcut sayaçlar)."""
+
+    def __init__(self, kind: str, fn: Callable[[], float]):
+        self.kind = kind
+        self.fn = fn
+
+    def value(self):
+        try:
+            return self.fn()
+        except Exception:
+            return float("nan")
+
+
+def _label_key(labels: dict) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key, extra=()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{v}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _format_value(v) -> str:
+    if isinstance(v, float):
+        if v != v:
+            return "NaN"
+        if v in (float("inf"), float("-inf")):
+            return "+Inf" if v > 0 else "-Inf"
+        return repr(v)
+    return str(v)
+
+
+class MetricsRegistry:
+    """
+    Prometheus metin biçiminde dışa aktarılabilen metrikler.
+    Metrikler bir kez oluşturulup referansı saklanmalıdır (sıcak yolda isim/etiket araması yapılmaz);
+    aynı isim ve etiketlerle tekrar çağrı mevcut metriği döner.
+    """
+
+    def __init__(self, prefix: str = PREFIX):
+        self.prefix = prefix
+        self._families: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name: str, help_text: str, labels: dict, factory, kind: str, replace: bool = False):
+        name = self.prefix + name
+        key = _label_key(labels)
+        with self._lock:
+            family = self._families.setdefault(name, {"help": help_text, "kind": kind, "children": {}})
+            if family["kind"] != kind:
+                raise ValueError(f"Metrik türü uyuşmuyor: {name}")
+            children = family["children"]
+            if replace or key not in children:
+                children[key] = factory()
+            return children[key]
+
+    def counter(self, name: str, help_text: str, **labels) -> Counter:
+        return self._get(name, help_text, labels, Counter, "counter")
+
+    def histogram(self, name: str, help_text: str, buckets=LATENCY_BUCKETS, **labels) -> Histogram:
+        return self._get(name, help_text, labels, lambda: Histogram(buckets), "histogram")
+
+    def gauge(self, name: str, help_text: str, fn: Callable[[], float], **labels) -> Callback:
+        return self._get(name, help_text, labels, lambda: Callback("gauge", fn), "gauge", replace=True)
+
+    def counter_fn(self, name: str, help_text: str, fn: Callable[[], float], **labels) -> Callback:
+        # başka bir nesnenin tuttuğu, yalnızca artan sayaç (ör. FrameQueue.dropped)
+        return self._get(name, help_text, labels, lambda: Callback("counter", fn), "counter", replace=True)
+
+    def _items(self):
+        with self._lock:
+            return [(name, f["help"], f["kind"], list(f["children"].items())) for name, f in self._families.items()]
+
+    def render(self) -> str:
+        lines = []
+        for name, help_text, kind, children in self._items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, metric in children:
+                if kind == "histogram":
+                    counts, total = metric.state()
+                    cumulative = 0
+                    for bound, count in zip(metric.buckets + (float("inf"),), counts):
+                        cumulative += count
+                        le = _format_value(float(bound))
+                        lines.append(f"{name}_bucket{_format_labels(key, [('le', le)])} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {_format_value(float(total))}")
+                    lines.append(f"{name}_count{_format_labels(key)} {cumulative}")
+                else:
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(metric.value())}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        """JSON'a uygun özet: sayaç/gauge değerleri, histogramlar için count/sum/p50/p95/p99."""
+        out = {}
+        for name, _help, kind, children in self._items():
+            for key, metric in children:
+                label = name + _format_labels(key)
+                if kind == "histogram":
+                    counts, total = metric.state()
+                    out[label] = {
+                        "count": sum(counts),
+                        "sum": round(total, 6),
+                        **{f"p{int(q * 100)}": metric.quantile(q, counts) for q in (0.5, 0.95, 0.99)},
+                    }
+                else:
+                    out[label] = metric.value()
+        return out
+
+
+class _Handler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = None
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+class MetricsServer:
+    """GET /metrics için yerel HTTP sunucusu (varsayılan yalnızca 127.0.0.1)."""
+
+    def __init__(self, registry: MetricsRegistry, port: int = 9108, host: str = "127.0.0.1"):
+        handler = type("MetricsHandler", (_Handler,), {"registry": registry})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self) -> "MetricsServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class StatsFileWriter:
+    """
+    registry.snapshot()'ı her interval saniyede JSON satırı olarak dosyaya ekler.
+    Sayaçlar için dakika başına artış (ör. event/dk) da yazılır.
+    Dosya max_bytes'ı geçince <ad>.1 olarak döndürülür (tek yedek).
+    """
+
+    def __init__(self, registry: MetricsRegistry, path: Path, interval: float = 10.0, max_bytes: int = 10_000_000):
+        self.registry = registry
+        self.path = Path(path)
+        self.interval = interval
+        self.max_bytes = max_bytes
+
+        self._prev = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-file", daemon=True)
+
+    def start(self) -> "StatsFileWriter":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(self.interval + 1.0)
+        self.write()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def _counters(self) -> dict:
+        out = {}
+        for name, _help, kind, children in self.registry._items():
+            if kind == "counter":
+                for key, metric in children:
+                    out[name + _format_labels(key)] = metric.value()
+        return out
+
+    def write(self) -> None:
+        now = time.time()
+        counters = self._counters()
+        rates = {}
+        if self._prev is not None:
+            prev_ts, prev = self._prev
+            minutes = max(1e-9, (now - prev_ts) / 60.0)
+            rates = {k: round((v - prev.get(k, 0)) / minutes, 3) for k, v in counters.items()}
+        self._prev = (now, counters)
+
+        line = json.dumps({"ts": round(now, 3), "metrics": self.registry.snapshot(), "per_minute": rates},
+                          ensure_ascii=False, default=str)
+        try:
+            if self.path.exists() and self.path.stat().st_size > self.max_bytes:
+                self.path.replace(self.path.with_name(self.path.name + ".1"))
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError:
+            pass
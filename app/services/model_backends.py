@@ -0,0 +1,191 @@
+import re
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+BACKENDS = ("torch", "onnx", "openvino")
+
+# ultralytics'in OpenVINO export klasör son eki
+OPENVINO_SUFFIX = "_openvino_model"
+
+
+def backend_for(model_path) -> str:
+    """Ağırlık yolundan çalışma zamanı: .pt -> torch, .onnx -> onnx, *_openvino_model/ veya .xml -> openvino."""
+    path = Path(str(model_path))
+    if path.suffix == ".onnx":
+        return "onnx"
+    if path.suffix == ".xml" or path.name.endswith(OPENVINO_SUFFIX):
+        return "openvino"
+    return "torch"
+
+
+def exported_path(weights, backend: str, int8: bool = False) -> Path:
+    """yolov8n.pt -> yolov8n.onnx, yolov8n_int8.onnx, yolov8n_openvino_model/, yolov8n_int8_openvino_model/"""
+    weights = Path(str(weights))
+    stem = weights.stem + ("_int8" if int8 else "")
+    if backend == "onnx":
+        return weights.with_name(f"{stem}.onnx")
+    if backend == "openvino":
+        return weights.with_name(f"{stem}{OPENVINO_SUFFIX}")
+    return weights
+
+
+def resolve_model(model_path, backend: Optional[str] = None, int8: bool = False) -> str:
+    """
+    backend verilmezse model_path olduğu gibi kullanılır (YOLO .onnx / OpenVINO klasörünü kendisi tanır).
+    backend verilirse .pt ağırlığının dışa aktarılmış karşılığı aranır; yoksa export komutu önerilir.
+    """
+    if backend is None or backend == backend_for(model_path):
+        return str(model_path)
+    if backend not in BACKENDS:
+        raise ValueError(f"Bilinmeyen backend: {backend}")
+    if backend == "torch":
+        raise ValueError(f"torch backend için .pt ağırlığı gerekli: {model_path}")
+
+    path = exported_path(model_path, backend, int8)
+    if not path.exists():
+        flags = " --int8" if int8 else ""
+        raise FileNotFoundError(
+            f"{path} bulunamadı. Önce dışa aktarın: python -m app.model_export --weights {model_path} "
+            f"--backend {backend}{flags}"
+        )
+    return str(path)
+
+
+def static_input_size(model_path) -> Optional[Tuple[int, int]]:
+    """
+    Statik girişle (sabit batch=1 ve boyut) dışa aktarılmış modelin (yükseklik, genişlik) boyutu;
+    PyTorch veya dinamik modelde None. OpenVINO'da ultralytics'in metadata.yaml'ı (args.dynamic verilmemişse
+    statik sayılır), ONNX'te giriş tensörünün boyutları okunur (onnx paketi yoksa dinamik varsayılır).
+    """
+    path = Path(str(model_path))
+    backend = backend_for(path)
+    if backend == "openvino":
+        import yaml
+
+        meta_path = (path if path.is_dir() else path.parent) / "metadata.yaml"
+        if not meta_path.exists():
+            return None
+        meta = yaml.safe_load(meta_path.read_text(encoding="utf-8")) or {}
+        if (meta.get("args") or {}).get("dynamic"):
+            return None
+        imgsz = meta.get("imgsz")
+        if imgsz is None:
+            return None
+        h, w = (imgsz, imgsz) if isinstance(imgsz, int) else imgsz
+        return int(h), int(w)
+
+    if backend == "onnx":
+        try:
+            import onnx
+        except ImportError:
+            return None
+        dims = onnx.load(str(path), load_external_data=False).graph.input[0].type.tensor_type.shape.dim
+        if len(dims) != 4 or any(d.dim_param or not d.dim_value for d in dims):
+            return None
+        return int(dims[2].dim_value), int(dims[3].dim_value)
+    return None
+
+
+# --- kalibrasyon
+def letterbox(frame, imgsz: int):
+    """ultralytics ön işlemesiyle aynı: oranı koru, 114 gri ile doldur, RGB, CHW, 0..1 float32."""
+    h, w = frame.shape[:2]
+    scale = min(imgsz / h, imgsz / w)
+    nh, nw = round(h * scale), round(w * scale)
+    resized = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    top, left = (imgsz - nh) // 2, (imgsz - nw) // 2
+    canvas[top:top + nh, left:left + nw] = resized
+    blob = canvas[:, :, ::-1].transpose(2, 0, 1).astype(np.float32) / 255.0
+    return blob[None]
+
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+
+
+def sample_frames(source, limit: int = 200) -> List[np.ndarray]:
+    """Klasördeki görüntülerden veya bir videodan eşit aralıklı en fazla limit kare."""
+    source = Path(str(source))
+    if source.is_dir():
+        files = sorted(p for p in source.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+        step = max(1, len(files) // limit)
+        frames = [cv2.imread(str(p)) for p in files[::step][:limit]]
+        return [f for f in frames if f is not None]
+
+    cap = cv2.VideoCapture(str(source))
+    try:
+        count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or limit
+        step = max(1, count // limit)
+        frames = []
+        index = 0
+        while len(frames) < limit:
+            ok = cap.grab()
+            if not ok:
+                break
+            if index % step == 0:
+                ok, frame = cap.retrieve()
+                if ok:
+                    frames.append(frame)
+            index += 1
+        return frames
+    finally:
+        cap.release()
+
+
+def _head_nodes(onnx_model) -> List[str]:
+    # Detect başlığı (en yüksek /model.N/ indeksi) float kalır; DFL/kutu çözümü INT8'de doğruluk kaybettirir
+    pattern = re.compile(r"^/model\.(\d+)/")
+    indices = [int(m.group(1)) for n in onnx_model.graph.node if (m := pattern.match(n.name))]
+    if not indices:
+        return []
+    head = f"/model.{max(indices)}/"
+    return [n.name for n in onnx_model.graph.node if n.name.startswith(head)]
+
+
+def quantize_onnx(fp32_path, int8_path, frames: Iterable[np.ndarray], imgsz: int = 640) -> Path:
+    """Kalibrasyon kareleriyle statik (QDQ, kanal başına) INT8 kuantizasyon; onnxruntime gerekir."""
+    import onnx
+    from onnxruntime.quantization import (
+        CalibrationDataReader, QuantFormat, QuantType, quantize_static
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    fp32_path, int8_path = Path(fp32_path), Path(int8_path)
+    model = onnx.load(str(fp32_path))
+    input_name = model.graph.input[0].name
+    exclude = _head_nodes(model)
+
+    class _Reader(CalibrationDataReader):
+        def __init__(self):
+            self._it = iter(frames)
+
+        def get_next(self):
+            frame = next(self._it, None)
+            return None if frame is None else {input_name: letterbox(frame, imgsz)}
+
+    prepared = int8_path.with_name(int8_path.stem + "_prep.onnx")
+    quant_pre_process(str(fp32_path), str(prepared))
+    try:
+        quantize_static(
+            str(prepared),
+            str(int8_path),
+            _Reader(),
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=True,
+            nodes_to_exclude=exclude,
+        )
+    finally:
+        prepared.unlink(missing_ok=True)
+
+    # ultralytics sınıf adlarını, stride ve imgsz'yi ONNX metadata'sından okur
+    quantized = onnx.load(str(int8_path))
+    del quantized.metadata_props[:]
+    quantized.metadata_props.extend(model.metadata_props)
+    onnx.save(quantized, str(int8_path))
+    return int8_path
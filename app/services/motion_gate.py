@@ -0,0 +1,169 @@
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+Box = Tuple[int, int, int, int]
+
+
+@dataclass
+class GateDecision:
+    run: bool                  # bu kare modele gönderilsin mi
+    crop: Optional[Box] = None  # (x1, y1, x2, y2) tam çözünürlükte; None -> tüm kare
+    motion: float = 0.0        # ROI içindeki hareketli piksel oranı
+
+
+def load_roi_config(path) -> Dict[int, List[List[Tuple[float, float]]]]:
+    """
+    {"<kamera>": [[[x, y], ...], ...]} biçimindeki JSON'u okur.
+    Koordinatlar karenin genişlik/yüksekliğine göre 0..1 aralığındadır (çözünürlükten bağımsız).
+    """
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return {int(cam): [[(float(x), float(y)) for x, y in poly] for poly in polys] for cam, polys in data.items()}
+
+
+def _union(a: Optional[Box], b: Optional[Box]) -> Optional[Box]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])
+
+
+class MotionGate:
+    """
+    Inference öncesi ucuz ön filtre (akış başına bir örnek, capture thread'inde çalışır).
+    - küçültülmüş gri karede kayan ortalama arka plan çıkarımı; hareket yalnızca ROI poligonları içinde sayılır
+    - hareket yoksa kare atlanır; yine de idle_interval saniyede bir tam kare işlenir (tracker ve
+      taşınan kutular bayatlamasın)
+    - hareket bittikten sonra hold saniye boyunca işlemeye devam edilir
+    - hareket küçük bir bölgedeyse inference o bölgenin (kenar payıyla) kırpılmış haline yapılır
+    Atlanan karelerde son tespitler aynen taşınır (bkz. PipelineService): sahne hareketsizse
+    nesneler yerindedir, böylece EventService'in kaybolma sayaçları yanlış tetiklenmez.
+    """
+
+    def __init__(
+        self,
+        rois: Optional[List[List[Tuple[float, float]]]] = None,
+        width: int = 160,
+        threshold: int = 25,
+        min_motion: float = 0.002,
+        idle_interval: float = 2.0,
+        hold: float = 1.0,
+        bg_alpha: float = 0.05,
+        crop_margin: float = 0.1,
+        min_crop: float = 0.25,
+        max_crop: float = 0.6,
+    ):
+        self.rois = rois or []
+        self.width = width
+        self.threshold = threshold
+        self.min_motion = min_motion
+        self.idle_interval = idle_interval
+        self.hold = hold
+        self.bg_alpha = bg_alpha
+        self.crop_margin = crop_margin
+        self.min_crop = min_crop
+        self.max_crop = max_crop
+
+        self.skipped = 0
+        self.cropped = 0
+
+        self._bg = None
+        self._mask = None
+        self._mask_area = 1
+        self._roi_box: Optional[Box] = None
+        self._shape = None
+        self._last_motion = None
+        self._last_run = None
+        self._motion_box: Optional[Box] = None  # aktif penceredeki hareket bölgelerinin birleşimi
+
+    def _setup(self, frame_shape, small_shape) -> None:
+        h, w = frame_shape[:2]
+        sh, sw = small_shape
+        self._shape = frame_shape[:2]
+        self._bg = None
+
+        if not self.rois:
+            self._mask = np.full((sh, sw), 255, dtype=np.uint8)
+            self._roi_box = None
+        else:
+            self._mask = np.zeros((sh, sw), dtype=np.uint8)
+            roi_box = None
+            for poly in self.rois:
+                pts = np.array([(x * sw, y * sh) for x, y in poly], dtype=np.int32)
+                cv2.fillPoly(self._mask, [pts], 255)
+                xs = [int(x * w) for x, _ in poly]
+                ys = [int(y * h) for _, y in poly]
+                roi_box = _union(roi_box, (max(0, min(xs)), max(0, min(ys)), min(w, max(xs)), min(h, max(ys))))
+            self._roi_box = self._fit(roi_box)
+        self._mask_area = max(1, cv2.countNonZero(self._mask))
+
+    def _fit(self, box: Optional[Box]) -> Optional[Box]:
+        # kenar payı ekle, en küçük boyuta büyüt; karenin büyük kısmını kaplıyorsa kırpma yapma
+        if box is None:
+            return None
+        h, w = self._shape
+        x1, y1, x2, y2 = box
+        mx, my = int(w * self.crop_margin), int(h * self.crop_margin)
+        x1, y1, x2, y2 = x1 - mx, y1 - my, x2 + mx, y2 + my
+
+        min_w, min_h = int(w * self.min_crop), int(h * self.min_crop)
+        if x2 - x1 < min_w:
+            cx = (x1 + x2) // 2
+            x1, x2 = cx - min_w // 2, cx + min_w // 2
+        if y2 - y1 < min_h:
+            cy = (y1 + y2) // 2
+            y1, y2 = cy - min_h // 2, cy + min_h // 2
+
+        x1, y1, x2, y2 = max(0, x1), max(0, y1), min(w, x2), min(h, y2)
+        if (x2 - x1) * (y2 - y1) > self.max_crop * w * h:
+            return None
+        return x1, y1, x2, y2
+
+    def check(self, frame, ts: float) -> GateDecision:
+        h, w = frame.shape[:2]
+        small = cv2.resize(frame, (self.width, max(1, int(h * self.width / w))), interpolation=cv2.INTER_AREA)
+        gray = cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+        if self._shape != frame.shape[:2]:
+            self._setup(frame.shape, gray.shape)
+
+        if self._bg is None:
+            self._bg = gray.astype(np.float32)
+            self._last_run = ts
+            return GateDecision(True, self._roi_box, 1.0)
+
+        diff = cv2.absdiff(gray, cv2.convertScaleAbs(self._bg))
+        cv2.accumulateWeighted(gray, self._bg, self.bg_alpha)
+        _, binary = cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY)
+        binary = cv2.bitwise_and(binary, self._mask)
+        motion = cv2.countNonZero(binary) / self._mask_area
+
+        if motion >= self.min_motion:
+            self._last_motion = ts
+            x, y, bw, bh = cv2.boundingRect(cv2.dilate(binary, None, iterations=2))
+            sx, sy = w / gray.shape[1], h / gray.shape[0]
+            box = (int(x * sx), int(y * sy), int((x + bw) * sx), int((y + bh) * sy))
+            self._motion_box = _union(self._motion_box, box)
+
+        active = self._last_motion is not None and ts - self._last_motion <= self.hold
+        if not active:
+            self._motion_box = None
+            if self._last_run is not None and ts - self._last_run < self.idle_interval:
+                self.skipped += 1
+                return GateDecision(False, None, motion)
+            # periyodik tam kare (ROI varsa ROI kutusu)
+            self._last_run = ts
+            return GateDecision(True, self._roi_box, motion)
+
+        self._last_run = ts
+        crop = self._fit(self._motion_box)
+        if crop is not None:
+            self.cropped += 1
+        else:
+            crop = self._roi_box
+        return GateDecision(True, crop, motion)
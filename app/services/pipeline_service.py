@@ -0,0 +1,588 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.data.event_writer import EventWriter
+from app.services.adaptive_controller import AdaptiveController, QualityLevel
+from app.services.annotation import PreviewRenderer, annotate
+from app.services.batch_scheduler import BatchScheduler
+from app.services.camera_service import Backoff
+from app.services.detection_log import DetectionRecorder
+from app.services.detections import Detections, NO_TRACK
+from app.services.event_persister import EventPersister, EventRecord
+from app.services.frame_queue import FrameQueue, DROP_OLDEST, BLOCK
+from app.services.metrics import MetricsRegistry, FRAME_LATENCY_BUCKETS
+from app.services.motion_gate import GateDecision, MotionGate
+from app.services.snapshot_service import SnapshotService, downscale
+
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class CameraStream:
+    stream_id: int
+    camera: object
+    event_service: object
+    gate: Optional[MotionGate] = None  # None -> her kare modele gider
+    recorder: Optional[DetectionRecorder] = None  # verilirse EventService'e giren tespitler kaydedilir
+
+
+@dataclass
+class FramePacket:
+    stream_id: int
+    seq: int
+    capture_ts: float  # karenin zamanı (duvar saati, PTS veya enjekte saat); yalnızca event zamanları için
+    frame: object
+    received_ts: float = field(default_factory=time.monotonic)  # okunduğu an; yaş ve gecikme bununla ölçülür
+    tracked: Detections = field(default_factory=Detections.empty)
+    gate: Optional[GateDecision] = None
+
+
+@dataclass
+class ProcessedFrame:
+    stream_id: int
+    seq: int
+    capture_ts: float
+    done_ts: float
+    latency: float   # okunmadan işlenene kadar geçen süre (monotonik saat)
+    preview: object  # küçültülmüş, çizilmiş BGR kare; bu karede preview üretilmediyse None
+    events: List[EventRecord] = field(default_factory=list)
+    frames: int = 0  # akışta o ana kadar işlenen kare sayısı (preview seyrekleşse de FPS hesabı için)
+
+
+class PipelineService:
+    """
+    capture -> inference -> event/persist aşamalarını ayrı thread'lerde çalıştırır.
+    Her kamera akışının kendi capture thread'i ve EventService durumu vardır;
+    inference tüm akışlar için tek modelle, BatchScheduler'ın oluşturduğu batch'lerle yapılır.
+    Aşamalar sınırlı kuyruklarla bağlıdır; böylece toplam hız aşamaların
+    toplamıyla değil en yavaş aşamayla sınırlanır. GUI yalnızca preview/event
+    kuyruklarını tüketir.
+    Aşama süreleri, kuyruk derinlikleri, atılan kareler ve track ID değişimi self.metrics'e
+    (MetricsRegistry) yazılır; sıcak yolda yalnızca önceden oluşturulmuş metrikler güncellenir.
+    adaptive (AdaptiveController) verilirse imgsz, kare atlama (stride) ve yakalama genişliği
+    ölçülen gecikmeye göre ayarlanır; her değişiklik nedeniyle birlikte mesaj olarak raporlanır.
+    Her kaynağın capture thread'i kareleri bekletmeden okur, scheduler'da yalnızca en yenisi kalır.
+    stall_timeout boyunca kare vermeyen canlı kaynak (USB, RTSP) Backoff ile yeniden bağlanır;
+    video dosyası bittiğinde o akışın capture thread'i sonlanır; tüm akışlar bitip kalan kareler
+    işlendiğinde inference ve event thread'leri de sonlanır ve all_sources_ended True olur.
+    """
+
+    def __init__(
+        self,
+        streams: List[CameraStream],
+        inferencer,
+        tracker,
+        db,
+        snap_dir: Path,
+        max_batch_size: int = 8,
+        batch_fill_timeout: float = 0.005,
+        max_frame_age: float = 0.5,
+        result_queue_size: int = 4,
+        result_drop_policy: str = BLOCK,
+        preview_queue_size: int = 1,
+        preview_drop_policy: str = DROP_OLDEST,
+        preview: bool = True,
+        preview_fps: float = 15.0,
+        db_batch_size: int = 64,
+        db_flush_interval: float = 0.5,
+        snapshot_options: Optional[dict] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        adaptive: Optional[AdaptiveController] = None,
+        stall_timeout: float = 2.0,
+        reconnect_max_delay: float = 30.0,
+    ):
+        self.streams: Dict[int, CameraStream] = {}
+        self.inferencer = inferencer
+        self.tracker = tracker
+        self.db = db
+        self.snap_dir = Path(snap_dir)
+        self.persister = None
+        self.writer = None
+        self.snapshots = None
+        # SnapshotService'e aktarılır (fmt, quality, max_width, clip_pre_seconds, ...)
+        self.snapshot_options = dict(snapshot_options or {})
+        # preview=False (headless): kareler yalnızca event olduğunda çizilir
+        self.preview = preview
+        # preview işleme hızından bağımsız, en fazla preview_fps ile ve preview_size'a
+        # küçültülerek üretilir; preview_size GUI thread'inden set_preview_size ile değişir
+        self.preview_interval = 1.0 / preview_fps if preview_fps > 0 else 0.0
+        self.preview_size = None
+        self._renderer = PreviewRenderer()
+        self._preview_due: Dict[int, float] = {}
+        self._stream_frames: Dict[int, int] = {}
+
+        self.frames_processed = 0
+        self.events_emitted = 0
+        self.first_detection_at = None  # tespit içeren ilk işlenmiş karenin time.perf_counter() zamanı
+
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self._stage = {
+            stage: self.metrics.histogram("stage_seconds", "Aşama süresi", stage=stage)
+            for stage in ("capture", "inference", "tracking", "events", "annotation", "persist")
+        }
+        self._latency = self.metrics.histogram(
+            "frame_latency_seconds", "Yakalamadan işlenmeye kadar geçen süre", buckets=FRAME_LATENCY_BUCKETS
+        )
+        self._batch_size = self.metrics.histogram(
+            "batch_size", "Inference batch boyutu", buckets=(1, 2, 4, 8, 16, 32)
+        )
+        self._stream_metrics = {}
+        self._prev_track_ids = {}
+        self._last_tracked: Dict[int, Detections] = {}
+
+        # stall_timeout saniye kare gelmeyen canlı kaynak artan beklemeyle yeniden açılır
+        self.stall_timeout = stall_timeout
+        self.reconnect_max_delay = reconnect_max_delay
+
+        self.adaptive = adaptive
+        # capture thread'leri her karede okur; yalnızca kontrol thread'i yazar
+        self._stride = 1
+        self._max_width = 0
+
+        self._batch_cfg = (max_batch_size, batch_fill_timeout, max_frame_age)
+        self._writer_cfg = (db_batch_size, db_flush_interval)
+        self._queue_cfg = (
+            (result_queue_size, result_drop_policy),
+            (preview_queue_size, preview_drop_policy),
+        )
+
+        self.scheduler = None
+        self.result_queue = None
+        self.preview_queues: Dict[int, FrameQueue] = {}
+        self.event_queue = None
+        self.message_queue = None
+
+        self._stop = threading.Event()
+        self._threads = []
+        # kaynak sonu: tüm capture'lar bitti -> inference kalan kareleri işledi -> event thread'i boşalttı
+        self._ended_streams = set()
+        self._ended_lock = threading.Lock()
+        self._captures_ended = threading.Event()
+        self._inference_ended = threading.Event()
+        self._drained = threading.Event()
+
+        self.set_streams(streams)
+
+    @property
+    def running(self) -> bool:
+        return any(t.is_alive() for t in self._threads)
+
+    @property
+    def all_sources_ended(self) -> bool:
+        """Tüm kaynaklar (video dosyaları) bitti ve son kareleri işlendi; canlı kaynakla True olmaz."""
+        return self._drained.is_set()
+
+    def set_streams(self, streams: List[CameraStream]) -> None:
+        if self.running:
+            raise RuntimeError("Pipeline çalışırken akışlar değiştirilemez.")
+        self.streams = {s.stream_id: s for s in streams}
+
+    def set_near_required_time(self, t: float) -> None:
+        for s in self.streams.values():
+            s.event_service.set_near_required_time(t)
+
+    def set_disappear_time(self, t: float) -> None:
+        for s in self.streams.values():
+            s.event_service.set_disappear_time(t)
+        snapshots = self.snapshots
+        if snapshots is not None:
+            snapshots.set_event_delay(self._event_delay())
+
+    def _event_delay(self) -> float:
+        return max((s.event_service.event_delay for s in self.streams.values()), default=0.0)
+
+    def start(self) -> None:
+        if self.running:
+            return
+        if not self.streams:
+            raise RuntimeError("Pipeline için en az bir kamera akışı gerekli.")
+
+        started = []
+        try:
+            for s in self.streams.values():
+                s.camera.start()
+                started.append(s)
+        except Exception:
+            for s in started:
+                s.camera.stop()
+            raise
+
+        max_batch_size, fill_timeout, max_frame_age = self._batch_cfg
+        (rq_size, rq_policy), (pq_size, pq_policy) = self._queue_cfg
+
+        self.scheduler = BatchScheduler(max_batch_size, fill_timeout, max_frame_age)
+        for stream_id in self.streams:
+            self.scheduler.add_stream(stream_id)
+
+        # result kuyruğu akış başına rq_size kadar yer ayırır
+        self.result_queue = FrameQueue(rq_size * len(self.streams), rq_policy)
+        self.preview_queues = {stream_id: FrameQueue(pq_size, pq_policy) for stream_id in self.streams}
+        self.event_queue = FrameQueue(256, DROP_OLDEST)
+        self.message_queue = FrameQueue(256, DROP_OLDEST)
+
+        # DB yazımı frame döngüsünü bloklamasın; kayıtlar writer thread'inde toplu commit edilir
+        db_batch_size, db_flush_interval = self._writer_cfg
+        self.writer = EventWriter(self.db, db_batch_size, db_flush_interval, metrics=self.metrics)
+        self.snapshots = SnapshotService(self.snap_dir, report=self._report, **self.snapshot_options)
+        self.snapshots.set_event_delay(self._event_delay())
+        self.persister = EventPersister(self.writer, self.snapshots)
+
+        self.inferencer.reset_trackers()
+        self._last_tracked = {}
+        self._preview_due = {}
+        self._stream_frames = {}
+        self.frames_processed = 0
+        self.events_emitted = 0
+        self.first_detection_at = None
+        self._register_metrics()
+
+        self._stop.clear()
+        self._ended_streams = set()
+        for flag in (self._captures_ended, self._inference_ended, self._drained):
+            flag.clear()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, args=(s,), name=f"pipeline-capture-{s.stream_id}", daemon=True)
+            for s in self.streams.values()
+        ]
+        self._threads += [
+            threading.Thread(target=self._inference_loop, name="pipeline-inference", daemon=True),
+            threading.Thread(target=self._event_loop, name="pipeline-event", daemon=True),
+        ]
+        if self.adaptive is not None:
+            self.adaptive.reset()
+            self._apply_level(self.adaptive.level)
+            self._threads.append(threading.Thread(target=self._control_loop, name="pipeline-control", daemon=True))
+        for t in self._threads:
+            t.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        if self.scheduler is not None:
+            self.scheduler.close()
+        for q in [self.result_queue, *self.preview_queues.values()]:
+            if q is not None:
+                q.close()
+
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+        for s in self.streams.values():
+            s.camera.stop()
+            if s.recorder is not None:
+                s.recorder.close()
+
+        if self.snapshots is not None:
+            self.snapshots.close()
+            self.snapshots = None
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def _register_metrics(self) -> None:
+        m = self.metrics
+        m.gauge("queue_depth", "Kuyrukta bekleyen öğe", lambda: len(self.scheduler), queue="scheduler")
+        m.gauge("queue_depth", "Kuyrukta bekleyen öğe", lambda: len(self.result_queue), queue="result")
+        m.gauge("queue_depth", "Kuyrukta bekleyen öğe", lambda: len(self.event_queue), queue="event")
+        m.gauge("queue_depth", "Kuyrukta bekleyen öğe", lambda: self.snapshots.backlog, queue="snapshot")
+        m.counter_fn("frames_dropped_total", "Atılan kare", lambda: self.result_queue.dropped,
+                     stream="all", reason="result_queue")
+        m.counter_fn("frames_dropped_total", "Atılan kare", lambda: self.snapshots.skipped_frames,
+                     stream="all", reason="clip_backlog")
+
+        self._prev_track_ids = {}
+        for stream_id in self.streams:
+            scheduler, preview = self.scheduler, self.preview_queues[stream_id]
+            m.counter_fn("frames_dropped_total", "Atılan kare", lambda s=stream_id: scheduler.dropped[s],
+                         stream=stream_id, reason="superseded")
+            m.counter_fn("frames_dropped_total", "Atılan kare", lambda s=stream_id: scheduler.stale[s],
+                         stream=stream_id, reason="stale")
+            m.counter_fn("frames_dropped_total", "Atılan kare", lambda q=preview: q.dropped,
+                         stream=stream_id, reason="preview")
+            tracks = self.streams[stream_id].event_service.tracks
+            m.gauge("event_tracks", "EventService'in tuttuğu ürün izi", lambda t=tracks: len(t), stream=stream_id)
+            m.counter_fn("event_tracks_evicted_total", "Kapasite dolduğu için atılan iz",
+                         lambda t=tracks: t.evicted, stream=stream_id)
+            camera = self.streams[stream_id].camera
+            m.gauge("camera_connected", "Kamera bağlı (1) / yeniden bağlanıyor (0)",
+                    lambda c=camera: int(getattr(c, "connected", True)), stream=stream_id)
+            m.counter_fn("camera_reconnects_total", "Başarılı yeniden bağlanma",
+                         lambda c=camera: getattr(c, "reconnects", 0), stream=stream_id)
+            gate = self.streams[stream_id].gate
+            if gate is not None:
+                m.counter_fn("frames_gated_total", "Hareket olmadığı için modele gönderilmeyen kare",
+                             lambda g=gate: g.skipped, stream=stream_id)
+                m.counter_fn("frames_cropped_total", "Hareketli bölgeye kırpılarak işlenen kare",
+                             lambda g=gate: g.cropped, stream=stream_id)
+            self._stream_metrics[stream_id] = (
+                m.counter("frames_captured_total", "Yakalanan kare", stream=stream_id),
+                m.counter("frames_processed_total", "İşlenen kare", stream=stream_id),
+                m.counter("events_total", "Üretilen event", stream=stream_id),
+                m.counter("track_ids_new_total", "Yeni görülen track ID (ID değişimi göstergesi)", stream=stream_id),
+            )
+
+    def _apply_level(self, level: QualityLevel) -> None:
+        self.inferencer.set_imgsz(level.imgsz)
+        self._stride = level.stride
+        self._max_width = level.max_width
+
+    def _control_loop(self):
+        m = self.metrics
+        m.gauge("adaptive_level", "Uyarlamalı kalite seviyesi (0 = en iyi)", lambda: self.adaptive.index)
+        m.gauge("adaptive_imgsz", "Model giriş boyutu", lambda: self.adaptive.level.imgsz)
+        m.gauge("adaptive_stride", "İşlenen kare aralığı", lambda: self.adaptive.level.stride)
+
+        while not self._stop.wait(self.adaptive.interval):
+            # scheduler slotları akış başına en yeni kareyi tuttuğundan birikme göstergesi değildir
+            depth = len(self.result_queue)
+            change = self.adaptive.step(time.monotonic(), self._latency, depth)
+            if change is None:
+                continue
+            old, new, reason = change
+            self._apply_level(new)
+            self._report(f"Uyarlama: {old.describe()} -> {new.describe()} ({reason})")
+
+    # --- GUI / tüketici tarafı
+    def set_preview_size(self, width: int, height: int) -> None:
+        """Preview karelerinin sığdırılacağı boyut (ör. video widget'ının boyutu)."""
+        self.preview_size = (width, height) if width > 0 and height > 0 else None
+
+    def poll_preview(self, stream_id: int) -> Optional[ProcessedFrame]:
+        q = self.preview_queues.get(stream_id)
+        if q is None:
+            return None
+        return q.get_nowait()
+
+    def poll_events(self) -> List[EventRecord]:
+        if self.event_queue is None:
+            return []
+        return self.event_queue.drain()
+
+    def poll_messages(self) -> List[str]:
+        if self.message_queue is None:
+            return []
+        return self.message_queue.drain()
+
+    def _report(self, message: str) -> None:
+        log.warning(message)
+        self.message_queue.put(message)
+
+    # --- aşamalar
+    def _capture_loop(self, stream: CameraStream):
+        seq = 0
+        n = 0
+        width = 0
+        capture_hist = self._stage["capture"]
+        captured = self._stream_metrics[stream.stream_id][0]
+        last_frame = time.monotonic()
+        while not self._stop.is_set():
+            if width != self._max_width:
+                width = self._max_width
+                if hasattr(stream.camera, "set_frame_width"):
+                    stream.camera.set_frame_width(width)
+
+            n += 1
+            if self._stride > 1 and n % self._stride:
+                # atlanan kare BGR'a çevrilmeden geçilir
+                if stream.camera.grab():
+                    last_frame = time.monotonic()
+                else:
+                    time.sleep(0.01)
+                continue
+
+            started = time.perf_counter()
+            try:
+                frame, capture_ts = stream.camera.read_with_ts()
+            except Exception as e:
+                self._report(f"HATA: Kamera {stream.stream_id} okunamadı: {e}")
+                frame = None
+
+            if frame is None:
+                if time.monotonic() - last_frame < self.stall_timeout:
+                    time.sleep(0.01)
+                    continue
+                if not getattr(stream.camera, "is_live", True):
+                    self._report(f"Kamera {stream.stream_id}: video sona erdi")
+                    self._source_ended(stream.stream_id)
+                    return
+                if not self._reconnect(stream):
+                    return
+                # yeni bağlantıda adaptif genişlik yeniden uygulanır
+                width = None
+                last_frame = time.monotonic()
+                continue
+
+            last_frame = received_ts = time.monotonic()
+            if width:
+                # kamera istenen çözünürlüğü vermediyse yazılımda küçültülür
+                frame = downscale(frame, width)
+            decision = stream.gate.check(frame, capture_ts) if stream.gate is not None else None
+            capture_hist.observe(time.perf_counter() - started)
+            captured.inc()
+            seq += 1
+            packet = FramePacket(
+                stream_id=stream.stream_id, seq=seq, capture_ts=capture_ts, frame=frame,
+                received_ts=received_ts, gate=decision,
+            )
+            self.scheduler.submit(stream.stream_id, packet)
+
+    def _source_ended(self, stream_id: int) -> None:
+        with self._ended_lock:
+            self._ended_streams.add(stream_id)
+            if len(self._ended_streams) == len(self.streams):
+                self._captures_ended.set()
+
+    def _reconnect(self, stream: CameraStream) -> bool:
+        """Kaynak açılana kadar artan aralıklarla dener; pipeline durdurulursa False döner."""
+        self._report(f"UYARI: Kamera {stream.stream_id} {self.stall_timeout:g} sn kare vermedi, yeniden bağlanılıyor")
+        backoff = Backoff(maximum=self.reconnect_max_delay)
+        while True:
+            delay = backoff.next_delay()
+            if self._stop.wait(delay):
+                return False
+            if stream.camera.reconnect():
+                self._report(f"Kamera {stream.stream_id} yeniden bağlandı ({backoff.attempts}. deneme)")
+                return True
+            log.info(f"Kamera {stream.stream_id} yeniden bağlanamadı ({backoff.attempts}. deneme)")
+
+    def _inference_loop(self):
+        inference_hist, tracking_hist = self._stage["inference"], self._stage["tracking"]
+        while not self._stop.is_set():
+            batch = self.scheduler.next_batch(timeout=0.1)
+            if not batch:
+                # capture'lar bittiyse yeni kare gelmez; bekleyen de kalmadıysa iş bitti
+                if self._captures_ended.is_set() and not len(self.scheduler):
+                    self._inference_ended.set()
+                    return
+                continue
+
+            # hareketsiz karelerde model çalışmaz; akışın son tespitleri aynen taşınır
+            run = [p for p in batch if p.gate is None or p.gate.run]
+            for packet in batch:
+                if packet.gate is not None and not packet.gate.run:
+                    packet.tracked = self._last_tracked.get(packet.stream_id, packet.tracked)
+            if not run:
+                for packet in batch:
+                    self.result_queue.put(packet)
+                continue
+
+            try:
+                started = time.perf_counter()
+                results = self.inferencer.track_batch(
+                    [p.frame for p in run],
+                    [p.stream_id for p in run],
+                    [p.gate.crop if p.gate is not None else None for p in run],
+                )
+                inference_hist.observe(time.perf_counter() - started)
+                self._batch_size.observe(len(run))
+
+                started = time.perf_counter()
+                for packet, result in zip(run, results):
+                    packet.tracked = self.tracker.update([result])
+                    self._last_tracked[packet.stream_id] = packet.tracked
+                tracking_hist.observe(time.perf_counter() - started)
+            except Exception as e:
+                self._report(f"HATA: Inference başarısız: {e}")
+                continue
+
+            for packet in batch:
+                self.result_queue.put(packet)
+
+    def _event_loop(self):
+        while not self._stop.is_set():
+            packet = self.result_queue.get(timeout=0.1)
+            if packet is None:
+                if self._inference_ended.is_set() and not len(self.result_queue):
+                    self._drained.set()
+                    return
+                continue
+
+            try:
+                processed = self._process(packet)
+            except Exception as e:
+                self._report(f"HATA: Event işleme başarısız: {e}")
+                continue
+
+            self.frames_processed += 1
+            self.events_emitted += len(processed.events)
+            if self.first_detection_at is None and len(packet.tracked):
+                self.first_detection_at = time.perf_counter()
+            _, frames, events, _ = self._stream_metrics[packet.stream_id]
+            frames.inc()
+            if processed.events:
+                events.inc(len(processed.events))
+            self._latency.observe(processed.latency)
+
+            if processed.preview is not None:
+                self.preview_queues[packet.stream_id].put(processed)
+            for record in processed.events:
+                self.event_queue.put(record)
+
+    def _count_new_track_ids(self, packet: FramePacket) -> None:
+        ids = set(packet.tracked.track_ids.tolist())
+        ids.discard(NO_TRACK)
+        prev = self._prev_track_ids.get(packet.stream_id)
+        if prev is not None:
+            new = len(ids - prev)
+            if new:
+                self._stream_metrics[packet.stream_id][3].inc(new)
+        self._prev_track_ids[packet.stream_id] = ids
+
+    def _process(self, packet: FramePacket) -> ProcessedFrame:
+        stage = self._stage
+        stream = self.streams[packet.stream_id]
+        event_service = stream.event_service
+        self._count_new_track_ids(packet)
+        if stream.recorder is not None:
+            stream.recorder.write(packet.seq, packet.capture_ts, packet.tracked)
+
+        started = time.perf_counter()
+        events = event_service.update(packet.tracked, now=packet.capture_ts)
+        armed_ids = event_service.get_armed_ids()
+        t = time.perf_counter()
+        stage["events"].observe(t - started)
+
+        frames = self._stream_frames.get(packet.stream_id, 0) + 1
+        self._stream_frames[packet.stream_id] = frames
+
+        # snapshot için tam çözünürlük yalnızca event karesinde; preview ayrı, küçük karede çizilir
+        annotated = preview = None
+        show = self.preview and (events or time.monotonic() >= self._preview_due.get(packet.stream_id, 0.0))
+        if events or show:
+            started = t
+            if events:
+                annotated = annotate(packet.frame, packet.tracked, armed_ids, event_service.rules)
+            if show:
+                preview = self._renderer.render(
+                    packet.stream_id, packet.frame, packet.tracked, armed_ids, event_service.rules,
+                    self.preview_size,
+                )
+                self._preview_due[packet.stream_id] = time.monotonic() + self.preview_interval
+            t = time.perf_counter()
+            stage["annotation"].observe(t - started)
+
+        # snapshot halka tamponu + event dosyaları + DB kuyruğu
+        started = t
+        self.snapshots.push(packet.stream_id, packet.capture_ts, packet.frame)
+        when = datetime.fromtimestamp(packet.capture_ts)
+        records = [
+            self.persister.persist(packet.stream_id, ev, annotated, packet.capture_ts, when) for ev in events
+        ]
+        stage["persist"].observe(time.perf_counter() - started)
+
+        return ProcessedFrame(
+            stream_id=packet.stream_id,
+            seq=packet.seq,
+            capture_ts=packet.capture_ts,
+            done_ts=time.time(),
+            latency=time.monotonic() - packet.received_ts,
+            preview=preview,
+            events=records,
+            frames=frames,
+        )
@@ -0,0 +1,237 @@
+import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+FORMATS = {
+    "jpg": (".jpg", cv2.IMWRITE_JPEG_QUALITY),
+    "webp": (".webp", cv2.IMWRITE_WEBP_QUALITY),
+}
+
+
+@dataclass
+class _PendingClip:
+    stream_id: int
+    start_ts: float
+    end_ts: float
+    path: Path
+
+
+def _safe_name(name: str) -> str:
+    """Sınıf adını dosya adında kullanılabilir hale getirir ("wine glass" -> "wine_glass")."""
+    return re.sub(r"\W+", "_", name).strip("_").lower() or "object"
+
+
+def downscale(frame, max_width: int):
+    h, w = frame.shape[:2]
+    if not max_width or w <= max_width:
+        return frame
+    scale = max_width / w
+    return cv2.resize(frame, (max_width, int(h * scale)), interpolation=cv2.INTER_AREA)
+
+
+class SnapshotService:
+    """
+    Event snapshot'larını ve kısa kanıt kliplerini arka planda kodlar ve yazar.
+    - save_event(): dosya yolunu hemen döndürür; kodlama/yazma thread havuzunda yapılır
+    - push(): her akışın son birkaç saniyesi, küçültülmüş ve kodlanmış (JPEG/WebP) olarak
+      bir halka tamponda tutulur; bellek kullanımı clip_fps * pencere * kare boyutu ile sınırlıdır
+    - ürünün kaybolmasından (last_seen) clip_pre_seconds önce ile event'ten clip_post_seconds sonrası
+      arasındaki kareler MJPEG AVI klibe yazılır. Event kaybolmadan disappear_time sonra üretildiğinden
+      halka tampon event_delay (en uzun disappear_time) + pre + post saniye tutar
+    Zaman değerleri karenin zamanıdır (canlıda yakalama zamanı, kayıtta PTS).
+    push() ve save_event() tek bir thread'den (event thread'i) çağrılmalıdır.
+    """
+
+    def __init__(
+        self,
+        snap_dir: Path,
+        fmt: str = "jpg",
+        quality: int = 90,
+        max_width: int = 0,
+        workers: int = 2,
+        clip_pre_seconds: float = 3.0,
+        clip_post_seconds: float = 2.0,
+        clip_fps: float = 10.0,
+        clip_max_width: int = 640,
+        clip_quality: int = 70,
+        event_delay: float = 0.0,
+        max_backlog: int = 64,
+        report=None,
+    ):
+        if fmt not in FORMATS:
+            raise ValueError(f"Bilinmeyen snapshot formatı: {fmt}")
+
+        self.snap_dir = Path(snap_dir)
+        self.fmt = fmt
+        self.quality = quality
+        self.max_width = max_width
+        self.clip_pre_seconds = clip_pre_seconds
+        self.clip_post_seconds = clip_post_seconds
+        self.clip_fps = clip_fps
+        self.clip_max_width = clip_max_width
+        self.clip_quality = clip_quality
+        self.event_delay = event_delay
+        self.max_backlog = max_backlog
+        self.report = report
+
+        self.skipped_frames = 0
+
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="snapshot")
+        self._rings = {}        # stream_id -> deque[(ts, Future[bytes])]
+        self._last_sample = {}  # stream_id -> son örneklenen kare zamanı
+        self._pending_clips = []
+        self._backlog = 0
+        self._lock = threading.Lock()
+
+    @property
+    def clips_enabled(self) -> bool:
+        return self.clip_fps > 0 and (self.clip_pre_seconds > 0 or self.clip_post_seconds > 0)
+
+    def set_event_delay(self, seconds: float) -> None:
+        # kaybolma ile event arasındaki en uzun süre (disappear_time); halka tampon buna göre uzar
+        self.event_delay = max(float(seconds), 0.0)
+
+    @property
+    def backlog(self) -> int:
+        # kodlanmayı/yazılmayı bekleyen iş sayısı
+        return self._backlog
+
+    # --- halka tampon
+    def push(self, stream_id: int, ts: float, frame) -> None:
+        if not self.clips_enabled:
+            return
+
+        last = self._last_sample.get(stream_id)
+        if last is None or ts - last >= 1.0 / self.clip_fps:
+            self._sample(stream_id, ts, frame)
+
+        self._finalize_due(stream_id, ts)
+
+    def _sample(self, stream_id: int, ts: float, frame) -> None:
+        with self._lock:
+            if self._backlog >= self.max_backlog:
+                # kodlayıcı geride kaldı; bellek sınırlı kalsın diye kare atlanır
+                self.skipped_frames += 1
+                return
+            self._backlog += 1
+
+        self._last_sample[stream_id] = ts
+        ring = self._rings.setdefault(stream_id, deque())
+        ring.append((ts, self._submit(self._encode_small, frame)))
+
+        # klip, event'ten event_delay önce kaybolan ürünün pre saniye öncesinden başlar ve post
+        # saniye sonra yazılır; o pencereden eski kareler tutulmaz
+        horizon = ts - (self.event_delay + self.clip_pre_seconds + self.clip_post_seconds)
+        while ring and ring[0][0] < horizon:
+            ring.popleft()
+
+    def _submit(self, fn, *args):
+        future = self._pool.submit(fn, *args)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, _future) -> None:
+        with self._lock:
+            self._backlog -= 1
+
+    def _encode_small(self, frame) -> bytes:
+        small = downscale(frame, self.clip_max_width)
+        ok, buf = cv2.imencode(".jpg", small, [cv2.IMWRITE_JPEG_QUALITY, self.clip_quality])
+        return buf.tobytes() if ok else b""
+
+    # --- event
+    def save_event(
+        self, stream_id: int, ts: float, annotated, when: datetime, track_id: Optional[int],
+        class_name: str, last_seen: Optional[float] = None,
+    ):
+        """
+        (snapshot_path, clip_path) döndürür; dosyalar arka planda yazılır.
+        Dosya adı ürünün sınıfını taşır (event_..._cam_0_cell_phone_7); sınıf adı dosya adına uygun hale getirilir.
+        ts event karesinin, last_seen ürünün son görüldüğü karenin zamanıdır; klip last_seen'den
+        clip_pre_seconds önce başlar (verilmezse ts'den).
+        """
+        self.snap_dir.mkdir(parents=True, exist_ok=True)
+        ext, _ = FORMATS[self.fmt]
+        stem = f"event_{when.strftime('%Y%m%d_%H%M%S')}_cam_{stream_id}_{_safe_name(class_name)}_{track_id}"
+
+        snap_path = self.snap_dir / f"{stem}{ext}"
+        with self._lock:
+            self._backlog += 1
+        self._submit(self._write_snapshot, snap_path, annotated)
+
+        clip_path = ""
+        if self.clips_enabled:
+            path = self.snap_dir / f"{stem}.avi"
+            start = (ts if last_seen is None else min(last_seen, ts)) - self.clip_pre_seconds
+            self._pending_clips.append(_PendingClip(stream_id, start, ts + self.clip_post_seconds, path))
+            clip_path = str(path)
+            self._finalize_due(stream_id, ts)
+
+        return str(snap_path), clip_path
+
+    def _write_snapshot(self, path: Path, frame) -> None:
+        ext, quality_flag = FORMATS[self.fmt]
+        ok, buf = cv2.imencode(ext, downscale(frame, self.max_width), [quality_flag, self.quality])
+        if ok:
+            try:
+                path.write_bytes(buf.tobytes())
+                return
+            except OSError:
+                pass
+        self._fail(f"HATA: Snapshot yazılamadı: {path}")
+
+    # --- klipler
+    def _finalize_due(self, stream_id: int, ts: float, force: bool = False) -> None:
+        if not self._pending_clips:
+            return
+
+        remaining = []
+        for clip in self._pending_clips:
+            if clip.stream_id == stream_id and (force or ts >= clip.end_ts):
+                frames = [f for t, f in self._rings.get(stream_id, ()) if clip.start_ts <= t <= clip.end_ts]
+                with self._lock:
+                    self._backlog += 1
+                self._submit(self._write_clip, clip.path, frames)
+            else:
+                remaining.append(clip)
+        self._pending_clips = remaining
+
+    def _write_clip(self, path: Path, frames) -> None:
+        writer = None
+        try:
+            for future in frames:
+                buf = future.result()
+                if not buf:
+                    continue
+                img = cv2.imdecode(np.frombuffer(buf, dtype=np.uint8), cv2.IMREAD_COLOR)
+                if writer is None:
+                    h, w = img.shape[:2]
+                    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), self.clip_fps, (w, h))
+                writer.write(img)
+        except Exception as e:
+            self._fail(f"HATA: Klip yazılamadı: {path} ({e})")
+        finally:
+            if writer is not None:
+                writer.release()
+
+        if writer is None:
+            self._fail(f"HATA: Klip için kare yok: {path}")
+
+    def _fail(self, message: str) -> None:
+        if self.report is not None:
+            self.report(message)
+
+    def close(self) -> None:
+        # akış bittiyse bekleyen klipler eldeki karelerle yazılır
+        for stream_id in {c.stream_id for c in self._pending_clips}:
+            self._finalize_due(stream_id, float("inf"), force=True)
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,162 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+# bunun altındaki nokta x kutu çiftlerinde ızgara kurmak yerine doğrudan yayın (broadcast) daha ucuz.
+# bench_event_association'da kesişim ~10k çift (1/4'ü kişi olan ~230 nesnelik sahne) civarında ölçüldü.
+BRUTE_FORCE_PAIRS = 10_000
+
+
+def point_box_distance(px, py, boxes):
+    """Noktanın kutuya uzaklığı (içindeyse 0). px, py ve boxes kolonları aynı şekle yayınlanır."""
+    dx = np.maximum(np.maximum(boxes[..., 0] - px, px - boxes[..., 2]), 0.0)
+    dy = np.maximum(np.maximum(boxes[..., 1] - py, py - boxes[..., 3]), 0.0)
+    return np.hypot(dx, dy)
+
+
+class GridIndex:
+    """
+    Kare başına yeniden kurulan düzgün ızgara indeksi (kutular, ör. kişiler).
+    Her kutu pad kadar büyütülüp kesiştiği hücrelere yazılır; hücreler CSR düzenindedir (hücre başına
+    başlangıç ofseti), nokta sorgusu hücresini doğrudan indeksler. Sorgular tamamen vektöreldir: aday
+    çiftler açılır ve kesin uzaklık kontrol edilir. Maliyet nokta + kutu + aday çift sayısıyla doğrusaldır;
+    aday sayısı hücre boyuyla (varsayılan: kutuların kısa kenarının yarısı + pad) gerçek komşu sayısına
+    yakın tutulur. Sahne yoğunlaştıkça nokta başına gerçek komşu sayısı da artar, o kısım indekse bağlı değildir.
+    Uzaklık noktanın kutu kenarına olan uzaklığıdır; içerdeyse 0. Sorgu yarıçapı pad'i geçemez.
+    """
+
+    # hücre tablosu kutu sayısıyla sınırlı kalsın (küçük kutular + geniş alan = milyonlarca boş hücre olmasın)
+    MAX_CELLS_PER_BOX = 64
+
+    def __init__(self, boxes, pad: float = 0.0, cell_size: Optional[float] = None):
+        self.boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        self.pad = float(pad)
+        # uzaklık kontrolünde kolonlar ayrı ayrı toplanır; (n, 4) üzerinde satır seçmekten ucuz
+        self._x1, self._y1, self._x2, self._y2 = (np.ascontiguousarray(self.boxes[:, i]) for i in range(4))
+
+        n = len(self.boxes)
+        if cell_size is None:
+            if n:
+                sizes = np.minimum(self.boxes[:, 2] - self.boxes[:, 0], self.boxes[:, 3] - self.boxes[:, 1])
+                cell_size = float(np.median(sizes)) / 2 + self.pad
+            else:
+                cell_size = 1.0
+        self.cell_size = max(float(cell_size), 1.0)
+
+        if not n:
+            self._origin = np.zeros(2)
+            self._cols = self._rows = 1
+            self._starts = np.zeros(2, dtype=np.int64)
+            self._box_idx = np.empty(0, dtype=np.int64)
+            return
+
+        grown = self.boxes + np.array([-self.pad, -self.pad, self.pad, self.pad])
+        self._origin = grown[:, :2].min(axis=0)
+        extent = grown[:, 2:].max(axis=0) - self._origin
+        min_cell = float(np.sqrt(extent[0] * extent[1] / (self.MAX_CELLS_PER_BOX * n + 1024)))
+        self.cell_size = max(self.cell_size, min_cell)
+
+        cells = ((grown - np.tile(self._origin, 2)) // self.cell_size).astype(np.int64)
+        self._cols = int(cells[:, 2].max()) + 1
+        self._rows = int(cells[:, 3].max()) + 1
+
+        # her kutu için kapladığı hücre aralığını (cx0..cx1) x (cy0..cy1) açar
+        widths = cells[:, 2] - cells[:, 0] + 1
+        heights = cells[:, 3] - cells[:, 1] + 1
+        counts = widths * heights
+        box_idx = np.repeat(np.arange(n), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        w = widths[box_idx]
+        cx = cells[box_idx, 0] + local % w
+        cy = cells[box_idx, 1] + local // w
+
+        keys = cy * self._cols + cx
+        self._box_idx = box_idx[np.argsort(keys)]
+        n_cells = self._cols * self._rows
+        self._starts = np.zeros(n_cells + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys, minlength=n_cells), out=self._starts[1:])
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def query_radius(self, points, radius: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Uzaklığı radius'u geçmeyen tüm (nokta index'i, kutu index'i, uzaklık) çiftleri."""
+        radius = self.pad if radius is None else float(radius)
+        if radius > self.pad:
+            raise ValueError(f"Sorgu yarıçapı ({radius}) indeks payını ({self.pad}) geçemez")
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0))
+        if not len(points) or not len(self._box_idx):
+            return empty
+
+        cell = ((points - self._origin) // self.cell_size).astype(np.int64)
+        inside = (cell[:, 0] >= 0) & (cell[:, 1] >= 0) & (cell[:, 0] < self._cols) & (cell[:, 1] < self._rows)
+        candidates = np.flatnonzero(inside)
+        keys = cell[candidates, 1] * self._cols + cell[candidates, 0]
+        lo = self._starts[keys]
+        counts = self._starts[keys + 1] - lo
+        if not counts.any():
+            return empty
+
+        point_idx = np.repeat(candidates, counts)
+        # her adayın hücre listesindeki konumu: lo + (sıra - o noktanın ilk adayının sırası)
+        slots = np.arange(counts.sum()) + np.repeat(lo - (np.cumsum(counts) - counts), counts)
+        box_idx = self._box_idx[slots]
+
+        px = points[point_idx, 0]
+        py = points[point_idx, 1]
+        dx = np.maximum(np.maximum(self._x1[box_idx] - px, px - self._x2[box_idx]), 0.0)
+        dy = np.maximum(np.maximum(self._y1[box_idx] - py, py - self._y2[box_idx]), 0.0)
+        dist2 = dx * dx + dy * dy
+        keep = dist2 <= radius * radius
+        return point_idx[keep], box_idx[keep], np.sqrt(dist2[keep])
+
+    def any_within(self, points, radius: Optional[float] = None) -> np.ndarray:
+        """(N,) bool: nokta herhangi bir kutuya radius kadar yakın mı."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        mask = np.zeros(len(points), dtype=bool)
+        point_idx, _, _ = self.query_radius(points, radius)
+        mask[point_idx] = True
+        return mask
+
+    def nearest(self, points, k: int = 1, max_distance: Optional[float] = None):
+        """
+        Her nokta için max_distance (varsayılan pad) içindeki en yakın k kutu.
+        (nokta index'i, kutu index'i, uzaklık) döner; nokta ve uzaklığa göre sıralıdır.
+        """
+        point_idx, box_idx, dist = self.query_radius(points, max_distance)
+        if not len(point_idx):
+            return point_idx, box_idx, dist
+
+        order = np.lexsort((dist, point_idx))
+        point_idx, box_idx, dist = point_idx[order], box_idx[order], dist[order]
+        # her noktanın içindeki sıra: ilk k tutulur
+        starts = np.flatnonzero(np.r_[True, point_idx[1:] != point_idx[:-1]])
+        rank = np.arange(len(point_idx)) - np.repeat(starts, np.diff(np.r_[starts, len(point_idx)]))
+        keep = rank < k
+        return point_idx[keep], box_idx[keep], dist[keep]
+
+
+def near_mask(points, boxes, radius=0.0) -> np.ndarray:
+    """
+    (N,) bool: nokta herhangi bir kutunun radius kadar yakınında mı (radius=0: kutunun içinde).
+    radius tek sayı veya nokta başına (N,) dizi olabilir.
+    Az sayıda nesnede doğrudan yayın, kalabalık sahnelerde GridIndex kullanılır; sonuç aynıdır.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    if not len(points) or not len(boxes):
+        return np.zeros(len(points), dtype=bool)
+    radius = np.broadcast_to(np.asarray(radius, dtype=np.float64), (len(points),))
+
+    if len(points) * len(boxes) <= BRUTE_FORCE_PAIRS:
+        dist = point_box_distance(points[:, 0:1], points[:, 1:2], boxes[None, :, :])
+        return (dist <= radius[:, None]).any(axis=1)
+
+    pad = float(radius.max())
+    point_idx, _, dist = GridIndex(boxes, pad=pad).query_radius(points, pad)
+    mask = np.zeros(len(points), dtype=bool)
+    mask[point_idx[dist <= radius[point_idx]]] = True
+    return mask
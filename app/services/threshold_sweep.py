@@ -0,0 +1,184 @@
+import csv
+import itertools
+import json
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.services.clock import ManualClock
+from app.services.detection_log import DetectionLog
+from app.services.event_rules import RuleConfig
+from app.services.event_service import EventService
+
+
+@dataclass(frozen=True)
+class SweepParams:
+    near_time: float
+    disappear_time: float
+    near_distance: float
+    conf: float  # kayıttaki tespitlere sonradan uygulanan eşik (kayıt anındaki conf'tan düşük olamaz)
+
+
+@dataclass
+class SweepResult:
+    near_time: float
+    disappear_time: float
+    near_distance: float
+    conf: float
+    events: int
+    tp: Optional[int]  # etiket verilmediyse tp/fp/fn ve oranlar None
+    fp: Optional[int]
+    fn: Optional[int]
+    precision: Optional[float]
+    recall: Optional[float]
+    f1: Optional[float]
+
+
+def build_grid(near_times, disappear_times, near_distances=(0.0,), confs=(0.0,)) -> List[SweepParams]:
+    return [SweepParams(*combo) for combo in itertools.product(near_times, disappear_times, near_distances, confs)]
+
+
+def load_labels(path) -> List[Tuple[Optional[str], float]]:
+    """
+    Etiketli gerçek event'ler: JSON Lines veya CSV, satır başına {"ts": <kayıt zamanı>, "log": <dosya adı>}.
+    ts ürünün kaybolduğu an, yani son görüldüğü karenin zamanıdır (event'in üretildiği an değil) ve
+    tespit kaydındaki kare zamanıyla aynı zaman ekseninde olmalıdır; "log" verilmezse etiket
+    tüm kayıtlar için geçerlidir.
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with path.open(newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+    else:
+        rows = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    return [(row.get("log") or None, float(row["ts"])) for row in rows]
+
+
+def match_events(predicted: Sequence[float], labels: Sequence[float], tolerance: float) -> int:
+    """Zaman farkı tolerance'ı geçmeyen bire bir eşleşme sayısı (iki sıralı listede açgözlü eşleştirme)."""
+    predicted, labels = sorted(predicted), sorted(labels)
+    i = j = matched = 0
+    while i < len(predicted) and j < len(labels):
+        diff = predicted[i] - labels[j]
+        if abs(diff) <= tolerance:
+            matched += 1
+            i += 1
+            j += 1
+        elif diff < 0:
+            i += 1
+        else:
+            j += 1
+    return matched
+
+
+# --- worker süreçleri: kayıtlar her süreçte bir kez çözülüp bellekte tutulur
+_frames: Dict[str, list] = {}
+_rules: Optional[RuleConfig] = None
+
+
+def _init_worker(paths: Sequence[str], rules: Optional[RuleConfig]) -> None:
+    global _rules
+    _rules = rules
+    _frames.clear()
+    for path in paths:
+        _frames[path] = [(ts, det) for _, ts, det in DetectionLog(path)]
+
+
+def _run_events(frames, params: SweepParams, rules: Optional[RuleConfig]) -> List[float]:
+    # tahminler ürünün son görüldüğü anla eşleştirilir: event'in üretildiği an (ev.ts) yaklaşık
+    # last_seen + disappear_time'dır ve taranan parametreyle kayar
+    clock = ManualClock()
+    service = EventService(
+        params.near_time, params.disappear_time, near_distance=params.near_distance, rules=rules, clock=clock
+    )
+    out = []
+    for ts, det in frames:
+        if params.conf > 0:
+            det = det.select(det.confs >= params.conf)
+        clock.set(ts)
+        out.extend(ev.last_seen for ev in service.update(det))
+    return out
+
+
+def _evaluate(params: SweepParams) -> Dict[str, List[float]]:
+    return {path: _run_events(frames, params, _rules) for path, frames in _frames.items()}
+
+
+def _score(params: SweepParams, events: Dict[str, List[float]], labels, tolerance: float) -> SweepResult:
+    total = sum(len(predicted) for predicted in events.values())
+    if not labels:
+        return SweepResult(**asdict(params), events=total, tp=None, fp=None, fn=None,
+                           precision=None, recall=None, f1=None)
+
+    tp = fp = fn = 0
+    for path, predicted in events.items():
+        name = Path(path).name
+        truth = [ts for log, ts in labels if log is None or log == name]
+        matched = match_events(predicted, truth, tolerance)
+        tp += matched
+        fp += len(predicted) - matched
+        fn += len(truth) - matched
+
+    precision = tp / (tp + fp) if tp + fp else None
+    recall = tp / (tp + fn) if tp + fn else None
+    # tahmin yoksa ya da aralıkta etiket yoksa F1 tanımsızdır (0 değil)
+    if precision is None or recall is None:
+        f1 = None
+    else:
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return SweepResult(
+        **asdict(params), events=total, tp=tp, fp=fp, fn=fn,
+        precision=None if precision is None else round(precision, 4),
+        recall=None if recall is None else round(recall, 4),
+        f1=None if f1 is None else round(f1, 4),
+    )
+
+
+def sweep(
+    logs: Sequence[Path],
+    grid: Sequence[SweepParams],
+    labels=(),
+    tolerance: float = 3.0,
+    workers: int = 0,
+    rules: Optional[RuleConfig] = None,
+    progress=None,
+) -> List[SweepResult]:
+    """
+    Her parametre kombinasyonu için event motorunu tüm kayıtlar üzerinde çalıştırır.
+    workers=0: CPU sayısı; 1: aynı süreçte. Kombinasyonlar bağımsız olduğundan süreçlere dağıtılır;
+    her süreç kayıtları bir kez çözer. Sonuçlar F1 (yoksa event sayısı) sırasıyla döner.
+    progress(done, total) her kombinasyon bittiğinde çağrılır.
+    """
+    paths = [str(p) for p in logs]
+    workers = workers or mp.cpu_count()
+    workers = max(1, min(workers, len(grid)))
+
+    pool = None
+    if workers == 1:
+        _init_worker(paths, rules)
+        outputs = map(_evaluate, grid)
+    else:
+        # çağıran süreçte thread'ler olabilir (GUI, pipeline); fork yerine spawn, kayıtları initializer okur
+        pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=mp.get_context("spawn"),
+            initializer=_init_worker, initargs=(paths, rules),
+        )
+        outputs = pool.map(_evaluate, grid)
+
+    results = []
+    try:
+        for params, events in zip(grid, outputs):
+            results.append(_score(params, events, labels, tolerance))
+            if progress is not None:
+                progress(len(results), len(grid))
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    if labels:
+        results.sort(key=lambda r: (r.f1 or 0.0, r.precision or 0.0), reverse=True)
+    else:
+        results.sort(key=lambda r: r.events)
+    return results
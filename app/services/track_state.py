@@ -0,0 +1,118 @@
+import heapq
+from typing import Dict, Iterator, List, Optional
+
+
+class TrackState:
+    __slots__ = ("track_id", "cls_id", "last_seen", "near_start", "armed", "deadline", "scheduled")
+
+    def __init__(self, track_id: int, cls_id: int, now: float):
+        self.track_id = track_id
+        self.cls_id = cls_id
+        self.last_seen = now
+        self.near_start: Optional[float] = None
+        self.armed = False
+        self.deadline = 0.0                      # bu zamandan sonra iz incelenmeli (event veya unutma)
+        self.scheduled: Optional[float] = None   # yığındaki geçerli kaydın zamanı
+
+
+class TrackStateTable:
+    """
+    EventService'in ürün izleri için tek tablo: track_id -> TrackState (slotlu nesne).
+    Süresi dolacak izler zamana göre sıralı bir min-yığında (heap) tutulur:
+    - her iz yığında en fazla bir geçerli kayıtla bulunur; deadline ileri kaydıkça yeniden itilmez,
+      kayıt çıktığında iz hâlâ güncelse gerçek deadline'ıyla tekrar itilir (tembel yeniden planlama)
+    - deadline öne çekilirse (ör. ARMED olunca) yeni kayıt itilir, eskisi geçersiz sayılır
+    Böylece kare başına iş yalnızca o karede görülen ve süresi dolan iz sayısına bağlıdır.
+    Sözlük sırası son görülme sırasıdır; capacity aşılırsa en uzun süredir görülmeyen ARMED olmayan iz
+    (yoksa en uzun süredir görülmeyen iz) atılır.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self.evicted = 0
+        self._states: Dict[int, TrackState] = {}
+        self._armed = set()
+        self._heap: List[tuple] = []
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __contains__(self, track_id) -> bool:
+        return track_id in self._states
+
+    def __iter__(self) -> Iterator[TrackState]:
+        return iter(list(self._states.values()))
+
+    def get(self, track_id) -> Optional[TrackState]:
+        return self._states.get(track_id)
+
+    def armed_ids(self) -> set:
+        return set(self._armed)
+
+    def set_armed(self, state: TrackState, armed: bool) -> None:
+        if armed != state.armed:
+            state.armed = armed
+            if armed:
+                self._armed.add(state.track_id)
+            else:
+                self._armed.discard(state.track_id)
+
+    def touch(self, track_id: int, cls_id: int, now: float) -> TrackState:
+        """Bu karede görülen izi döner (yoksa oluşturur) ve sıranın sonuna taşır."""
+        state = self._states.pop(track_id, None)
+        if state is None:
+            if len(self._states) >= self.capacity:
+                self._evict()
+            state = TrackState(track_id, cls_id, now)
+        else:
+            state.last_seen = now
+            state.cls_id = cls_id
+        self._states[track_id] = state
+        return state
+
+    def schedule(self, state: TrackState, deadline: float) -> None:
+        state.deadline = deadline
+        if state.scheduled is None or deadline < state.scheduled:
+            state.scheduled = deadline
+            heapq.heappush(self._heap, (deadline, state.track_id))
+
+    def pop_expired(self, now: float) -> List[TrackState]:
+        """
+        deadline'ı now'a gelmiş izler. Çağıran her biri için remove() veya schedule() çağırmalıdır;
+        yığında kaydı kalmayan iz bir daha verilmez.
+        """
+        heap = self._heap
+        due = []
+        again = []
+        while heap and heap[0][0] <= now:
+            when, track_id = heapq.heappop(heap)
+            state = self._states.get(track_id)
+            if state is None or state.scheduled != when:
+                continue  # silinmiş iz veya geçersiz kayıt
+            state.scheduled = None
+            (again if state.deadline > now else due).append(state)
+        for state in again:
+            self.schedule(state, state.deadline)
+
+        # geçersiz kayıtlar birikirse yığını yeniden kur
+        if len(heap) > 2 * len(self._states) + 64:
+            self._heap = [(s.scheduled, tid) for tid, s in self._states.items() if s.scheduled is not None]
+            heapq.heapify(self._heap)
+        return due
+
+    def remove(self, track_id) -> None:
+        # yığındaki kaydı tembel silinir (pop_expired() sahipsiz kayıtları atlar)
+        self._states.pop(track_id, None)
+        self._armed.discard(track_id)
+
+    def _evict(self) -> None:
+        victim = next((s for s in self._states.values() if not s.armed), None)
+        if victim is None:
+            victim = next(iter(self._states.values()))
+        self.remove(victim.track_id)
+        self.evicted += 1
+
+    def clear(self) -> None:
+        self._states.clear()
+        self._armed.clear()
+        self._heap.clear()
@@ -0,0 +1,114 @@
+"""
+Kaydedilmiş tespitler üzerinde eşik taraması: parametre ızgarasını CPU çekirdeklerine dağıtarak değerlendirir.
+
+    python -m app.tune outputs/detections/*.mtd --labels olaylar.csv \\
+        --near-time 1 1.5 2 3 --disappear-time 2 3 4 --conf 0.45 0.55 --out tarama.csv
+
+Kayıtlar --record-detections ile üretilir (bkz. python -m app.event_replay). Etiket dosyası verilirse
+her kombinasyon için tahmin edilen event'ler gerçek event'lerle --tolerance saniye içinde bire bir
+eşleştirilir ve precision/recall/F1 raporlanır; verilmezse yalnızca event sayıları yazılır.
+Etiketteki ts ürünün kaybolduğu (son görüldüğü) andır; tahminler de bu anla eşleştirilir,
+böylece sonuç disappear_time'ın geciktirdiği event üretim anına bağlı kalmaz.
+--conf kayıttaki tespitlere sonradan uygulanır; tracker yeniden çalışmadığından yaklaşık bir sonuçtur.
+"""
+import argparse
+import csv
+import json
+import logging
+import time
+from dataclasses import asdict, fields
+from pathlib import Path
+
+from app.headless import setup_logging, EXIT_OK, EXIT_ERROR
+from app.services.event_rules import RuleConfig, load_rules
+from app.services.threshold_sweep import SweepResult, build_grid, load_labels, sweep
+
+
+log = logging.getLogger("app.tune")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="python -m app.tune", description=__doc__.strip().splitlines()[0])
+    p.add_argument("logs", type=Path, nargs="+", help="Tespit kayıtları (.mtd)")
+    p.add_argument("--labels", type=Path, default=None,
+                   help='Gerçek event\'ler (JSON Lines veya CSV; "ts" = ürünün kaybolduğu an, '
+                        'isteğe bağlı "log" = kayıt dosya adı)')
+    p.add_argument("--near-time", type=float, nargs="+", default=[3.0], help="Denenecek yakınlık süreleri (s)")
+    p.add_argument("--disappear-time", type=float, nargs="+", default=[3.0], help="Denenecek kaybolma süreleri (s)")
+    p.add_argument("--near-distance", type=float, nargs="+", default=[0.0], help="Denenecek yakınlık uzaklıkları (px)")
+    p.add_argument("--conf", type=float, nargs="+", default=[0.0], help="Denenecek conf eşikleri (0 = kayıttaki gibi)")
+    p.add_argument("--rules", type=Path, default=None,
+                   help="Ürün sınıfı kuralları (JSON); kuralda verilmeyen değerler ızgaradan gelir")
+    p.add_argument("--tolerance", type=float, default=3.0, help="Eşleşme için en fazla zaman farkı (s)")
+    p.add_argument("--workers", type=int, default=0, help="Süreç sayısı (0 = CPU sayısı)")
+    p.add_argument("--top", type=int, default=10, help="Loglanacak en iyi sonuç sayısı")
+    p.add_argument("--out", type=Path, default=None, help="Tüm sonuçların yazılacağı CSV veya JSON Lines dosyası")
+    p.add_argument("--log-level", default="info", choices=["debug", "info", "warning", "error"])
+    p.add_argument("--log-format", default="text", choices=["text", "json"])
+    return p
+
+
+def write_results(path: Path, results) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="", encoding="utf-8") as f:
+        if path.suffix.lower() == ".csv":
+            writer = csv.writer(f)
+            writer.writerow([fld.name for fld in fields(SweepResult)])
+            for r in results:
+                writer.writerow(asdict(r).values())
+        else:
+            for r in results:
+                f.write(json.dumps(asdict(r), ensure_ascii=False) + "\n")
+
+
+def run(args) -> int:
+    try:
+        rules = load_rules(args.rules) if args.rules else RuleConfig()
+        labels = load_labels(args.labels) if args.labels else []
+    except (OSError, ValueError, KeyError, TypeError):
+        log.exception("girdi okunamadı")
+        return EXIT_ERROR
+
+    grid = build_grid(args.near_time, args.disappear_time, args.near_distance, args.conf)
+    log.info("sweep started", extra={"fields": {
+        "logs": len(args.logs), "combinations": len(grid), "labels": len(labels),
+    }})
+
+    last_report = [time.monotonic()]
+
+    def progress(done, total):
+        now = time.monotonic()
+        if now - last_report[0] >= 5.0 or done == total:
+            last_report[0] = now
+            log.info("sweep progress", extra={"fields": {"done": done, "total": total}})
+
+    started = time.perf_counter()
+    try:
+        results = sweep(args.logs, grid, labels, args.tolerance, args.workers, rules, progress)
+    except KeyboardInterrupt:
+        log.warning("tarama iptal edildi")
+        return EXIT_ERROR
+    except Exception:
+        log.exception("tarama başarısız")
+        return EXIT_ERROR
+    elapsed = time.perf_counter() - started
+
+    for r in results[:args.top]:
+        log.info("result", extra={"fields": asdict(r)})
+    if args.out is not None:
+        write_results(args.out, results)
+
+    log.info("sweep finished", extra={"fields": {
+        "combinations": len(results), "elapsed_s": round(elapsed, 2),
+    }})
+    return EXIT_OK
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    setup_logging(args.log_level, args.log_format)
+    return run(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,9 +1,6 @@
-import csv
 import time
 from datetime import datetime
-from pathlib import Path
-
-import cv2
+from typing import Optional
 
 from PyQt5.QtCore import QTimer, Qt, QSettings
 from PyQt5.QtGui import QPixmap
@@ -15,36 +12,46 @@ from app.ui.widgets.log_panel import LogPanel
 from app.ui.widgets.status_panel import StatusPanel
 from app.ui.widgets.last_event_panel import LastEventPanel
 from app.ui.widgets.metrics_panel import MetricsPanel
+from app.ui.widgets.event_browser import EventBrowser
 
+from app.services.background_task import BackgroundTask
 from app.services.camera_service import CameraService
+from app.services.log_buffer import start_rotating_log
 from app.services.inference_service import InferenceService
 from app.services.tracking_service import TrackingService
 from app.services.event_service import EventService
+from app.services.pipeline_service import PipelineService, CameraStream
 from app.data.db import Database
-
-
-def project_root() -> Path:
-    # app/ui/main_window.py -> ui -> app -> PROJECT_ROOT
-    return Path(__file__).resolve().parents[2]
-
-
-OUT_DIR = project_root() / "outputs"
-SNAP_DIR = OUT_DIR / "snapshots"
-EXPORT_DIR = OUT_DIR / "exports"
+from app.services.export_service import ExportJob, FORMATS as EXPORT_FORMATS, available_formats
+from app.paths import project_root, SNAP_DIR, EXPORT_DIR, LOG_DIR
 
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, started_at: Optional[float] = None):
         super().__init__()
         self.setWindowTitle("Market Theft Detection - MVP")
+        # açılış ölçümleri bu andan (time.perf_counter) itibaren raporlanır
+        self._started_at = started_at if started_at is not None else time.perf_counter()
+        self._start_clicked_at = None
 
         self.settings = QSettings("MarketTheftMVP")
+        # log paneli ve pipeline logları dosyaya da yazılır; yazma GUI thread'inde yapılmaz
+        self._file_log = start_rotating_log(LOG_DIR / "app.log")
 
-        self.camera = CameraService(camera_index=0)
+        # model (ultralytics/torch dahil) pencere açıldıktan sonra arka planda yüklenir
         self.inferencer = InferenceService("yolov8n.pt", conf=0.45)
         self.tracker = TrackingService()
-        self.event_service = EventService(near_required_time=3.0, disappear_time=3.0)
         self.db = Database()
+        # akışlar Start'ta seçili kameralara göre kurulur
+        self.pipeline = PipelineService([], self.inferencer, self.tracker, self.db, SNAP_DIR)
+
+        self.near_required_time = 3.0
+        self.disappear_time = 3.0
+        self._cameras = [int(self.settings.value("camera_index", 0))]
+        self._preview_camera = 0
+        self._camera_job = None
+        self._camera_job_initial = False
+        self._model_job = None
 
         self.video = VideoWidget()
         self.log_panel = LogPanel()
@@ -53,15 +60,23 @@ class MainWindow(QMainWindow):
         self.metrics_panel = MetricsPanel()
         self.last_event_panel = LastEventPanel()
 
+        # kamera taraması ve model yükleme arka planda; bitişleri startup_timer yoklar
+        self.startup_timer = QTimer(self)
+        self.startup_timer.setInterval(100)
+        self.startup_timer.timeout.connect(self._poll_startup)
+        self.controls.set_cameras(self._cameras)
         self._refresh_cameras(initial=True)
+        self._model_job = BackgroundTask(self.inferencer.load, name="model-load").start()
 
         self._last_frame_ts = None
+        self._last_frames = 0
         self._fps_smooth = 0.0
         self._lat_smooth = 0.0
 
+        # GUI yalnızca pipeline çıktılarını tüketir; işleme worker thread'lerinde
         self.timer = QTimer(self)
-        self.timer.setInterval(30)
-        self.timer.timeout.connect(self._tick)
+        self.timer.setInterval(15)
+        self.timer.timeout.connect(self._poll_pipeline)
 
         root = QWidget()
         self.setCentralWidget(root)
@@ -106,7 +121,16 @@ class MainWindow(QMainWindow):
         self.controls.near_time_changed.connect(self.on_near_time_changed)
         self.controls.disappear_time_changed.connect(self.on_disappear_time_changed)
 
-        self.controls.export_csv_clicked.connect(self.export_csv)
+        self.controls.set_export_formats(available_formats())
+        self.controls.export_clicked.connect(self.export_events)
+        self.controls.history_clicked.connect(self.open_event_browser)
+        self._event_browser = None
+
+        # export arka planda çalışır; GUI yalnızca ilerlemeyi yoklar
+        self._export_job = None
+        self.export_timer = QTimer(self)
+        self.export_timer.setInterval(200)
+        self.export_timer.timeout.connect(self._poll_export)
 
         self.status_panel.set_running(False)
         self.last_event_panel.set_text("—")
@@ -122,10 +146,11 @@ class MainWindow(QMainWindow):
         cam = int(self.settings.value("camera_index", 0))
 
         self.controls.sld_conf.setValue(int(conf * 100))
-        self.controls.sld_near.setValue(int(near_t))
-        self.controls.sld_dis.setValue(int(dis_t))
+        self.controls.set_times(near_t, dis_t)
 
-        self.camera.set_index(cam)
+        self.near_required_time = near_t
+        self.disappear_time = dis_t
+        self._preview_camera = cam
         self.log_panel.log(f"Ayarlar yüklendi: conf={conf:.2f}, near={near_t:.1f}s, dis={dis_t:.1f}s, cam={cam}")
 
     def on_conf_changed(self, conf: float):
@@ -134,45 +159,101 @@ class MainWindow(QMainWindow):
         self.log_panel.log(f"Ayar güncellendi: confidence={conf:.2f}")
 
     def on_near_time_changed(self, t: float):
-        self.event_service.set_near_required_time(t)
+        self.near_required_time = t
+        self.pipeline.set_near_required_time(t)
         self.settings.setValue("near_required_time", t)
         self.log_panel.log(f"Ayar güncellendi: near_required_time={t:.1f}s")
 
     def on_disappear_time_changed(self, t: float):
-        self.event_service.set_disappear_time(t)
+        self.disappear_time = t
+        self.pipeline.set_disappear_time(t)
         self.settings.setValue("disappear_time", t)
         self.log_panel.log(f"Ayar güncellendi: disappear_time={t:.1f}s")
 
+    def on_first_shown(self):
+        self.log_panel.log(f"Açılış: ilk pencere {(time.perf_counter() - self._started_at) * 1000:.0f} ms")
+
     def _refresh_cameras(self, initial: bool):
-        cams = CameraService.list_available(max_index=6)
+        if self._camera_job is not None:
+            return
+        self._camera_job = BackgroundTask(
+            CameraService.list_available, max_index=6, refresh=not initial, name="camera-probe"
+        ).start()
+        self._camera_job_initial = initial
+        self.startup_timer.start()
+
+    def _poll_startup(self):
+        job = self._camera_job
+        if job is not None and job.finished:
+            self._camera_job = None
+            if job.error is not None:
+                self.log_panel.log(f"HATA: Kamera taraması başarısız: {job.error}")
+            self._apply_cameras(job.result or [], self._camera_job_initial)
+            self.log_panel.log(f"Kamera taraması: {job.elapsed * 1000:.0f} ms")
+
+        job = self._model_job
+        if job is not None and job.finished:
+            self._model_job = None
+            if job.error is not None:
+                self.log_panel.log(f"HATA: Model yüklenemedi: {job.error}")
+            else:
+                self.log_panel.log(
+                    f"Model hazır: yükleme {self.inferencer.load_seconds:.2f} s, "
+                    f"ısınma {self.inferencer.warmup_seconds or 0.0:.2f} s "
+                    f"(açılıştan {time.perf_counter() - self._started_at:.2f} s)"
+                )
+
+        if self._camera_job is None and self._model_job is None:
+            self.startup_timer.stop()
+
+    def _apply_cameras(self, cams, initial: bool):
         if not cams:
             cams = [0]
+        self._cameras = cams
         self.controls.set_cameras(cams)
 
         if initial:
             saved_cam = int(self.settings.value("camera_index", 0))
             if saved_cam in cams:
                 self.controls.cmb_camera.setCurrentIndex(cams.index(saved_cam))
-                self.camera.set_index(saved_cam)
+                self._preview_camera = saved_cam
             else:
-                self.camera.set_index(self.controls.selected_camera_index())
+                self._preview_camera = self.controls.selected_camera_index()
 
         self.log_panel.log(f"Kameralar: {cams}")
 
     def on_camera_changed(self, cam_index: int):
-        self.camera.set_index(cam_index)
+        self._preview_camera = cam_index
+        self._last_frame_ts = None
         self.settings.setValue("camera_index", cam_index)
         self.log_panel.log(f"Kamera seçildi: {cam_index}")
 
+    def _build_streams(self):
+        selected = self.controls.selected_camera_index()
+        cams = list(self._cameras) if self.controls.all_cameras_selected() else [selected]
+        return [
+            CameraStream(
+                stream_id=idx,
+                camera=CameraService(camera_index=idx),
+                event_service=EventService(self.near_required_time, self.disappear_time),
+            )
+            for idx in cams
+        ]
+
     def on_start(self):
         try:
-            self.camera.set_index(self.controls.selected_camera_index())
-            self.camera.start()
+            streams = self._build_streams()
+            self.pipeline.set_streams(streams)
+            self.pipeline.start()
+            self._preview_camera = self.controls.selected_camera_index()
             self._last_frame_ts = None
+            self._start_clicked_at = time.perf_counter()
+            if not self.inferencer.ready:
+                self.log_panel.log("Model henüz yükleniyor; kareler model hazır olunca işlenecek.")
             self.timer.start()
             self.controls.set_running(True)
             self.status_panel.set_running(True)
-            self.log_panel.log("Sistem başlatıldı.")
+            self.log_panel.log(f"Sistem başlatıldı. Kameralar: {[s.stream_id for s in streams]}")
         except Exception as e:
             self.controls.set_running(False)
             self.status_panel.set_running(False)
@@ -180,7 +261,8 @@ class MainWindow(QMainWindow):
 
     def on_stop(self):
         self.timer.stop()
-        self.camera.stop()
+        self.pipeline.stop()
+        self._drain_pipeline_logs()
         self.controls.set_running(False)
         self.status_panel.set_running(False)
         self.log_panel.log("Sistem durduruldu.")
@@ -188,98 +270,107 @@ class MainWindow(QMainWindow):
         self.video.setPixmap(QPixmap())
         self.video.setText("Video Preview (Ready to Start)")
 
-    def export_csv(self):
-        EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    def open_event_browser(self):
+        if self._event_browser is None:
+            self._event_browser = EventBrowser(self.db, self)
+        self._event_browser.show()
+        self._event_browser.raise_()
+        self._event_browser.activateWindow()
 
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        out_path = EXPORT_DIR / f"events_{ts}.csv"
+    def export_events(self, fmt: str):
+        if self._export_job is not None and not self._export_job.finished:
+            return
 
-        rows = self.db.fetch_events(limit=5000)
-        rows = list(reversed(rows))
+        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+        out_path = EXPORT_DIR / f"events_{ts}{EXPORT_FORMATS[fmt]}"
 
-        with out_path.open("w", newline="", encoding="utf-8-sig") as f:
-            writer = csv.writer(f)
-            writer.writerow(["id", "timestamp", "bottle_id", "message", "snapshot_path"])
-            for r in rows:
-                writer.writerow([r["id"], r["timestamp"], r["bottle_id"], r["message"], r.get("snapshot_path", "")])
+        try:
+            self._export_job = ExportJob(self.db, out_path, fmt=fmt).start()
+        except Exception as e:
+            self.log_panel.log(f"HATA: Export başlatılamadı: {e}")
+            return
 
-        self.log_panel.log(f"CSV oluşturuldu: {out_path}")
+        self.controls.set_export_progress(0.0)
+        self.export_timer.start()
+        self.log_panel.log(f"Export başladı ({fmt}): {out_path}")
 
-    @staticmethod
-    def _draw_box(frame, bbox, text, color_bgr, thickness=2):
-        x1, y1, x2, y2 = [int(v) for v in bbox]
-        cv2.rectangle(frame, (x1, y1), (x2, y2), color_bgr, thickness)
-        cv2.putText(frame, text, (x1, max(0, y1 - 8)),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, color_bgr, 2, cv2.LINE_AA)
+    def _poll_export(self):
+        job = self._export_job
+        if job is None:
+            self.export_timer.stop()
+            return
+        if not job.finished:
+            self.controls.set_export_progress(job.progress)
+            return
 
-    def _update_metrics(self, start_ts: float):
-        end_ts = time.time()
-        latency_ms = (end_ts - start_ts) * 1000.0
+        self.export_timer.stop()
+        self.controls.set_export_progress(None)
+        if job.error:
+            self.log_panel.log(f"HATA: Export başarısız: {job.error}")
+        elif job.cancelled:
+            self.log_panel.log("Export iptal edildi.")
+        else:
+            self.log_panel.log(f"Export tamamlandı: {job.out_path} ({job.done} kayıt, {job.elapsed:.1f} s)")
+        self._export_job = None
 
+    def closeEvent(self, event):
+        self.timer.stop()
+        self.pipeline.stop()
+        if self._export_job is not None:
+            self._export_job.cancel()
+            self._export_job.wait(5.0)
+        if self._file_log is not None:
+            self._file_log.stop()
+            self._file_log = None
+        super().closeEvent(event)
+
+    def _update_metrics(self, processed):
+        end_ts = processed.done_ts
+        latency_ms = processed.latency * 1000.0
+
+        # preview işleme hızından seyrek gelir; FPS arada işlenen kare sayısından hesaplanır
         if self._last_frame_ts is None:
             fps = 0.0
         else:
             dt = max(1e-6, (end_ts - self._last_frame_ts))
-            fps = 1.0 / dt
+            fps = (processed.frames - self._last_frames) / dt
         self._last_frame_ts = end_ts
+        self._last_frames = processed.frames
 
         a = 0.1
         self._fps_smooth = (1 - a) * self._fps_smooth + a * fps
         self._lat_smooth = (1 - a) * self._lat_smooth + a * latency_ms
         self.metrics_panel.set_metrics(self._fps_smooth, self._lat_smooth)
 
-    def _tick(self):
-        tick_start = time.time()
+    def _drain_pipeline_logs(self):
+        for message in self.pipeline.poll_messages():
+            self.log_panel.log(message, mirror=False)
 
-        frame = self.camera.read()
-        if frame is None:
-            return
-
-        results = self.inferencer.track(frame)
-        tracked = self.tracker.update(results)
-
-        events = self.event_service.update(tracked)
-        armed_ids = self.event_service.get_armed_ids()
-
-        annotated = frame.copy()
-
-        for d in tracked:
-            cls_id = d["cls_id"]
-            tid = d["track_id"]
-            bbox = d["bbox"]
-
-            if cls_id == 0:
-                self._draw_box(annotated, bbox, f"person ID {tid}", (0, 255, 0))
-            elif cls_id == 39:
-                if tid in armed_ids:
-                    self._draw_box(annotated, bbox, f"bottle ID {tid} (ARMED)", (0, 0, 255))
-                else:
-                    self._draw_box(annotated, bbox, f"bottle ID {tid}", (255, 255, 0))
-
-        for ev in events:
-            ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            bottle_id = None
-            try:
-                bottle_id = int(ev.split("ID")[1].split()[0])
-            except Exception:
-                pass
-
-            SNAP_DIR.mkdir(parents=True, exist_ok=True)
-            ts_file = datetime.now().strftime("%Y%m%d_%H%M%S")
-            snap_path = SNAP_DIR / f"event_{ts_file}_bottle_{bottle_id}.jpg"
-
-            ok = cv2.imwrite(str(snap_path), annotated)
-            if not ok:
-                self.log_panel.log(f"HATA: Snapshot yazılamadı: {snap_path}")
-                snap_path_str = ""
-            else:
-                snap_path_str = str(snap_path)
-
-            msg = f"{ts} | {ev} | SNAP: {snap_path_str}"
+        for record in self.pipeline.poll_events():
+            msg = f"{record.timestamp} | CAM {record.camera_id} | {record.message} | SNAP: {record.snapshot_path}"
+            if record.clip_path:
+                msg += f" | CLIP: {record.clip_path}"
             self.log_panel.log(msg)
             self.last_event_panel.set_text(msg)
 
-            self.db.insert_event(ts, bottle_id, ev, snap_path_str)
+    def _poll_pipeline(self):
+        self._drain_pipeline_logs()
+
+        # pipeline preview'ı doğrudan widget boyutunda üretir (pencere boyutu değişince de)
+        self.pipeline.set_preview_size(*self.video.target_size())
+
+        # ilk tespit: pipeline'ın tespit içeren ilk kareyi işlediği an (preview karesi değil)
+        detected_at = self.pipeline.first_detection_at
+        if self._start_clicked_at is not None and detected_at is not None:
+            self.log_panel.log(
+                f"İlk tespit: Start'tan {(detected_at - self._start_clicked_at) * 1000:.0f} ms, "
+                f"açılıştan {detected_at - self._started_at:.2f} s"
+            )
+            self._start_clicked_at = None
+
+        processed = self.pipeline.poll_preview(self._preview_camera)
+        if processed is None:
+            return
 
-        self.video.set_frame(annotated)
-        self._update_metrics(tick_start)
\ No newline at end of file
+        self.video.set_frame(processed.preview)
+        self._update_metrics(processed)
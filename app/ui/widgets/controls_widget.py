@@ -1,9 +1,13 @@
 from PyQt5.QtCore import pyqtSignal, Qt
 from PyQt5.QtWidgets import (
-    QWidget, QHBoxLayout, QVBoxLayout, QPushButton, QLabel, QComboBox, QSlider
+    QWidget, QHBoxLayout, QVBoxLayout, QPushButton, QLabel, QComboBox, QSlider, QCheckBox
 )
 
 
+# süre slider'ları tam sayı adımla çalışır; bir adım TIME_STEP saniyedir
+TIME_STEP = 0.1
+
+
 class ControlsWidget(QWidget):
     start_clicked = pyqtSignal()
     stop_clicked = pyqtSignal()
@@ -14,7 +18,8 @@ class ControlsWidget(QWidget):
     near_time_changed = pyqtSignal(float)
     disappear_time_changed = pyqtSignal(float)
 
-    export_csv_clicked = pyqtSignal()
+    export_clicked = pyqtSignal(str)
+    history_clicked = pyqtSignal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -27,8 +32,11 @@ class ControlsWidget(QWidget):
         self.lbl_cam = QLabel("Kamera:")
         self.cmb_camera = QComboBox()
         self.btn_refresh = QPushButton("Yenile")
+        self.chk_all_cameras = QCheckBox("Tüm kameralar")
 
-        self.btn_export = QPushButton("CSV Export")
+        self.cmb_export_format = QComboBox()
+        self.btn_export = QPushButton("Export")
+        self.btn_history = QPushButton("Olay Geçmişi")
 
         top_row = QHBoxLayout()
         top_row.addWidget(self.btn_start)
@@ -37,8 +45,11 @@ class ControlsWidget(QWidget):
         top_row.addWidget(self.lbl_cam)
         top_row.addWidget(self.cmb_camera)
         top_row.addWidget(self.btn_refresh)
+        top_row.addWidget(self.chk_all_cameras)
         top_row.addSpacing(20)
+        top_row.addWidget(self.cmb_export_format)
         top_row.addWidget(self.btn_export)
+        top_row.addWidget(self.btn_history)
         top_row.addStretch(1)
 
         # --- alt satır: slider’lar
@@ -51,14 +62,14 @@ class ControlsWidget(QWidget):
         self.lbl_near = QLabel("Yakınlık süresi: 3.0s")
         self.sld_near = QSlider(Qt.Horizontal)
         self.sld_near.setMinimum(1)
-        self.sld_near.setMaximum(10)
-        self.sld_near.setValue(3)
+        self.sld_near.setMaximum(100)
+        self.sld_near.setValue(30)
 
         self.lbl_dis = QLabel("Kaybolma süresi: 3.0s")
         self.sld_dis = QSlider(Qt.Horizontal)
         self.sld_dis.setMinimum(1)
-        self.sld_dis.setMaximum(10)
-        self.sld_dis.setValue(3)
+        self.sld_dis.setMaximum(100)
+        self.sld_dis.setValue(30)
 
         bottom_row = QHBoxLayout()
         bottom_row.addWidget(self.lbl_conf)
@@ -85,7 +96,8 @@ class ControlsWidget(QWidget):
         self.sld_near.valueChanged.connect(self._on_near_changed)
         self.sld_dis.valueChanged.connect(self._on_dis_changed)
 
-        self.btn_export.clicked.connect(self.export_csv_clicked.emit)
+        self.btn_export.clicked.connect(lambda: self.export_clicked.emit(self.cmb_export_format.currentData()))
+        self.btn_history.clicked.connect(self.history_clicked.emit)
 
     def set_cameras(self, camera_indices):
         self.cmb_camera.blockSignals(True)
@@ -98,14 +110,33 @@ class ControlsWidget(QWidget):
         data = self.cmb_camera.currentData()
         return int(data) if data is not None else 0
 
+    def all_cameras_selected(self) -> bool:
+        return self.chk_all_cameras.isChecked()
+
+    def set_export_formats(self, formats):
+        self.cmb_export_format.clear()
+        for fmt in formats:
+            self.cmb_export_format.addItem(fmt.upper(), fmt)
+
+    def set_export_progress(self, progress):
+        # progress: None -> export yok, 0..1 -> devam ediyor
+        if progress is None:
+            self.btn_export.setText("Export")
+            self.btn_export.setEnabled(True)
+            self.cmb_export_format.setEnabled(True)
+        else:
+            self.btn_export.setText(f"Export %{int(progress * 100)}")
+            self.btn_export.setEnabled(False)
+            self.cmb_export_format.setEnabled(False)
+
     def set_running(self, running: bool):
         self.btn_start.setEnabled(not running)
         self.btn_stop.setEnabled(running)
-        self.cmb_camera.setEnabled(not running)
+        # çoklu kamera modunda combo, çalışırken önizlenecek kamerayı seçer
+        self.cmb_camera.setEnabled(not running or self.all_cameras_selected())
+        self.chk_all_cameras.setEnabled(not running)
         self.btn_refresh.setEnabled(not running)
 
-        self.btn_export.setEnabled(True)
-
         self.sld_conf.setEnabled(True)
         self.sld_near.setEnabled(True)
         self.sld_dis.setEnabled(True)
@@ -126,12 +157,16 @@ class ControlsWidget(QWidget):
         self.lbl_conf.setText(f"Confidence: {conf:.2f}")
         self.conf_changed.emit(conf)
 
+    def set_times(self, near_time: float, disappear_time: float):
+        self.sld_near.setValue(round(near_time / TIME_STEP))
+        self.sld_dis.setValue(round(disappear_time / TIME_STEP))
+
     def _on_near_changed(self, v: int):
-        t = float(v)
+        t = round(v * TIME_STEP, 1)
         self.lbl_near.setText(f"Yakınlık süresi: {t:.1f}s")
         self.near_time_changed.emit(t)
 
     def _on_dis_changed(self, v: int):
-        t = float(v)
+        t = round(v * TIME_STEP, 1)
         self.lbl_dis.setText(f"Kaybolma süresi: {t:.1f}s")
         self.disappear_time_changed.emit(t)
\ No newline at end of file
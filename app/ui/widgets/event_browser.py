@@ -0,0 +1,258 @@
+import time
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, QTimer, QUrl, pyqtSignal
+from PyQt5.QtGui import QDesktopServices
+from PyQt5.QtWidgets import (
+    QAbstractItemView, QComboBox, QDialog, QHBoxLayout, QHeaderView, QInputDialog, QLabel, QLineEdit,
+    QTableView, QVBoxLayout,
+)
+
+from app.services.background_task import BackgroundTask
+from app.services.event_rules import SEVERITIES
+
+
+COLUMNS = (
+    ("timestamp", "Zaman"),
+    ("camera_id", "Kamera"),
+    ("class_name", "Sınıf"),
+    ("bottle_id", "Track ID"),
+    ("severity", "Önem"),
+    ("message", "Mesaj"),
+    ("notes", "Not"),
+    ("snapshot_path", "Snapshot"),
+)
+NOTES_COLUMN = [key for key, _ in COLUMNS].index("notes")
+
+PERIODS = (
+    ("Tüm zamanlar", None),
+    ("Son 24 saat", 24 * 3600),
+    ("Son 7 gün", 7 * 24 * 3600),
+    ("Son 30 gün", 30 * 24 * 3600),
+    ("Son 1 yıl", 365 * 24 * 3600),
+)
+
+
+class EventTableModel(QAbstractTableModel):
+    """
+    Sayfa sayfa dolan event tablosu. Görünüm sona kaydırıldığında fetchMore() yalnızca
+    fetch_requested sinyali yayar; sayfa arka planda okunup append_page() ile eklenir.
+    """
+
+    fetch_requested = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.cursor = None
+        self.exhausted = True
+        self.loading = False
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            value = self.rows[index.row()].get(COLUMNS[index.column()][0])
+            return "" if value is None else str(value)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section][1]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and not self.exhausted and not self.loading
+
+    def fetchMore(self, parent=QModelIndex()) -> None:
+        self.fetch_requested.emit()
+
+    def reset(self) -> None:
+        self.beginResetModel()
+        self.rows = []
+        self.cursor = None
+        self.exhausted = False
+        self.endResetModel()
+
+    def append_page(self, events, cursor) -> None:
+        if events:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(events) - 1)
+            self.rows.extend(events)
+            self.endInsertRows()
+        self.cursor = cursor
+        self.exhausted = cursor is None
+
+    def set_notes(self, row: int, notes: str) -> None:
+        self.rows[row]["notes"] = notes
+        index = self.index(row, NOTES_COLUMN)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole])
+
+
+class EventBrowser(QDialog):
+    """
+    Event geçmişinde tam metin (mesaj ve notlar) ve yapısal (kamera, sınıf, önem, dönem) arama.
+    Sayfalar Database.fetch_page ile keyset sayfalamayla, GUI thread'i dışında okunur; yazarken
+    arama SEARCH_DELAY_MS bekleyip yeniden başlar, eski aramanın sonucu atılır.
+    Not sütununa çift tıklamak not ekler, diğer sütunlar snapshot'ı açar.
+    """
+
+    PAGE_SIZE = 200
+    SEARCH_DELAY_MS = 300
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Olay Geçmişi")
+        self.resize(1100, 600)
+        self.db = db
+
+        self.txt_search = QLineEdit()
+        self.txt_search.setPlaceholderText("Ara: mesaj ve notlar (ör. bottle 12)")
+        self.txt_search.setClearButtonEnabled(True)
+        self.cmb_camera = QComboBox()
+        self.cmb_class = QComboBox()
+        self.cmb_severity = QComboBox()
+        self.cmb_period = QComboBox()
+        self._set_choices(self.cmb_camera, "Tüm kameralar", [], lambda c: f"Camera {c}")
+        self._set_choices(self.cmb_class, "Tüm sınıflar", [], str)
+        self._set_choices(self.cmb_severity, "Tüm önemler", SEVERITIES, str)
+        for label, seconds in PERIODS:
+            self.cmb_period.addItem(label, seconds)
+        self.lbl_status = QLabel("")
+
+        self.model = EventTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setDefaultSectionSize(22)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.table.horizontalHeader().setStretchLastSection(True)
+
+        filters = QHBoxLayout()
+        filters.addWidget(self.txt_search, 2)
+        filters.addWidget(self.cmb_camera)
+        filters.addWidget(self.cmb_class)
+        filters.addWidget(self.cmb_severity)
+        filters.addWidget(self.cmb_period)
+
+        layout = QVBoxLayout()
+        layout.addLayout(filters)
+        layout.addWidget(self.table, 1)
+        layout.addWidget(self.lbl_status)
+        self.setLayout(layout)
+
+        # arka plan işleri: seçenek listeleri ve sayfalar; bitişleri job_timer yoklar
+        self._choices_job = None
+        self._page_job = None
+        self._page_generation = 0
+        self._generation = 0
+        self.job_timer = QTimer(self)
+        self.job_timer.setInterval(50)
+        self.job_timer.timeout.connect(self._poll_jobs)
+
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.search)
+
+        self.txt_search.textChanged.connect(self.search_timer.start)
+        self.txt_search.returnPressed.connect(self.search)
+        for combo in (self.cmb_camera, self.cmb_class, self.cmb_severity, self.cmb_period):
+            combo.currentIndexChanged.connect(self.search)
+        self.model.fetch_requested.connect(self._load_next_page)
+        self.table.doubleClicked.connect(self._on_double_clicked)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # her açılışta kamera/sınıf listeleri ve ilk sayfa tazelenir
+        self._choices_job = BackgroundTask(
+            lambda: (self.db.count_by("camera_id"), self.db.count_by("class_name")), name="event-browser-choices"
+        ).start()
+        self.job_timer.start()
+        self.search()
+
+    @staticmethod
+    def _set_choices(combo: QComboBox, all_label: str, values, fmt) -> None:
+        current = combo.currentData()
+        combo.blockSignals(True)
+        combo.clear()
+        combo.addItem(all_label, None)
+        for value in values:
+            combo.addItem(fmt(value), value)
+        index = combo.findData(current)
+        combo.setCurrentIndex(max(0, index))
+        combo.blockSignals(False)
+
+    def _filters(self) -> dict:
+        seconds = self.cmb_period.currentData()
+        return {
+            "text": self.txt_search.text().strip() or None,
+            "camera_id": self.cmb_camera.currentData(),
+            "class_name": self.cmb_class.currentData(),
+            "severity": self.cmb_severity.currentData(),
+            "since": time.time() - seconds if seconds else None,
+        }
+
+    def search(self) -> None:
+        self.search_timer.stop()
+        self._generation += 1
+        self.model.reset()
+        self.lbl_status.setText("Aranıyor...")
+        self._load_next_page()
+
+    def _load_next_page(self) -> None:
+        # aynı anda tek sayfa okunur; eski arama sürüyorsa bitince yeni arama başlatılır
+        if self._page_job is not None or self.model.exhausted:
+            return
+        self.model.loading = True
+        self._page_generation = self._generation
+        self._page_job = BackgroundTask(
+            self.db.fetch_page, limit=self.PAGE_SIZE, cursor=self.model.cursor, name="event-browser-page",
+            **self._filters()
+        ).start()
+        self.job_timer.start()
+
+    def _poll_jobs(self) -> None:
+        job = self._choices_job
+        if job is not None and job.finished:
+            self._choices_job = None
+            if job.error is None:
+                cameras, classes = job.result
+                self._set_choices(self.cmb_camera, "Tüm kameralar",
+                                  [c for c in cameras if c is not None], lambda c: f"Camera {c}")
+                self._set_choices(self.cmb_class, "Tüm sınıflar", [c for c in classes if c], str)
+
+        job = self._page_job
+        if job is not None and job.finished:
+            self._page_job = None
+            self.model.loading = False
+            if self._page_generation != self._generation:
+                self._load_next_page()
+            elif job.error is not None:
+                self.model.exhausted = True
+                self.lbl_status.setText(f"HATA: {job.error}")
+            else:
+                events, cursor = job.result
+                self.model.append_page(events, cursor)
+                more = "+" if cursor is not None else ""
+                self.lbl_status.setText(f"{len(self.model.rows)}{more} kayıt (son sayfa {job.elapsed * 1000:.0f} ms)")
+
+        if self._choices_job is None and self._page_job is None:
+            self.job_timer.stop()
+
+    def _on_double_clicked(self, index) -> None:
+        event = self.model.rows[index.row()]
+        if index.column() == NOTES_COLUMN:
+            notes, ok = QInputDialog.getText(self, "Not", f"Olay {event['id']} notu:", text=event.get("notes") or "")
+            if ok:
+                self.db.set_notes(event["id"], notes.strip())
+                self.model.set_notes(index.row(), notes.strip() or None)
+            return
+        if event.get("snapshot_path"):
+            QDesktopServices.openUrl(QUrl.fromLocalFile(event["snapshot_path"]))
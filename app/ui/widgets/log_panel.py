@@ -1,9 +1,14 @@
+import logging
+
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel
 from PyQt5.QtCore import Qt
 
 from app.ui.widgets.log_widget import LogWidget
 
 
+log = logging.getLogger("app.ui")
+
+
 class LogPanel(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -22,5 +27,8 @@ class LogPanel(QWidget):
 
         self.setLayout(layout)
 
-    def log(self, message: str) -> None:
-        self.log_widget.log(message)
\ No newline at end of file
+    def log(self, message: str, mirror: bool = True) -> None:
+        # mirror=False: mesaj zaten bir logger üzerinden dosyaya gitti (ör. pipeline uyarıları)
+        self.log_widget.log(message)
+        if mirror:
+            log.info(message)
@@ -1,11 +1,82 @@
-from PyQt5.QtWidgets import QTextEdit
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt, QTimer
+from PyQt5.QtWidgets import QAbstractItemView, QListView
 
+from app.services.log_buffer import LogBuffer
 
-class LogWidget(QTextEdit):
-    def __init__(self, parent=None):
+
+class LogModel(QAbstractListModel):
+    """LogBuffer'ı liste görünümüne bağlar; satırlar yalnızca görünür oldukça metne çevrilir."""
+
+    def __init__(self, buffer: LogBuffer, parent=None):
+        super().__init__(parent)
+        self.buffer = buffer
+        self._rows = 0  # görünümün bildiği satır sayısı
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._rows
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid() or index.row() >= len(self.buffer):
+            return None
+        return self.buffer[index.row()].text()
+
+    def sync(self) -> bool:
+        """Son senkrondan beri biriken değişiklikleri tek seferde bildirir; değişiklik varsa True."""
+        removed, added, updated = self.buffer.take_changes()
+        if not (removed or added or updated):
+            return False
+
+        removed = min(removed, self._rows)
+        if removed:
+            self.beginRemoveRows(QModelIndex(), 0, removed - 1)
+            self._rows -= removed
+            self.endRemoveRows()
+        if updated and self._rows:
+            last = self.index(self._rows - 1)
+            self.dataChanged.emit(last, last, [Qt.DisplayRole])
+        new = len(self.buffer) - self._rows
+        if new > 0:
+            self.beginInsertRows(QModelIndex(), self._rows, self._rows + new - 1)
+            self._rows += new
+            self.endInsertRows()
+        return True
+
+
+class LogWidget(QListView):
+    """
+    Sabit kapasiteli, sanallaştırılmış log görünümü. log() yalnızca tampona ekler; görünüm
+    en fazla FLUSH_INTERVAL_MS'de bir, o aralıkta gelen tüm satırlarla birlikte güncellenir.
+    Kullanıcı yukarı kaydırmadıysa görünüm son satırı takip eder.
+    """
+
+    FLUSH_INTERVAL_MS = 100
+
+    def __init__(self, parent=None, capacity: int = 5000):
         super().__init__(parent)
-        self.setReadOnly(True)
         self.setMinimumWidth(320)  # log alanı ezilmesin
 
+        self.buffer = LogBuffer(capacity)
+        self.log_model = LogModel(self.buffer, self)
+        self.setModel(self.log_model)
+        # tüm satırlar aynı yükseklikte: görünüm yalnızca ekrandaki satırları ölçer ve çizer
+        self.setUniformItemSizes(True)
+        self.setWordWrap(False)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush)
+
     def log(self, message: str) -> None:
-        self.append(message)
\ No newline at end of file
+        self.buffer.append(message)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush(self) -> None:
+        bar = self.verticalScrollBar()
+        follow = bar.value() >= bar.maximum()
+        if self.log_model.sync() and follow:
+            self.scrollToBottom()
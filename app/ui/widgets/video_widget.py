@@ -1,10 +1,21 @@
 import cv2
+import numpy as np
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QImage, QPixmap
 from PyQt5.QtWidgets import QLabel, QSizePolicy
 
 
+# Qt 5.14+: BGR kare renk dönüşümü olmadan gösterilir
+_BGR888 = getattr(QImage, "Format_BGR888", None)
+
+
 class VideoWidget(QLabel):
+    """
+    Pipeline'ın target_size()'a küçültüp çizdiği BGR preview karelerini gösterir.
+    Kare zaten widget boyutundaysa ölçekleme yapılmaz; eski Qt sürümlerinde BGR->RGB
+    dönüşümü önceden ayrılmış tek bir tampona yapılır.
+    """
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
@@ -15,13 +26,30 @@ class VideoWidget(QLabel):
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.setMinimumSize(640, 360)
 
+        self._rgb = None  # Format_BGR888 yoksa dönüşüm tamponu
+
+    def target_size(self):
+        """Preview karelerinin sığdırılacağı (genişlik, yükseklik): kenarlık hariç alan."""
+        rect = self.contentsRect()
+        return rect.width(), rect.height()
+
     def set_frame(self, frame_bgr) -> None:
-        frame_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
-        h, w, ch = frame_rgb.shape
-        bytes_per_line = ch * w
+        h, w = frame_bgr.shape[:2]
+        if not frame_bgr.flags["C_CONTIGUOUS"]:
+            frame_bgr = np.ascontiguousarray(frame_bgr)
 
-        qimg = QImage(frame_rgb.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        pix = QPixmap.fromImage(qimg)
+        if _BGR888 is not None:
+            qimg = QImage(frame_bgr.data, w, h, frame_bgr.strides[0], _BGR888)
+        else:
+            if self._rgb is None or self._rgb.shape != frame_bgr.shape:
+                self._rgb = np.empty_like(frame_bgr)
+            cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB, dst=self._rgb)
+            qimg = QImage(self._rgb.data, w, h, self._rgb.strides[0], QImage.Format_RGB888)
 
-        pix = pix.scaled(self.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        self.setPixmap(pix)
\ No newline at end of file
+        # fromImage veriyi kopyalar; kare (PreviewRenderer çıktısı) yalnızca bu widget'a aittir
+        pix = QPixmap.fromImage(qimg)
+        tw, th = self.target_size()
+        if w > tw or h > th:
+            # pencere küçüldü ve yeni boyut henüz pipeline'a ulaşmadı: ucuz ölçekleme yeterli
+            pix = pix.scaled(tw, th, Qt.KeepAspectRatio, Qt.FastTransformation)
+        self.setPixmap(pix)
@@ -0,0 +1,164 @@
+"""
+Inference backend'lerini (PyTorch, ONNX Runtime, OpenVINO; FP32/INT8) hız ve doğruluk açısından karşılaştırır.
+
+    python -m benchmarks.bench_backends --source kayit.mp4 --variants torch onnx onnx-int8 openvino-int8
+
+Referans PyTorch çıktısıdır. Her kare için kutular aynı sınıf içinde IoU >= --iou ile açgözlü eşleştirilir;
+rapor, PyTorch'a göre precision/recall/F1, eşleşen kutuların ortalama IoU'su ve güven farkı ile
+kare başına süre (p50/ortalama) ve hızlanmayı içerir. Dışa aktarılmış modeller önceden
+python -m app.model_export ile üretilmiş olmalıdır.
+"""
+import argparse
+import json
+import platform
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.services.detections import Detections
+from app.services.model_backends import resolve_model, sample_frames
+
+
+CLASSES = [0, 39]
+
+
+def parse_variant(variant: str):
+    backend, _, suffix = variant.partition("-")
+    return backend, suffix == "int8"
+
+
+def run_variant(weights, variant: str, frames, conf: float, imgsz: int, warmup: int = 5):
+    from ultralytics import YOLO
+
+    backend, int8 = parse_variant(variant)
+    model = YOLO(resolve_model(weights, None if backend == "torch" else backend, int8), task="detect")
+
+    def predict(frame):
+        result = model.predict(frame, conf=conf, classes=CLASSES, imgsz=imgsz, verbose=False)[0]
+        return Detections.from_boxes(result.boxes)
+
+    for frame in frames[:warmup]:
+        predict(frame)
+
+    outputs, times = [], []
+    for frame in frames:
+        t = time.perf_counter()
+        outputs.append(predict(frame))
+        times.append((time.perf_counter() - t) * 1000.0)
+    return outputs, times
+
+
+def iou_matrix(a, b):
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+def match(ref: Detections, cand: Detections, iou_threshold: float):
+    """Sınıf içinde, aday güvenine göre açgözlü eşleştirme -> [(iou, conf farkı)], ref sayısı, aday sayısı."""
+    pairs = []
+    for cls_id in CLASSES:
+        r = ref.select(ref.cls_ids == cls_id)
+        c = cand.select(cand.cls_ids == cls_id)
+        if not len(r) or not len(c):
+            continue
+        ious = iou_matrix(c.xyxy.astype(np.float64), r.xyxy.astype(np.float64))
+        used = np.zeros(len(r), dtype=bool)
+        for ci in np.argsort(-c.confs):
+            row = np.where(used, -1.0, ious[ci])
+            ri = int(row.argmax())
+            if row[ri] >= iou_threshold:
+                used[ri] = True
+                pairs.append((float(row[ri]), abs(float(c.confs[ci]) - float(r.confs[ri]))))
+    return pairs, len(ref), len(cand)
+
+
+def compare(reference, candidate, iou_threshold: float):
+    matched = n_ref = n_cand = 0
+    ious, conf_deltas = [], []
+    for ref, cand in zip(reference, candidate):
+        pairs, r, c = match(ref, cand, iou_threshold)
+        matched += len(pairs)
+        n_ref += r
+        n_cand += c
+        ious += [p[0] for p in pairs]
+        conf_deltas += [p[1] for p in pairs]
+
+    precision = matched / n_cand if n_cand else 1.0
+    recall = matched / n_ref if n_ref else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "reference_boxes": n_ref,
+        "boxes": n_cand,
+        "matched": matched,
+        "precision": round(precision, 4),
+        "recall": round(recall, 4),
+        "f1": round(f1, 4),
+        "mean_iou": round(float(np.mean(ious)), 4) if ious else None,
+        "mean_conf_delta": round(float(np.mean(conf_deltas)), 4) if conf_deltas else None,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="python -m benchmarks.bench_backends",
+                                description=__doc__.strip().splitlines()[0])
+    p.add_argument("--source", required=True, help="Görüntü klasörü veya video")
+    p.add_argument("--weights", type=Path, default=Path("yolov8n.pt"))
+    p.add_argument("--variants", nargs="+", default=["torch", "onnx", "onnx-int8"],
+                   help="torch, onnx, onnx-int8, openvino, openvino-int8")
+    p.add_argument("--frames", type=int, default=200)
+    p.add_argument("--conf", type=float, default=0.45)
+    p.add_argument("--imgsz", type=int, default=640)
+    p.add_argument("--iou", type=float, default=0.5, help="Eşleşme için en düşük IoU")
+    p.add_argument("--out", type=Path, default=None, help="JSON rapor dosyası")
+    return p
+
+
+def main(argv=None) -> None:
+    args = build_parser().parse_args(argv)
+    frames = sample_frames(args.source, args.frames)
+    if not frames:
+        raise SystemExit(f"Kare okunamadı: {args.source}")
+
+    variants = ["torch"] + [v for v in args.variants if v != "torch"]
+    outputs, report = {}, {
+        "benchmark": "backends",
+        "source": args.source,
+        "frames": len(frames),
+        "conf": args.conf,
+        "imgsz": args.imgsz,
+        "iou_threshold": args.iou,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "variants": {},
+    }
+    for variant in variants:
+        outputs[variant], times = run_variant(args.weights, variant, frames, args.conf, args.imgsz)
+        report["variants"][variant] = {
+            "ms_p50": round(float(np.percentile(times, 50)), 2),
+            "ms_mean": round(float(np.mean(times)), 2),
+            "fps": round(1000.0 / float(np.mean(times)), 2),
+        }
+
+    torch_ms = report["variants"]["torch"]["ms_mean"]
+    print(f"{'variant':<16}{'ms p50':>9}{'fps':>9}{'speedup':>9}{'prec':>8}{'recall':>8}{'F1':>8}{'mIoU':>8}")
+    for variant in variants:
+        entry = report["variants"][variant]
+        entry["speedup"] = round(torch_ms / entry["ms_mean"], 2)
+        entry["vs_torch"] = compare(outputs["torch"], outputs[variant], args.iou)
+        acc = entry["vs_torch"]
+        print(f"{variant:<16}{entry['ms_p50']:>9.2f}{entry['fps']:>9.2f}{entry['speedup']:>9.2f}"
+              f"{acc['precision']:>8.3f}{acc['recall']:>8.3f}{acc['f1']:>8.3f}{acc['mean_iou'] or 0:>8.3f}")
+
+    if args.out is not None:
+        args.out.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
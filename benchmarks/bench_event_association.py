@@ -0,0 +1,137 @@
+"""
+EventService kişi-bottle eşleştirmesi için mikro benchmark.
+
+    python -m benchmarks.bench_event_association
+
+Eski iç içe Python döngüsü, NumPy yayını (broadcast), GridIndex ve EventService'in sahne boyuna göre
+seçtiği yol (SMALL_SCENE nesneye kadar liste döngüsü) aynı rastgele sahnelerde karşılaştırılır;
+sonuçların aynı olduğu da kontrol edilir. İkinci tablo uzaklık tabanlı yakınlığı
+(near_distance) kalabalık sahnelerde ölçer.
+"""
+import random
+import timeit
+
+import numpy as np
+
+from app.services.detections import Detections
+from app.services.event_service import EventService
+from app.services.spatial_index import GridIndex, near_mask, point_box_distance
+
+
+SIZES = (10, 30, 50, 80, 100, 200)
+CROWD_SIZES = (100, 200, 300, 1000, 3000)
+RADIUS = 40.0
+REPEATS = 200
+
+
+def make_scene(n_objects: int, seed: int = 0):
+    rng = random.Random(seed)
+    tracked = []
+    for i in range(n_objects):
+        # yaklaşık 1/4 kişi, 3/4 ürün
+        cls_id = 0 if i % 4 == 0 else 39
+        w, h = (rng.uniform(80, 200), rng.uniform(200, 400)) if cls_id == 0 else (rng.uniform(15, 40),) * 2
+        x1, y1 = rng.uniform(0, 1920 - w), rng.uniform(0, 1080 - h)
+        # Detections kutuları float32 tutar; karşılaştırma aynı değerlerle yapılsın
+        bbox = np.array([x1, y1, x1 + w, y1 + h], dtype=np.float32).tolist()
+        tracked.append({"track_id": i + 1, "cls_id": cls_id, "conf": 0.9, "bbox": bbox})
+    return tracked
+
+
+def loop_near(tracked):
+    persons = [d for d in tracked if d.get("cls_id") == 0 and d.get("track_id") is not None]
+    bottles = [d for d in tracked if d.get("cls_id") == 39 and d.get("track_id") is not None]
+
+    near = []
+    for b in bottles:
+        x1, y1, x2, y2 = b["bbox"]
+        x, y = (x1 + x2) / 2, (y1 + y2) / 2
+        is_near = False
+        for p in persons:
+            px1, py1, px2, py2 = p["bbox"]
+            if px1 <= x <= px2 and py1 <= y <= py2:
+                is_near = True
+                break
+        near.append(is_near)
+    return near
+
+
+def vector_near(tracked):
+    return vector_near_detections(Detections.from_dicts(tracked))
+
+
+def vector_near_detections(det: Detections):
+    has_id = det.track_ids >= 0
+    bottle_boxes = det.xyxy[(det.cls_ids == 39) & has_id].astype(np.float64)
+    centers = np.column_stack((
+        (bottle_boxes[:, 0] + bottle_boxes[:, 2]) / 2,
+        (bottle_boxes[:, 1] + bottle_boxes[:, 3]) / 2,
+    ))
+    return near_mask(centers, det.xyxy[(det.cls_ids == 0) & has_id]).tolist()
+
+
+def split(det: Detections):
+    has_id = det.track_ids >= 0
+    bottles = det.xyxy[(det.cls_ids == 39) & has_id].astype(np.float64)
+    centers = np.column_stack(((bottles[:, 0] + bottles[:, 2]) / 2, (bottles[:, 1] + bottles[:, 3]) / 2))
+    return centers, det.xyxy[(det.cls_ids == 0) & has_id].astype(np.float64)
+
+
+def broadcast_within(centers, persons, radius):
+    dist = point_box_distance(centers[:, 0:1], centers[:, 1:2], persons[None, :, :])
+    return (dist <= radius).any(axis=1)
+
+
+def grid_within(centers, persons, radius):
+    return GridIndex(persons, pad=radius).any_within(centers, radius)
+
+
+def _time(fn) -> float:
+    return min(timeit.repeat(fn, number=REPEATS, repeat=5)) / REPEATS
+
+
+def main() -> None:
+    # "numpy+dict": dict listesinden dizilere çevirme dahil
+    # "numpy": Detections hazırken yalnızca eşleştirme (pipeline'daki durum)
+    # "service": EventService'in bu sahne boyu için seçtiği eşleştirme (küçük sahnede liste döngüsü)
+    # "speedup": loop / numpy; 1'in altında NumPy döngüden yavaştır
+    service = EventService()
+    print(f"{'objects':>8} {'loop (us)':>12} {'numpy+dict (us)':>16} {'numpy (us)':>12} {'service (us)':>13} "
+          f"{'speedup':>11}")
+    for n in SIZES:
+        tracked = make_scene(n)
+        det = Detections.from_dicts(tracked)
+        assert loop_near(tracked) == vector_near(tracked)
+        associate = service._associate_small if len(det) <= service.SMALL_SCENE else service._associate
+        assert [near for _, _, near, _ in associate(det)] == loop_near(tracked)
+
+        t_loop = _time(lambda: loop_near(tracked))
+        t_dict = _time(lambda: vector_near(tracked))
+        t_vec = _time(lambda: vector_near_detections(det))
+        t_service = _time(lambda: list(associate(det)))
+        print(f"{n:>8} {t_loop * 1e6:>12.1f} {t_dict * 1e6:>16.1f} {t_vec * 1e6:>12.1f} {t_service * 1e6:>13.1f} "
+              f"{t_loop / t_vec:>10.1f}x")
+
+    # kalabalık sahne, near_distance = RADIUS: P x B yayın ile ızgara indeksi
+    print()
+    # near_mask: çift sayısına göre yayın/ızgara seçen, EventService'in kullandığı yol.
+    # komşu/nokta: yarıçap içindeki gerçek kişi sayısı; sabit kareye daha çok nesne sığdıkça büyür
+    # ve ızgaranın nesne başı maliyeti de onunla artar (sonuç çiftlerinin kendisi N^2 büyür).
+    print(f"{'objects':>8} {'broadcast (us)':>15} {'grid (us)':>10} {'near_mask (us)':>15} "
+          f"{'grid us/obj':>12} {'neighbours/pt':>14}")
+    for n in CROWD_SIZES:
+        centers, persons = split(Detections.from_dicts(make_scene(n, seed=n)))
+        assert (broadcast_within(centers, persons, RADIUS) == grid_within(centers, persons, RADIUS)).all()
+        neighbours = len(GridIndex(persons, pad=RADIUS).query_radius(centers)[0]) / max(len(centers), 1)
+
+        repeats = max(5, REPEATS // (n // 100))
+        t_brute = min(timeit.repeat(lambda: broadcast_within(centers, persons, RADIUS), number=repeats, repeat=3))
+        t_grid = min(timeit.repeat(lambda: grid_within(centers, persons, RADIUS), number=repeats, repeat=3))
+        t_mask = min(timeit.repeat(lambda: near_mask(centers, persons, RADIUS), number=repeats, repeat=3))
+        t_brute, t_grid, t_mask = t_brute / repeats, t_grid / repeats, t_mask / repeats
+        print(f"{n:>8} {t_brute * 1e6:>15.1f} {t_grid * 1e6:>10.1f} {t_mask * 1e6:>15.1f} "
+              f"{t_grid * 1e6 / n:>12.2f} {neighbours:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
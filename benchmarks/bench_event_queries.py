@@ -0,0 +1,104 @@
+"""
+Event sorgu API'si için benchmark (varsayılan 1 milyon satır).
+
+    python -m benchmarks.bench_event_queries --rows 1000000
+
+Geçici bir veri tabanı oluşturur ve fetch_page / count_events / count_by
+sorgularının süresini (en iyi ve medyan, ms) raporlar. Tam metin (FTS5) aramaları yaygın bir kelime,
+nadir bir kelime (satırların ~%0.1'inin notunda geçer) ve yapısal filtreyle birlikte ölçülür.
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.data.db import Database, TIMESTAMP_FORMAT
+
+
+CLASSES = (("bottle", 39), ("cup", 41), ("cell phone", 67))
+SEVERITIES = ("info", "warning", "critical")
+NOTES = ("kasa önü", "rafa geri kondu", "müşteri uyarıldı", "yanlış alarm")
+
+
+def populate(db: Database, rows: int, cameras: int = 16, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    start = datetime.now() - timedelta(days=365)
+    step = 365 * 24 * 3600 / rows
+    batch = []
+    for i in range(rows):
+        when = start + timedelta(seconds=i * step)
+        bottle_id = rng.randint(1, 5000)
+        class_name, cls_id = rng.choice(CLASSES)
+        notes = None
+        if rng.random() < 0.01:
+            notes = rng.choice(NOTES) + (" hırsızlık teyit edildi" if rng.random() < 0.1 else "")
+        batch.append((
+            when.strftime(TIMESTAMP_FORMAT), bottle_id, f"ŞÜPHELİ OLAY: {class_name} ID {bottle_id} kayboldu!",
+            "", rng.randrange(cameras), "", when.timestamp(),
+            "disappeared", cls_id, class_name, rng.choice(SEVERITIES), notes,
+        ))
+        if len(batch) == 50000:
+            db.insert_events(batch)
+            batch = []
+    db.insert_events(batch)
+
+
+def timed(fn, repeat: int = 20):
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t) * 1000.0)
+    return min(samples), statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(Path(tmp) / "bench.db")
+        t = time.perf_counter()
+        populate(db, args.rows)
+        print(f"populate: {args.rows} satır, {time.perf_counter() - t:.1f} s")
+        db.analyze()
+
+        now = datetime.now()
+        week_ago = now - timedelta(days=7)
+        _, cursor = db.fetch_page(limit=100)
+        for _ in range(50):
+            _, cursor = db.fetch_page(limit=100, cursor=cursor)
+
+        cases = {
+            "fetch_page (ilk sayfa)": lambda: db.fetch_page(limit=100),
+            "fetch_page (51. sayfa, cursor)": lambda: db.fetch_page(limit=100, cursor=cursor),
+            "fetch_page (son 7 gün)": lambda: db.fetch_page(limit=100, since=week_ago),
+            "fetch_page (kamera 3)": lambda: db.fetch_page(limit=100, camera_id=3),
+            "fetch_page (bottle 1234)": lambda: db.fetch_page(limit=100, bottle_id=1234),
+            "fetch_page (id)": lambda: db.fetch_page(limit=1, event_id=args.rows // 2),
+            "count_events (son 7 gün)": lambda: db.count_events(since=week_ago),
+            "count_events (kamera 3, son 7 gün)": lambda: db.count_events(since=week_ago, camera_id=3),
+            "count_events (bottle 1234)": lambda: db.count_events(bottle_id=1234),
+            "count_by camera (son 7 gün)": lambda: db.count_by("camera_id", since=week_ago),
+            "fetch_page (class cup)": lambda: db.fetch_page(limit=100, class_name="cup"),
+            "fetch_page (critical, son 7 gün)": lambda: db.fetch_page(limit=100, severity="critical", since=week_ago),
+            "fetch_page (metin: bottle)": lambda: db.fetch_page(limit=100, text="bottle"),
+            "fetch_page (metin: bottle 1234)": lambda: db.fetch_page(limit=100, text="bottle 1234"),
+            "fetch_page (metin: hırsızlık)": lambda: db.fetch_page(limit=100, text="hırsızlık"),
+            "fetch_page (metin: hirsiz, önek)": lambda: db.fetch_page(limit=100, text="hirsiz"),
+            "fetch_page (metin + kamera 3)": lambda: db.fetch_page(limit=100, text="kasa", camera_id=3),
+            "count_events (metin: teyit)": lambda: db.count_events(text="teyit"),
+        }
+        for name, fn in cases.items():
+            best, median = timed(fn)
+            print(f"{name:<38} best {best:7.2f} ms   median {median:7.2f} ms")
+
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+Tespit pipeline'ı için uçtan uca, arayüzsüz benchmark.
+
+    python -m benchmarks.bench_pipeline --frames 600 --out bench.json
+    python -m benchmarks.bench_pipeline --source kayit.mp4 --model yolov8n.pt
+
+Kaynak verilmezse sabit tohumla sentetik bir klip (hareket eden kişi ve ürün kutuları,
+periyodik olarak kaybolan ürünler) üretilir; aynı argümanlarla her çalıştırma aynı klibi kullanır.
+Her kare için aşamalar ayrı ayrı ölçülür: capture, inference (InferenceService.track),
+tracking (TrackingService.update), events (EventService.update), annotation, snapshot ve db.
+Sonuç: aşama başına p50/p95/p99 gecikme (ms), throughput (fps) ve tepe RSS, JSON olarak.
+
+--detector groundtruth: model yerine sentetik klibin gerçek kutuları kullanılır (inference/tracking
+ölçülmez); model ağırlığı veya ultralytics olmayan makinelerde olay mantığı ve G/Ç aşamalarını ölçer.
+Sentetik kutular YOLO için gerçekçi değildir; model ölçümlerinde gerçek kayıt kullanın.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from app.data.db import Database
+from app.services.annotation import PreviewRenderer, annotate
+from app.services.camera_service import CameraService
+from app.services.detections import Detections
+from app.services.event_service import EventService
+from app.services.snapshot_service import SnapshotService
+
+
+STAGES = ("capture", "inference", "tracking", "events", "annotation", "snapshot", "db")
+PREVIEW_SIZE = (960, 540)  # tipik video widget boyutu
+PERCENTILES = (50, 95, 99)
+
+
+# --- sentetik klip
+def synthetic_scene(frame_index: int, fps: float, width: int, height: int, persons: int = 4):
+    """
+    Kare index'i için gerçek kutuları döner. Her kişi yatayda gidip gelir ve elindeki ürünü
+    bir süre taşır; ürün periyodun sonunda kaybolur (event üretir) ve yeni kimlikle geri gelir.
+    """
+    t = frame_index / fps
+    period = 10.0
+    track_ids, cls_ids, boxes = [], [], []
+    for p in range(persons):
+        pw, ph = width * 0.12, height * 0.6
+        phase = (t / 8.0 + p / persons) % 2.0
+        x = (phase if phase < 1.0 else 2.0 - phase) * (width - pw)
+        y = height * 0.3 + (p % 2) * height * 0.05
+        y = min(y, height - ph)
+        track_ids.append(p + 1)
+        cls_ids.append(0)
+        boxes.append((x, y, x + pw, y + ph))
+
+        # ürün periyodun ilk %60'ında görünür; her periyotta yeni kimlik
+        cycle, offset = divmod(t + p * 1.7, period)
+        if offset < period * 0.6:
+            bw = bh = width * 0.025
+            bx, by = x + pw * 0.5 - bw / 2, y + ph * 0.45
+            track_ids.append(1000 + p * 1000 + int(cycle))
+            cls_ids.append(39)
+            boxes.append((bx, by, bx + bw, by + bh))
+
+    n = len(track_ids)
+    return Detections(
+        track_ids=np.asarray(track_ids, dtype=np.int64),
+        cls_ids=np.asarray(cls_ids, dtype=np.int64),
+        confs=np.full(n, 0.9, dtype=np.float32),
+        xyxy=np.asarray(boxes, dtype=np.float32).reshape(n, 4),
+    )
+
+
+def render(frame_index: int, det: Detections, width: int, height: int, seed: int):
+    rng = np.random.default_rng(seed + frame_index)
+    frame = np.full((height, width, 3), 90, dtype=np.uint8)
+    # biraz gürültü: JPEG/MJPEG kodlama maliyeti gerçekçi kalsın
+    frame += rng.integers(0, 24, size=(height, width, 1), dtype=np.uint8)
+    for cls_id, (x1, y1, x2, y2) in zip(det.cls_ids.tolist(), det.xyxy.tolist()):
+        color = (60, 120, 200) if cls_id == 0 else (40, 200, 60)
+        cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), color, -1)
+    return frame
+
+
+def make_synthetic_clip(path: Path, frames: int, width: int, height: int, fps: float, seed: int = 0) -> None:
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+    try:
+        for i in range(frames):
+            writer.write(render(i, synthetic_scene(i, fps, width, height), width, height, seed))
+    finally:
+        writer.release()
+
+
+# --- ölçüm
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux KB, macOS byte döner
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def summarize(samples_ms):
+    if not samples_ms:
+        return None
+    arr = np.asarray(samples_ms, dtype=np.float64)
+    summary = {"count": int(arr.size), "mean": round(float(arr.mean()), 3), "max": round(float(arr.max()), 3)}
+    for p in PERCENTILES:
+        summary[f"p{p}"] = round(float(np.percentile(arr, p)), 3)
+    return summary
+
+
+def environment():
+    env = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "opencv_threads": cv2.getNumThreads(),
+    }
+    for name in ("torch", "ultralytics"):
+        try:
+            env[name] = __import__(name).__version__
+        except ImportError:
+            env[name] = None
+    return env
+
+
+class Timer:
+    def __init__(self, warmup: int):
+        self.warmup = warmup
+        self.samples = {stage: [] for stage in STAGES}
+        self.frame_total = []
+        self.frame_index = 0
+
+    def record(self, stage: str, started: float) -> None:
+        if self.frame_index >= self.warmup:
+            self.samples[stage].append((time.perf_counter() - started) * 1000.0)
+
+
+def run(args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        source = args.source
+        if source is None:
+            source = str(tmp / "synthetic.avi")
+            make_synthetic_clip(Path(source), args.frames, args.width, args.height, args.fps, args.seed)
+
+        inferencer = tracker = None
+        if args.detector == "yolo":
+            from app.services.inference_service import InferenceService
+            from app.services.tracking_service import TrackingService
+            inferencer = InferenceService(args.model, conf=args.conf, backend=args.backend, int8=args.int8)
+            tracker = TrackingService()
+
+        camera = CameraService(source, timestamp_mode="pts")
+        camera.start()
+        fps = camera.fps() or args.fps
+        width = int(camera.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(camera.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+        event_service = EventService(args.near_time, args.disappear_time)
+        snapshots = SnapshotService(tmp / "snapshots")
+        renderer = PreviewRenderer()
+        db = Database(tmp / "bench.db")
+        base_time = time.time()
+
+        timer = Timer(args.warmup)
+        events_total = 0
+        started = None
+        try:
+            while args.max_frames <= 0 or timer.frame_index < args.max_frames:
+                if timer.frame_index == args.warmup:
+                    started = time.perf_counter()
+                frame_start = time.perf_counter()
+
+                t = time.perf_counter()
+                frame, ts = camera.read_with_ts()
+                if frame is None:
+                    break
+                timer.record("capture", t)
+
+                if inferencer is not None:
+                    t = time.perf_counter()
+                    results = inferencer.track(frame)
+                    timer.record("inference", t)
+
+                    t = time.perf_counter()
+                    tracked = tracker.update(results)
+                    timer.record("tracking", t)
+                else:
+                    tracked = synthetic_scene(timer.frame_index, fps, width, height)
+
+                t = time.perf_counter()
+                events = event_service.update(tracked, now=ts)
+                armed_ids = event_service.get_armed_ids()
+                timer.record("events", t)
+
+                # pipeline'daki gibi: önizleme küçük karede çizilir (en kötü durum: her kare),
+                # tam çözünürlük yalnızca event karesinde
+                t = time.perf_counter()
+                renderer.render(0, frame, tracked, armed_ids, event_service.rules, PREVIEW_SIZE)
+                annotated = annotate(frame, tracked, armed_ids, event_service.rules) if events else None
+                timer.record("annotation", t)
+
+                when = datetime.fromtimestamp(base_time + ts)
+                t = time.perf_counter()
+                snapshots.push(0, ts, frame)
+                paths = [snapshots.save_event(0, ts, annotated, when, ev.track_id, ev.class_name) for ev in events]
+                timer.record("snapshot", t)
+
+                if events:
+                    t = time.perf_counter()
+                    db.insert_events([
+                        (when.strftime("%Y-%m-%d %H:%M:%S"), ev.track_id, ev.message, snap, 0, clip, when.timestamp(),
+                         ev.kind, ev.cls_id, ev.class_name, ev.severity)
+                        for ev, (snap, clip) in zip(events, paths)
+                    ])
+                    timer.record("db", t)
+
+                if timer.frame_index >= args.warmup:
+                    events_total += len(events)
+                    timer.frame_total.append((time.perf_counter() - frame_start) * 1000.0)
+                timer.frame_index += 1
+            elapsed = time.perf_counter() - started if started is not None else 0.0
+        finally:
+            camera.stop()
+            snapshots.close()
+            db.close()
+
+    measured = len(timer.frame_total)
+    return {
+        "benchmark": "pipeline",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "source": args.source or "synthetic",
+            "detector": args.detector,
+            "model": inferencer.model_path if inferencer is not None else None,
+            "backend": inferencer.backend if inferencer is not None else None,
+            "frames": timer.frame_index,
+            "warmup": args.warmup,
+            "resolution": [width, height],
+            "source_fps": fps,
+            "seed": args.seed,
+        },
+        "environment": environment(),
+        "frames_measured": measured,
+        "events": events_total,
+        "throughput_fps": round(measured / elapsed, 2) if elapsed > 0 else None,
+        "frame_ms": summarize(timer.frame_total),
+        "stages_ms": {stage: summarize(samples) for stage, samples in timer.samples.items()},
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="python -m benchmarks.bench_pipeline",
+                                description=__doc__.strip().splitlines()[0])
+    p.add_argument("--source", default=None, help="Video dosyası (verilmezse sentetik klip üretilir)")
+    p.add_argument("--detector", default="yolo", choices=["yolo", "groundtruth"])
+    p.add_argument("--model", default="yolov8n.pt")
+    p.add_argument("--backend", default=None, choices=["torch", "onnx", "openvino"])
+    p.add_argument("--int8", action="store_true")
+    p.add_argument("--conf", type=float, default=0.45)
+    p.add_argument("--near-time", type=float, default=3.0)
+    p.add_argument("--disappear-time", type=float, default=3.0)
+    p.add_argument("--frames", type=int, default=600, help="Sentetik klip kare sayısı")
+    p.add_argument("--width", type=int, default=1280)
+    p.add_argument("--height", type=int, default=720)
+    p.add_argument("--fps", type=float, default=30.0)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--warmup", type=int, default=30, help="Ölçüme katılmayan ilk kare sayısı")
+    p.add_argument("--max-frames", type=int, default=0, help="En fazla işlenecek kare (0 = tümü)")
+    p.add_argument("--out", type=Path, default=None, help="JSON çıktı dosyası (verilmezse stdout)")
+    return p
+
+
+def main(argv=None) -> None:
+    args = build_parser().parse_args(argv)
+    if args.detector == "groundtruth" and args.source is not None:
+        raise SystemExit("--detector groundtruth yalnızca sentetik klip ile kullanılabilir")
+
+    report = run(args)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out is not None:
+        args.out.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Açılış maliyetlerini ölçer: modül importları, kamera taraması ve model yükleme / ilk tespit.
+
+    python -m benchmarks.bench_startup --max-index 6 --weights yolov8n.pt --source kayit.mp4
+
+- import: her modül ayrı bir Python sürecinde, soğuk olarak import edilir (GUI'nin açılışta
+  yüklediği servisler ile ultralytics/torch karşılaştırması)
+- cameras: index'lerin sırayla açılması ile CameraService.list_available'ın paralel, zaman aşımlı taraması
+- model: InferenceService.load() (yükleme + ısınma) ve --source'un ilk karesinde ilk track_batch
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from app.services.camera_service import CameraService
+
+
+IMPORTS = (
+    "app.services.pipeline_service",
+    "app.services.inference_service",
+    "ultralytics",
+    "torch",
+)
+
+
+def import_seconds(module: str) -> float:
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if out.returncode != 0:
+        return float("nan")
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def probe_sequential(max_index: int):
+    found = []
+    for idx in range(max_index):
+        cap = cv2.VideoCapture(idx)
+        if cap.isOpened():
+            found.append(idx)
+        cap.release()
+    return found
+
+
+def timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def first_frame(source) -> np.ndarray:
+    if source is None:
+        return np.zeros((720, 1280, 3), dtype=np.uint8)
+    cap = cv2.VideoCapture(source)
+    ok, frame = cap.read()
+    cap.release()
+    if not ok:
+        raise SystemExit(f"Kare okunamadı: {source}")
+    return frame
+
+
+def main(argv=None) -> None:
+    p = argparse.ArgumentParser(prog="python -m benchmarks.bench_startup", description=__doc__.strip().splitlines()[0])
+    p.add_argument("--max-index", type=int, default=6, help="Taranacak kamera index sayısı")
+    p.add_argument("--probe-timeout", type=float, default=3.0, help="Paralel taramada toplam bekleme (s)")
+    p.add_argument("--weights", default="yolov8n.pt")
+    p.add_argument("--imgsz", type=int, default=640)
+    p.add_argument("--source", default=None, help="İlk tespit için video/görüntü (verilmezse boş kare)")
+    p.add_argument("--skip-model", action="store_true", help="Model ölçümünü atla")
+    p.add_argument("--json", action="store_true", help="Sonucu JSON olarak yaz")
+    args = p.parse_args(argv)
+
+    report = {"benchmark": "startup", "import_s": {}, "cameras": {}, "model": {}}
+    for module in IMPORTS:
+        report["import_s"][module] = round(import_seconds(module), 3)
+
+    found, seq_s = timed(probe_sequential, args.max_index)
+    report["cameras"]["sequential"] = {"found": found, "seconds": round(seq_s, 3)}
+    found, par_s = timed(
+        CameraService.list_available, max_index=args.max_index, timeout=args.probe_timeout, refresh=True
+    )
+    report["cameras"]["parallel"] = {"found": found, "seconds": round(par_s, 3)}
+    _, cached_s = timed(CameraService.list_available, max_index=args.max_index, timeout=args.probe_timeout)
+    report["cameras"]["cached"] = {"seconds": round(cached_s, 6)}
+
+    if not args.skip_model:
+        from app.services.inference_service import InferenceService
+
+        started = time.perf_counter()
+        inferencer = InferenceService(args.weights, imgsz=args.imgsz).load()
+        frame = first_frame(args.source)
+        _, first_s = timed(inferencer.track_batch, [frame], [0])
+        report["model"] = {
+            "load_s": round(inferencer.load_seconds, 3),
+            "warmup_s": round(inferencer.warmup_seconds or 0.0, 3),
+            "first_inference_s": round(first_s, 3),
+            "time_to_first_detection_s": round(time.perf_counter() - started, 3),
+        }
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+
+    print(f"{'import':<36}{'s':>8}")
+    for module, seconds in report["import_s"].items():
+        print(f"{module:<36}{seconds:>8.3f}")
+    cams = report["cameras"]
+    print(f"\nkamera taraması: sıralı {cams['sequential']['seconds']:.3f} s {cams['sequential']['found']}, "
+          f"paralel {cams['parallel']['seconds']:.3f} s {cams['parallel']['found']}, "
+          f"önbellek {cams['cached']['seconds'] * 1e3:.3f} ms")
+    if report["model"]:
+        m = report["model"]
+        print(f"model: yükleme {m['load_s']:.3f} s, ısınma {m['warmup_s']:.3f} s, "
+              f"ilk çıkarım {m['first_inference_s']:.3f} s, ilk tespite kadar {m['time_to_first_detection_s']:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
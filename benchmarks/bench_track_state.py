@@ -0,0 +1,69 @@
+"""
+EventService iz durumu tablosu için uzun süreli ID değişimi (churn) benchmark'ı.
+
+    python -m benchmarks.bench_track_state --minutes 60 --churn 0.05
+
+Sahnede sabit sayıda ürün vardır; her karede ürünlerin bir kısmı kaybolup yeni ID ile geri gelir
+(ByteTrack'in kısa örtülmelerde ID değiştirmesi gibi). Her dakikalık pencerede kare başına
+EventService.update süresi ve tablodaki iz sayısı yazılır; ikisi de zamanla büyümemelidir.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.services.detections import Detections
+from app.services.event_service import EventService
+
+
+def run(minutes: float, fps: float, objects: int, churn: float, ttl: float, capacity: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    service = EventService(3.0, 3.0, track_ttl=ttl, max_tracks=capacity)
+
+    person = np.array([[0, 0, 400, 700]], dtype=np.float32)
+    ids = np.arange(1, objects + 1)
+    next_id = objects + 1
+    xy = rng.uniform(0, 900, size=(objects, 2)).astype(np.float32)
+
+    frames_per_minute = int(fps * 60)
+    print(f"{'minute':>6} {'us/frame':>9} {'p99 us':>8} {'tracks':>7} {'heap':>6} {'evicted':>8} {'events':>7}")
+    events = 0
+    for minute in range(int(minutes)):
+        samples = []
+        for f in range(frames_per_minute):
+            now = (minute * frames_per_minute + f) / fps
+            replaced = rng.random(objects) < churn
+            n_new = int(replaced.sum())
+            ids[replaced] = np.arange(next_id, next_id + n_new)
+            next_id += n_new
+
+            det = Detections(
+                track_ids=np.concatenate(([0], ids)).astype(np.int64),
+                cls_ids=np.concatenate(([0], np.full(objects, 39))).astype(np.int64),
+                confs=np.ones(objects + 1, dtype=np.float32),
+                xyxy=np.vstack((person, np.hstack((xy, xy + 20)))),
+            )
+            started = time.perf_counter()
+            events += len(service.update(det, now=now))
+            samples.append((time.perf_counter() - started) * 1e6)
+
+        tracks = service.tracks
+        print(f"{minute + 1:>6} {np.mean(samples):>9.1f} {np.percentile(samples, 99):>8.1f} "
+              f"{len(tracks):>7} {len(tracks._heap):>6} {tracks.evicted:>8} {events:>7}")
+
+
+def main(argv=None) -> None:
+    p = argparse.ArgumentParser(prog="python -m benchmarks.bench_track_state",
+                                description=__doc__.strip().splitlines()[0])
+    p.add_argument("--minutes", type=float, default=10, help="Simüle edilen süre (dakika)")
+    p.add_argument("--fps", type=float, default=15.0)
+    p.add_argument("--objects", type=int, default=30, help="Sahnedeki ürün sayısı")
+    p.add_argument("--churn", type=float, default=0.05, help="Kare başına ID'si değişen ürün oranı")
+    p.add_argument("--ttl", type=float, default=10.0, help="EventService track_ttl (s)")
+    p.add_argument("--capacity", type=int, default=4096, help="EventService max_tracks")
+    args = p.parse_args(argv)
+    run(args.minutes, args.fps, args.objects, args.churn, args.ttl, args.capacity)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,22 @@
+import time
+
+# açılış süresi Python'a kontrol geçtiği andan ölçülür (PyQt5 importu dahil)
+STARTED_AT = time.perf_counter()
+
 import sys
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QApplication
 from app.ui.main_window import MainWindow
 
 
 def main() -> int:
     app = QApplication(sys.argv)
-    window = MainWindow()
+    window = MainWindow(started_at=STARTED_AT)
     window.showMaximized()  # tam ekran
+    # olay döngüsü pencereyi çizdikten sonra çalışır
+    QTimer.singleShot(0, window.on_first_shown)
     return app.exec_()
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
\ No newline at end of file
+    raise SystemExit(main())
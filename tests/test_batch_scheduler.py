@@ -0,0 +1,89 @@
+import time
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from app.services.batch_scheduler import BatchScheduler
+from app.services.pipeline_service import FramePacket
+
+
+FRAME = np.zeros((4, 4, 3), dtype=np.uint8)
+
+
+def _packet(stream_id, seq, **kwargs):
+    return FramePacket(stream_id=stream_id, seq=seq, capture_ts=float(seq), frame=FRAME, **kwargs)
+
+
+def _scheduler(streams, **kwargs):
+    kwargs.setdefault("fill_timeout", 0.0)
+    s = BatchScheduler(**kwargs)
+    for stream_id in streams:
+        s.add_stream(stream_id)
+    return s
+
+
+def test_newest_frame_wins():
+    s = _scheduler([0])
+    for seq in range(4):
+        assert s.submit(0, _packet(0, seq))
+
+    assert [p.seq for p in s.next_batch(timeout=0)] == [3]
+    assert s.dropped == {0: 3}
+    assert not s.submit(7, _packet(7, 0))  # kayıtlı olmayan akış
+
+
+def test_one_frame_per_stream_and_round_robin():
+    s = _scheduler(range(3), max_batch_size=2)
+    served = Counter()
+    starts = []
+    for seq in range(30):
+        for stream_id in range(3):
+            s.submit(stream_id, _packet(stream_id, seq))
+        batch = s.next_batch(timeout=0)
+        ids = [p.stream_id for p in batch]
+        assert len(ids) == len(set(ids)) == 2
+        starts.append(ids[0])
+        served.update(ids)
+
+    # batch'e alınmayan akış bir sonraki batch'e ilk girer: hiçbir akış aç kalmaz
+    assert served == {0: 20, 1: 20, 2: 20}
+    assert starts[:3] == [0, 2, 1]
+
+
+def test_stale_by_received_ts_not_capture_ts():
+    s = _scheduler([0, 1], max_frame_age=0.5)
+    # 0: eski PTS ama yeni okundu; 1: okunalı 1 s olmuş
+    s.submit(0, _packet(0, 0, received_ts=time.monotonic()))
+    s.submit(1, FramePacket(1, 0, time.time(), FRAME, received_ts=time.monotonic() - 1.0))
+
+    assert [p.stream_id for p in s.next_batch(timeout=0)] == [0]
+    assert s.stale == {0: 0, 1: 1}
+    assert len(s) == 0
+
+
+def test_max_frame_age_zero_disables_staleness():
+    s = _scheduler([0], max_frame_age=0)
+    s.submit(0, _packet(0, 0, received_ts=time.monotonic() - 60.0))
+    assert len(s.next_batch(timeout=0)) == 1
+
+
+def test_fill_timeout_waits_for_other_streams():
+    s = _scheduler([0, 1], fill_timeout=0.05)
+    s.submit(0, _packet(0, 0))
+
+    t = time.monotonic()
+    assert len(s.next_batch(timeout=0)) == 1
+    assert time.monotonic() - t >= 0.04
+
+
+def test_close_releases_waiting_consumer():
+    s = _scheduler([0])
+    s.close()
+    assert s.next_batch(timeout=1.0) == []
+    assert not s.submit(0, _packet(0, 0))
+
+
+def test_rejects_empty_batches():
+    with pytest.raises(ValueError):
+        BatchScheduler(max_batch_size=0)
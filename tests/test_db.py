@@ -0,0 +1,182 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from app.data.db import TIMESTAMP_FORMAT, Database, fts_query, to_epoch
+
+
+BASE = datetime(2026, 3, 1, 12, 0, 0).timestamp()
+
+
+def _row(i, ts, camera_id=0, class_name="bottle", severity="warning", track_id=None):
+    track_id = i if track_id is None else track_id
+    when = datetime.fromtimestamp(ts)
+    return (
+        when.strftime(TIMESTAMP_FORMAT), track_id, f"ŞÜPHELİ OLAY: {class_name} ID {track_id} kayboldu!",
+        f"snap_{i}.jpg", camera_id, "", ts, "disappeared", 39, class_name, severity,
+    )
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(tmp_path / "events.db")
+    # aynı saniyede birden çok event: sıralama id ile ayrışmalı
+    db.insert_events([
+        _row(i, BASE + i // 3, camera_id=i % 2, class_name="cup" if i % 5 == 0 else "bottle",
+             severity="critical" if i % 7 == 0 else "warning")
+        for i in range(100)
+    ])
+    yield db
+    db.close()
+
+
+def _all_pages(db, limit, **filters):
+    out, cursor, pages = [], None, 0
+    while True:
+        page, cursor = db.fetch_page(limit=limit, cursor=cursor, **filters)
+        out += page
+        pages += 1
+        if cursor is None:
+            return out, pages
+
+
+def test_to_epoch_accepts_all_forms():
+    when = datetime.fromtimestamp(BASE)
+    assert to_epoch(when) == to_epoch(BASE) == to_epoch(when.strftime(TIMESTAMP_FORMAT)) == BASE
+    assert to_epoch(None) is None and to_epoch("dün") is None
+
+
+@pytest.mark.parametrize("limit", [1, 7, 50, 100, 500])
+def test_keyset_pages_cover_every_row_once_in_order(db, limit):
+    rows, pages = _all_pages(db, limit)
+
+    keys = [(r["ts_epoch"], r["id"]) for r in rows]
+    assert keys == sorted(keys, reverse=True)
+    assert len(set(keys)) == db.count_events() == 100
+    # tam dolu son sayfadan sonra bir boş sayfa okunur
+    assert pages == 100 // limit + 1
+
+
+def test_ascending_pages(db):
+    rows, _ = _all_pages(db, 9, descending=False)
+    keys = [(r["ts_epoch"], r["id"]) for r in rows]
+    assert keys == sorted(keys) and len(keys) == 100
+
+
+def test_filters_match_count_and_python_filter(db):
+    everything, _ = _all_pages(db, 1000)
+    since, until = BASE + 5, BASE + 20
+    cases = [
+        (dict(camera_id=1), lambda r: r["camera_id"] == 1),
+        (dict(class_name="cup"), lambda r: r["class_name"] == "cup"),
+        (dict(severity="critical", camera_id=0), lambda r: r["severity"] == "critical" and r["camera_id"] == 0),
+        (dict(bottle_id=42), lambda r: r["bottle_id"] == 42),
+        (dict(since=since, until=datetime.fromtimestamp(until)), lambda r: since <= r["ts_epoch"] < until),
+    ]
+    for filters, keep in cases:
+        rows, _ = _all_pages(db, 4, **filters)
+        expected = [r["id"] for r in everything if keep(r)]
+        assert [r["id"] for r in rows] == expected, filters
+        assert db.count_events(**filters) == len(expected)
+
+
+def test_count_by(db):
+    assert db.count_by("camera_id") == {0: 50, 1: 50}
+    assert db.count_by("class_name", camera_id=0) == {"bottle": 40, "cup": 10}
+    with pytest.raises(ValueError):
+        db.count_by("message")
+
+
+def test_short_legacy_rows_get_epoch_from_timestamp(tmp_path):
+    db = Database(tmp_path / "events.db")
+    when = datetime.fromtimestamp(BASE)
+    db.insert_event(when.strftime(TIMESTAMP_FORMAT), 5, "eski")
+
+    (row,), cursor = db.fetch_page(limit=10)
+    assert row["ts_epoch"] == BASE and cursor is None
+    db.close()
+
+
+# --- tam metin arama ve eski şemadan geçiş
+
+def _ids(db, **filters):
+    rows, _ = _all_pages(db, 1000, **filters)
+    return sorted(r["id"] for r in rows)
+
+
+def test_fts_query_quotes_user_input():
+    assert fts_query('bott 12') == '"bott"* "12"*'
+    assert fts_query('" OR NEAR(') == '"OR"* "NEAR"*'
+    assert fts_query("  ") is None
+
+
+def test_text_search_prefix_and_diacritics(db):
+    assert db.fts
+    cups = _ids(db, class_name="cup")
+    assert _ids(db, text="cu") == cups
+    assert _ids(db, text="supheli cup") == cups  # "ŞÜPHELİ" aksansız da bulunur
+    assert _ids(db, text="ID 42") == [43]  # kelimelerin hepsi geçmeli
+    assert db.count_events(text="cup", camera_id=0) == db.count_events(class_name="cup", camera_id=0)
+
+
+def test_triggers_follow_notes_and_deletes(db):
+    db.set_notes(10, "Kasa önünde görüldü")
+    assert _ids(db, text="kasa") == [10]
+    assert _ids(db, text="onunde") == [10]
+
+    db.set_notes(10, "")
+    assert _ids(db, text="kasa") == []
+
+    db.set_notes(11, "kasa")
+    with db.conn:
+        db.conn.execute("DELETE FROM events WHERE id = 11")
+    assert _ids(db, text="kasa") == []
+
+
+def test_like_fallback_matches_fts(db):
+    db.set_notes(3, "raf arkası")
+    queries = ["cup", "ID 42", "raf", "kayboldu bottle"]
+    expected = {q: _ids(db, text=q) for q in queries}
+
+    db.fts = False
+    assert {q: _ids(db, text=q) for q in queries} == expected
+
+
+def test_migrates_legacy_table(tmp_path):
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(str(path))
+    conn.execute("""
+        CREATE TABLE events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            bottle_id INTEGER,
+            message TEXT NOT NULL
+        )
+    """)
+    when = datetime.fromtimestamp(BASE)
+    conn.executemany("INSERT INTO events (timestamp, bottle_id, message) VALUES (?, ?, ?)", [
+        (when.strftime(TIMESTAMP_FORMAT), 7, "ŞÜPHELİ OLAY: bottle ID 7 kayboldu!"),
+        (when.strftime(TIMESTAMP_FORMAT), 8, "ŞÜPHELİ OLAY: cell phone ID 8 kayboldu!"),
+        (when.strftime(TIMESTAMP_FORMAT), None, "sistem başlatıldı"),
+    ])
+    conn.commit()
+    conn.close()
+
+    db = Database(path)
+    rows, _ = db.fetch_page(limit=10, descending=False)
+    assert [(r["class_name"], r["kind"]) for r in rows] == [
+        ("bottle", "disappeared"), ("cell phone", "disappeared"), (None, None)
+    ]
+    assert all(r["ts_epoch"] == BASE for r in rows)
+    # mevcut kayıtlar FTS indeksine bir kez alınır
+    assert _ids(db, text="phone") == [2]
+    assert db.count_events(class_name="bottle") == 1
+
+    db.insert_event(when.strftime(TIMESTAMP_FORMAT), 9, "ŞÜPHELİ OLAY: phone ID 9 kayboldu!")
+    db.close()
+
+    # ikinci açılış geçişi tekrarlamaz, indeks tekrar kurulmaz
+    db = Database(path)
+    assert _ids(db, text="phone") == [2, 4]
+    db.close()
@@ -0,0 +1,182 @@
+import numpy as np
+import pytest
+
+from app.services.detections import NO_TRACK, Detections
+from app.services.event_rules import ProductRule, RuleConfig
+from app.services.event_service import EventService
+from app.services.track_state import TrackStateTable
+
+
+PERSON = (0, [100.0, 100.0, 300.0, 500.0])
+BOTTLE = (39, [190.0, 290.0, 210.0, 310.0])  # merkezi kişi kutusunun içinde
+FAR_BOTTLE = (39, [590.0, 290.0, 610.0, 310.0])
+
+
+def _frame(*objects, track_ids=None):
+    return Detections(
+        track_ids=np.array(track_ids or range(1, len(objects) + 1), dtype=np.int64),
+        cls_ids=np.array([cls_id for cls_id, _ in objects], dtype=np.int64),
+        confs=np.full(len(objects), 0.9, dtype=np.float32),
+        xyxy=np.array([box for _, box in objects], dtype=np.float32).reshape(-1, 4),
+    )
+
+
+def _run(service, frames, t0=0.0, dt=0.1):
+    """(zaman, event listesi) çiftleri."""
+    return [(round(t0 + i * dt, 6), service.update(f, now=t0 + i * dt)) for i, f in enumerate(frames)]
+
+
+# --- TrackStateTable
+
+def test_table_pops_on_latest_deadline_only():
+    table = TrackStateTable()
+    state = table.touch(1, 39, now=0.0)
+    table.schedule(state, 5.0)
+    table.schedule(state, 8.0)  # ileri kayan deadline yığına yeniden itilmez
+
+    assert table.pop_expired(6.0) == []
+    assert table.pop_expired(8.0) == [state]
+    # çağıran yeniden planlamazsa iz bir daha verilmez
+    assert table.pop_expired(100.0) == []
+
+
+def test_table_earlier_deadline_wins():
+    table = TrackStateTable()
+    state = table.touch(1, 39, now=0.0)
+    table.schedule(state, 10.0)
+    table.schedule(state, 2.0)
+
+    assert table.pop_expired(2.0) == [state]
+    assert table.pop_expired(10.0) == []
+
+
+def test_table_removed_track_is_not_popped():
+    table = TrackStateTable()
+    table.schedule(table.touch(1, 39, now=0.0), 1.0)
+    table.remove(1)
+
+    assert table.pop_expired(5.0) == []
+    assert len(table) == 0
+
+
+def test_table_evicts_least_recently_seen_unarmed_first():
+    table = TrackStateTable(capacity=3)
+    a, b, _ = (table.touch(tid, 39, now=float(tid)) for tid in (1, 2, 3))
+    table.set_armed(a, True)
+    table.touch(2, 39, now=4.0)  # 2 sıranın sonuna geçer
+
+    table.touch(4, 39, now=5.0)
+    assert [s.track_id for s in table] == [1, 2, 4]  # ARMED 1 korunur, en eski ARMED olmayan 3 atılır
+    assert table.evicted == 1
+    assert table.armed_ids() == {1}
+
+
+# --- EventService: ARMED ve TTL
+
+def test_armed_product_emits_on_disappear():
+    service = EventService(near_required_time=1.0, disappear_time=2.0)
+    history = _run(service, [_frame(PERSON, BOTTLE)] * 16 + [_frame(PERSON)] * 30)
+
+    events = [(t, ev) for t, evs in history for ev in evs]
+    assert len(events) == 1
+    t, ev = events[0]
+    assert (ev.kind, ev.track_id, ev.class_name, ev.last_seen) == ("disappeared", 2, "bottle", 1.5)
+    assert t == pytest.approx(3.5)
+    assert 2 not in service.tracks
+
+
+def test_not_armed_before_near_time():
+    service = EventService(near_required_time=1.0, disappear_time=0.5, track_ttl=2.0)
+    history = _run(service, [_frame(PERSON, BOTTLE)] * 5 + [_frame(PERSON)] * 40)
+
+    assert not any(evs for _, evs in history)
+    assert 2 not in service.tracks  # track_ttl sonra unutuldu
+
+
+def test_leaving_the_person_resets_armed():
+    service = EventService(near_required_time=0.5, disappear_time=1.0)
+    _run(service, [_frame(PERSON, BOTTLE)] * 10)
+    assert service.get_armed_ids() == {2}
+
+    service.update(_frame(PERSON, FAR_BOTTLE), now=1.0)
+    assert service.get_armed_ids() == set()
+    assert service.tracks.get(2).near_start is None
+
+
+def test_ttl_forgets_unarmed_tracks_but_keeps_armed():
+    service = EventService(near_required_time=0.2, disappear_time=5.0, track_ttl=1.0)
+    # 2 kişinin yanında ARMED olur, 3 uzakta kalır
+    _run(service, [_frame(PERSON, BOTTLE, FAR_BOTTLE)] * 5)
+    assert service.get_armed_ids() == {2}
+
+    _run(service, [_frame(PERSON)] * 20, t0=0.5)  # 2.4 sn'ye kadar
+    assert 3 not in service.tracks
+    assert 2 in service.tracks
+
+
+def test_max_tracks_bounds_state():
+    service = EventService(max_tracks=50, track_ttl=1e9)
+    for i in range(200):
+        service.update(_frame(PERSON, FAR_BOTTLE, track_ids=[1, 1000 + i]), now=i * 0.1)
+
+    assert len(service.tracks) == 50
+    assert service.tracks.evicted == 150
+
+
+def test_event_delay_is_longest_disappear_time():
+    rules = RuleConfig(products=[ProductRule(39, "bottle"), ProductRule(67, "cell phone", disappear_time=7.0)])
+    assert EventService(disappear_time=3.0, rules=rules).event_delay == 7.0
+
+
+# --- küçük sahne (liste) ve NumPy eşleştirmesi aynı sonucu verir
+
+RULES = RuleConfig(
+    person_classes={0: "person"},
+    products=[
+        ProductRule(39, "bottle"),
+        ProductRule(41, "cup", proximity="near", near_distance=30.0, near_time=0.5),
+        ProductRule(67, "cell phone", proximity="none", near_time=0.3),
+    ],
+)
+
+
+def _random_scene(rng, n):
+    cls_ids = rng.choice([0, 0, 39, 41, 67, 5, 200], size=n)
+    xy = rng.uniform(0, 1000, size=(n, 2))
+    wh = np.where(cls_ids[:, None] == 0, rng.uniform(50, 200, size=(n, 2)), rng.uniform(5, 40, size=(n, 2)))
+    track_ids = np.arange(1, n + 1)
+    track_ids[rng.random(n) < 0.1] = NO_TRACK
+    return Detections(
+        track_ids=track_ids.astype(np.int64),
+        cls_ids=cls_ids.astype(np.int64),
+        confs=np.full(n, 0.9, dtype=np.float32),
+        xyxy=np.column_stack((xy, xy + wh)).astype(np.float32),
+    )
+
+
+@pytest.mark.parametrize("n", [0, 1, 5, 40, 120])
+def test_small_scene_matches_numpy_association(n):
+    rng = np.random.default_rng(n)
+    for near_distance in (0.0, 25.0):
+        service = EventService(near_distance=near_distance, rules=RULES)
+        for _ in range(50):
+            scene = _random_scene(rng, n)
+            assert service._associate_small(scene) == list(service._associate(scene))
+
+
+def test_update_paths_emit_same_events():
+    rng = np.random.default_rng(7)
+    small = EventService(near_required_time=0.2, disappear_time=0.3, rules=RULES)
+    vector = EventService(near_required_time=0.2, disappear_time=0.3, rules=RULES)
+    small.SMALL_SCENE, vector.SMALL_SCENE = 10**9, -1
+
+    base = _random_scene(rng, 60)
+    emitted = 0
+    for i in range(100):
+        scene = base.select(rng.random(len(base)) < 0.8)  # nesneler rastgele kaybolup geri gelir
+        a = small.update(scene, now=i * 0.1)
+        b = vector.update(scene, now=i * 0.1)
+        assert a == b
+        assert small.get_armed_ids() == vector.get_armed_ids()
+        emitted += len(a)
+    assert emitted > 0
@@ -0,0 +1,90 @@
+import threading
+import time
+
+from app.data.db import Database
+from app.data.event_writer import EventWriter
+
+
+class CountingDatabase(Database):
+    """insert_events çağrılarını (commit'leri) sayar."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.batches = []
+
+    def insert_events(self, rows):
+        self.batches.append(len(rows))
+        super().insert_events(rows)
+
+
+def _insert(writer, i):
+    writer.insert_event("2026-03-01 12:00:00", i, f"event {i}", camera_id=0, ts_epoch=1000.0 + i)
+
+
+def _wait(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return predicate()
+
+
+def test_full_batch_commits_without_waiting_for_interval(tmp_path):
+    db = CountingDatabase(tmp_path / "events.db")
+    writer = EventWriter(db, batch_size=25, flush_interval=60.0)
+    for i in range(50):
+        _insert(writer, i)
+
+    assert _wait(lambda: writer.written == 50)
+    # 50 kayıt birkaç commit'te yazılır, kayıt başına değil
+    assert sum(db.batches) == 50 and len(db.batches) <= 3
+    writer.close()
+
+
+def test_partial_batch_commits_after_interval(tmp_path):
+    db = CountingDatabase(tmp_path / "events.db")
+    writer = EventWriter(db, batch_size=100, flush_interval=0.1)
+    started = time.monotonic()
+    for i in range(3):
+        _insert(writer, i)
+
+    assert _wait(lambda: writer.written == 3)
+    assert time.monotonic() - started >= 0.09
+    assert db.batches == [3]
+    writer.close()
+
+
+def test_flush_and_close_write_pending_rows(tmp_path):
+    db = CountingDatabase(tmp_path / "events.db")
+    writer = EventWriter(db, batch_size=100, flush_interval=60.0)
+    _insert(writer, 0)
+    assert writer.flush(timeout=2.0)
+    assert db.count_events() == 1
+
+    for i in range(1, 5):
+        _insert(writer, i)
+    writer.close()
+    assert db.count_events() == 5 and writer.pending == 0
+
+    # kapandıktan sonra gelen kayıt doğrudan yazılır
+    _insert(writer, 5)
+    assert db.count_events() == 6
+
+
+def test_failed_batch_is_counted(tmp_path):
+    db = CountingDatabase(tmp_path / "events.db")
+    failing = threading.Event()
+
+    def insert_events(rows):
+        if failing.is_set():
+            raise RuntimeError("disk dolu")
+        CountingDatabase.insert_events(db, rows)
+
+    db.insert_events = insert_events
+    writer = EventWriter(db, batch_size=2, flush_interval=60.0)
+    failing.set()
+    _insert(writer, 0)
+    _insert(writer, 1)
+
+    assert _wait(lambda: writer.failed == 2)
+    assert writer.written == 0
+    writer.close()
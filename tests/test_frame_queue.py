@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pytest
+
+from app.services.frame_queue import BLOCK, DROP_NEWEST, DROP_OLDEST, FrameQueue
+
+
+def test_rejects_bad_config():
+    with pytest.raises(ValueError):
+        FrameQueue(maxsize=0)
+    with pytest.raises(ValueError):
+        FrameQueue(policy="lifo")
+
+
+def test_drop_oldest_keeps_newest():
+    q = FrameQueue(maxsize=2, policy=DROP_OLDEST)
+    assert all(q.put(i) for i in range(5))
+
+    assert q.dropped == 3
+    assert q.drain() == [3, 4]
+
+
+def test_drop_newest_keeps_oldest():
+    q = FrameQueue(maxsize=2, policy=DROP_NEWEST)
+    assert [q.put(i) for i in range(4)] == [True, True, False, False]
+
+    assert q.dropped == 2
+    assert q.drain() == [0, 1]
+
+
+def test_block_times_out_without_dropping():
+    q = FrameQueue(maxsize=1, policy=BLOCK)
+    assert q.put("a")
+
+    t = time.monotonic()
+    assert not q.put("b", timeout=0.05)
+    assert time.monotonic() - t >= 0.04
+    assert q.dropped == 0
+    assert q.drain() == ["a"]
+
+
+def test_block_waits_for_consumer():
+    q = FrameQueue(maxsize=1, policy=BLOCK)
+    q.put(0)
+    consumer = threading.Timer(0.05, q.get)
+    consumer.start()
+
+    assert q.put(1, timeout=2.0)
+    consumer.join()
+    assert q.drain() == [1]
+
+
+def test_close_wakes_blocked_producer_and_consumer():
+    q = FrameQueue(maxsize=1, policy=BLOCK)
+    q.put(0)
+    threading.Timer(0.05, q.close).start()
+
+    assert not q.put(1, timeout=2.0)
+    # kapanmış kuyruk kalan öğeyi yine verir, sonra hemen None döner
+    assert q.get(timeout=2.0) == 0
+    assert q.get(timeout=2.0) is None
+    assert not q.put(2)
+
+
+def test_get_timeout_on_empty():
+    q = FrameQueue()
+    assert q.get(timeout=0.01) is None
+    assert q.get_nowait() is None
+    assert len(q) == 0
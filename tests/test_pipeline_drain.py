@@ -0,0 +1,117 @@
+import threading
+import time
+
+import numpy as np
+
+from app.data.db import Database
+from app.services.detections import Detections
+from app.services.event_service import EventService
+from app.services.pipeline_service import CameraStream, PipelineService
+
+
+FPS = 25.0
+VANISH_SEQ = 40  # bu kareden sonra ürün görünmez
+
+
+class FakeVideo:
+    """n kare verip biten video dosyası; karenin sırası piksel değerinde taşınır."""
+
+    is_live = False
+
+    def __init__(self, n: int):
+        self.n = n
+        self.seq = 0
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def grab(self):
+        return False
+
+    def read_with_ts(self):
+        if self.seq >= self.n:
+            return None, None
+        self.seq += 1
+        time.sleep(0.002)
+        frame = np.zeros((8, 8, 3), dtype=np.uint8)
+        frame[0, 0, :2] = (self.seq % 256, self.seq // 256)
+        return frame, self.seq / FPS
+
+
+class FakeInferencer:
+    def __init__(self):
+        self.seen = {}
+        self._lock = threading.Lock()
+
+    def reset_trackers(self, *args, **kwargs):
+        pass
+
+    def track_batch(self, frames, stream_ids, crops=None):
+        seqs = [int(f[0, 0, 0]) + 256 * int(f[0, 0, 1]) for f in frames]
+        with self._lock:
+            for stream_id, seq in zip(stream_ids, seqs):
+                self.seen.setdefault(stream_id, []).append(seq)
+        return seqs
+
+
+class FakeTracker:
+    def update(self, results):
+        seq = results[0]
+        boxes = [(1, 0, [100, 100, 300, 500])]
+        if seq <= VANISH_SEQ:
+            boxes.append((2, 39, [190, 290, 210, 310]))
+        return Detections(
+            track_ids=np.array([b[0] for b in boxes], dtype=np.int64),
+            cls_ids=np.array([b[1] for b in boxes], dtype=np.int64),
+            confs=np.full(len(boxes), 0.9, dtype=np.float32),
+            xyxy=np.array([b[2] for b in boxes], dtype=np.float32),
+        )
+
+
+def test_video_files_drain_to_the_last_frame(tmp_path):
+    lengths = {0: 80, 1: 120}
+    inferencer = FakeInferencer()
+    pipeline = PipelineService(
+        [
+            CameraStream(stream_id, FakeVideo(n), EventService(near_required_time=0.2, disappear_time=0.5))
+            for stream_id, n in lengths.items()
+        ],
+        inferencer, FakeTracker(), Database(tmp_path / "events.db"), tmp_path / "snaps",
+        max_frame_age=0, stall_timeout=0.05, preview=False,
+    )
+    pipeline.start()
+    try:
+        deadline = time.monotonic() + 10.0
+        while not pipeline.all_sources_ended and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert pipeline.all_sources_ended
+        # inference ve event thread'leri kendiliğinden biter
+        for t in pipeline._threads:
+            t.join(2.0)
+            assert not t.is_alive(), t.name
+    finally:
+        pipeline.stop()
+
+    # newest-wins ara kareleri atabilir, ama her dosyanın son karesi işlenir
+    assert {s: max(seqs) for s, seqs in inferencer.seen.items()} == lengths
+    assert pipeline.events_emitted == len(lengths)
+    assert pipeline.db.count_events() == len(lengths)
+
+
+def test_live_source_never_ends(tmp_path):
+    video = FakeVideo(5)
+    video.is_live = True
+    video.reconnect = lambda: False
+    pipeline = PipelineService(
+        [CameraStream(0, video, EventService())], FakeInferencer(), FakeTracker(),
+        Database(tmp_path / "events.db"), tmp_path, stall_timeout=0.05, reconnect_max_delay=0.05, preview=False,
+    )
+    pipeline.start()
+    try:
+        time.sleep(0.3)
+        assert not pipeline.all_sources_ended
+    finally:
+        pipeline.stop()
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from app.services import spatial_index
+from app.services.spatial_index import GridIndex, near_mask, point_box_distance
+
+
+def _scene(rng, n_boxes, n_points, extent=2000.0):
+    xy = rng.uniform(0, extent, size=(n_boxes, 2))
+    wh = rng.uniform(5, 300, size=(n_boxes, 2))
+    boxes = np.column_stack((xy, xy + wh))
+    points = rng.uniform(-50, extent + 350, size=(n_points, 2))
+    return boxes, points
+
+
+def _brute_pairs(boxes, points, radius):
+    dist = point_box_distance(points[:, 0:1], points[:, 1:2], boxes[None, :, :])
+    p, b = np.nonzero(dist <= radius)
+    return set(zip(p.tolist(), b.tolist())), dist
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_query_radius_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    boxes, points = _scene(rng, rng.integers(0, 150), rng.integers(0, 400))
+    pad = float(rng.choice([0.0, 10.0, 80.0]))
+    index = GridIndex(boxes, pad=pad)
+
+    for radius in {0.0, pad / 2, pad}:
+        point_idx, box_idx, dist = index.query_radius(points, radius)
+        expected, brute = _brute_pairs(boxes, points, radius)
+        assert set(zip(point_idx.tolist(), box_idx.tolist())) == expected
+        np.testing.assert_allclose(dist, brute[point_idx, box_idx])
+        assert len(point_idx) == len(expected)  # tekrar eden çift yok
+
+
+def test_nearest_returns_k_closest():
+    rng = np.random.default_rng(3)
+    boxes, points = _scene(rng, 120, 200, extent=800.0)
+    index = GridIndex(boxes, pad=60.0)
+
+    point_idx, box_idx, dist = index.nearest(points, k=2)
+    _, brute = _brute_pairs(boxes, points, 60.0)
+    for p in range(len(points)):
+        got = dist[point_idx == p]
+        within = np.sort(brute[p][brute[p] <= 60.0])[:2]
+        np.testing.assert_allclose(got, within)
+
+
+def test_radius_cannot_exceed_pad():
+    with pytest.raises(ValueError):
+        GridIndex([[0, 0, 10, 10]], pad=5.0).query_radius([[0, 0]], 6.0)
+
+
+def test_empty_index():
+    index = GridIndex(np.empty((0, 4)))
+    assert len(index.query_radius([[1.0, 1.0]])[0]) == 0
+    assert not index.any_within([[1.0, 1.0]]).any()
+
+
+@pytest.mark.parametrize("brute_force_pairs", [0, spatial_index.BRUTE_FORCE_PAIRS])
+def test_near_mask_grid_and_broadcast_agree(monkeypatch, brute_force_pairs):
+    # 0: her sorgu ızgaradan geçer; varsayılan: küçük sahneler doğrudan yayınla çözülür
+    monkeypatch.setattr(spatial_index, "BRUTE_FORCE_PAIRS", brute_force_pairs)
+    rng = np.random.default_rng(11)
+    for _ in range(30):
+        boxes, points = _scene(rng, rng.integers(1, 200), rng.integers(1, 300))
+        radius = rng.choice([0.0, 30.0], size=len(points))  # nokta başına yarıçap
+        _, brute = _brute_pairs(boxes, points, 0.0)
+        expected = (brute <= radius[:, None]).any(axis=1)
+        np.testing.assert_array_equal(near_mask(points, boxes, radius), expected)
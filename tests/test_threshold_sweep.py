@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from app.services.detection_log import DetectionRecorder
+from app.services.detections import Detections
+from app.services.threshold_sweep import build_grid, sweep
+
+
+PERSON = (0, [100.0, 100.0, 300.0, 500.0])
+BOTTLE = (39, [190.0, 290.0, 210.0, 310.0])  # merkezi kişi kutusunun içinde
+
+
+def _frame(*objects):
+    return Detections(
+        track_ids=np.arange(1, len(objects) + 1, dtype=np.int64),
+        cls_ids=np.array([cls_id for cls_id, _ in objects], dtype=np.int64),
+        confs=np.full(len(objects), 0.9, dtype=np.float32),
+        xyxy=np.array([box for _, box in objects], dtype=np.float32).reshape(-1, 4),
+    )
+
+
+@pytest.fixture
+def recording(tmp_path):
+    # 10 fps; bottle 1000-1005 arası kişinin yanında, sonra kaybolur; kayıt 1020'ye kadar sürer
+    path = tmp_path / "cam0.mtd"
+    with DetectionRecorder(path) as rec:
+        for i in range(201):
+            ts = 1000.0 + i / 10
+            rec.write(i, ts, _frame(PERSON, BOTTLE) if ts <= 1005.0 else _frame(PERSON))
+    return path
+
+
+def test_vanish_label_matches_at_every_disappear_time(recording):
+    grid = build_grid(near_times=[2.0], disappear_times=[1.0, 3.0, 5.0, 7.0])
+    results = sweep([recording], grid, labels=[(None, 1005.0)], tolerance=0.5, workers=1)
+
+    assert len(results) == len(grid)
+    for r in results:
+        assert (r.tp, r.fp, r.fn, r.f1) == (1, 0, 0, 1.0), r
+
+
+def test_without_labels_counts_events(recording):
+    results = sweep([recording], build_grid([2.0, 6.0], [3.0]), workers=1)
+
+    # 6 s yakınlık hiç dolmaz: ARMED olmadan kaybolan ürün event üretmez
+    assert {r.near_time: r.events for r in results} == {2.0: 1, 6.0: 0}
+    assert all(r.f1 is None for r in results)
+
+
+def test_f1_undefined_without_predictions_or_labels(recording):
+    # 6 s yakınlık: event yok -> precision tanımsız
+    no_events = sweep([recording], build_grid([6.0], [3.0]), labels=[(None, 1005.0)], workers=1)[0]
+    assert (no_events.events, no_events.precision, no_events.recall) == (0, None, 0.0)
+    assert no_events.f1 is None
+
+    # etiket başka bir kayda ait -> bu kayıt için recall tanımsız
+    no_truth = sweep([recording], build_grid([2.0], [3.0]), labels=[("other.mtd", 1005.0)], workers=1)[0]
+    assert (no_truth.tp, no_truth.fp, no_truth.precision, no_truth.recall) == (0, 1, 0.0, None)
+    assert no_truth.f1 is None
+
+
+def test_f1_zero_when_events_miss_labels(recording):
+    r = sweep([recording], build_grid([2.0], [3.0]), labels=[(None, 1015.0)], tolerance=0.5, workers=1)[0]
+    assert (r.tp, r.fp, r.fn, r.f1) == (0, 1, 1, 0.0)